@@ -0,0 +1,105 @@
+"""
+Largest-remainder (Hamilton) apportionment of study hours
+"""
+
+from functools import reduce
+from math import gcd
+
+def apportion(weights, total: int, minimum=0, maximum=None) -> list:
+    """
+    Split total whole hours in proportion to weights, keeping each share
+    between its minimum and maximum (scalars or per-item sequences).
+    Shares always add up to total; raises ValueError when that is impossible.
+    """
+    weights = _integer_weights(weights)
+    count = len(weights)
+    lows = _bounds(minimum, count, 0)
+    highs = _bounds(maximum, count, None)
+
+    if any(w < 0 for w in weights):
+        raise ValueError("weights must not be negative")
+    if any(high is not None and high < low for low, high in zip(lows, highs)):
+        raise ValueError("maximum must not be below minimum")
+    if not any(weights):
+        weights = [1] * count
+
+    # Zero-weight items never grow past their minimum
+    unbounded = any(high is None and w > 0 for w, high in zip(weights, highs))
+    capacity = sum(low if w == 0 else high for w, low, high in zip(weights, lows, highs)
+                   if w == 0 or high is not None)
+    if total < sum(lows) or (not unbounded and total > capacity):
+        raise ValueError(f"cannot split {total} hours within the given bounds")
+
+    # Quota of item i is clamp(w * num / den); free quotas share the denominator,
+    # so remainders compare as plain integers
+    num, den = _solve_scale(weights, lows, highs, total)
+    shares = []
+    remainders = []
+    for w, low, high in zip(weights, lows, highs):
+        share, remainder = divmod(w * num, den)
+        if share < low:
+            share, remainder = low, 0
+        elif high is not None and share >= high:
+            share, remainder = high, 0
+        shares.append(share)
+        remainders.append(remainder)
+
+    # Hand out the hours lost to rounding down by largest remainder
+    remaining = total - sum(shares)
+    if remaining:
+        order = sorted(range(count), key=lambda i: (-remainders[i], i))
+        for i in order[:remaining]:
+            shares[i] += 1
+    return shares
+
+def _solve_scale(weights: list, lows: list, highs: list, total: int) -> tuple:
+    """Find the scale (as num/den) where the clamped quotas add up to total"""
+    # Item i is at its minimum below lows[i]/w, free in between and at its
+    # maximum above highs[i]/w, so the quota sum is piecewise linear in scale.
+    # Sweep the sorted breakpoints: O(n log n).
+    events = []
+    for w, low, high in zip(weights, lows, highs):
+        if w == 0:
+            continue
+        events.append((low / w, 0, w, low))
+        if high is not None:
+            events.append((high / w, 1, w, high))
+    events.sort(key=lambda event: event[:2])
+
+    constant = sum(lows)  # Sum of the clamped quotas
+    slope = 0             # Sum of the free weights
+    scale = (0, 1)
+    for _, leaving, w, bound in events:
+        # Quota sum at this breakpoint (bound / w) reaches the total
+        if constant * w + slope * bound >= total * w:
+            break
+        scale = (bound, w)
+        if leaving:
+            constant += bound
+            slope -= w
+        else:
+            constant -= bound
+            slope += w
+    if slope == 0:
+        return scale
+    return total - constant, slope
+
+def _integer_weights(weights) -> list:
+    """Scale weights to integers with the same proportions"""
+    weights = list(weights)
+    if all(isinstance(w, int) for w in weights):
+        return weights
+    from fractions import Fraction  # Only needed for non-integer weights
+    fractions = [Fraction(w) for w in weights]
+    scale = reduce(lambda a, b: a * b // gcd(a, b), (f.denominator for f in fractions), 1)
+    return [int(f * scale) for f in fractions]
+
+def _bounds(bound, count: int, default) -> list:
+    if bound is None:
+        return [default] * count
+    if isinstance(bound, int):
+        return [bound] * count
+    bounds = list(bound)
+    if len(bounds) != count:
+        raise ValueError("need one bound per weight")
+    return bounds
@@ -0,0 +1,844 @@
+"""
+Benchmarks for the Study Assistant
+Run with: python benchmark.py [name ...] [--json results.json] [--baseline FILE] [--save-baseline]
+The pipeline benchmark records its timings; they are written as JSON and
+compared against benchmark_baseline.json (when present) to flag regressions.
+Benchmarks with slow timings are re-run (--confirm times) before they count.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+import knowledge_base
+from allocator import apportion
+from curriculum import Module, freeze_knowledge
+from exporters import FORMATS, SyllabusWriter, read_syllabi
+from keyword_matcher import KeywordMatcher
+from plan_store import PlanStore
+from knowledge_base import TOPIC_KNOWLEDGE, get_topic_knowledge
+from plan_kernel import allocate_hours, numpy, schedule_weeks
+from storage import DictBackend, JsonDirectoryBackend, SnapshotBackend, SQLiteBackend
+from progress import ProgressStore
+from renderer import render_plan_file, render_syllabus, write_stream
+from scheduler import schedule
+from study_calendar import StudyCalendar, write_ics
+from study_assistant import StudyAssistant
+from syllabus_builder import SyllabusBuilder
+from syllabus_cache import SyllabusCache
+from topic_index import TopicIndex
+from topic_resolver import TopicResolver
+from utils import save_syllabus
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+RESULTS = {}  # Recorded timings: name -> seconds per call
+SOURCES = {}  # Recorded timing name -> benchmark that records it
+
+WORDS = [
+    "advanced", "applied", "computer", "data", "distributed", "embedded", "financial",
+    "functional", "graph", "network", "numerical", "quantum", "secure", "statistical",
+    "systems", "web", "algorithms", "architecture", "compilers", "databases", "design",
+    "engineering", "graphics", "logic", "modeling", "optimization", "programming",
+    "robotics", "security", "theory", "vision", "analysis",
+]
+
+def synthetic_topics(count: int, seed: int = 42) -> list:
+    """Generate unique synthetic topic names"""
+    rng = random.Random(seed)
+    topics = []
+    for i in range(count):
+        words = rng.sample(WORDS, 3)
+        topics.append(f"{' '.join(words)} {i}")
+    return topics
+
+def synthetic_knowledge(modules: int, seed: int = 7):
+    """Generate a knowledge entry with the given number of modules"""
+    rng = random.Random(seed)
+    return freeze_knowledge({
+        "description": f"Synthetic curriculum with {modules} modules",
+        "modules": [
+            {
+                "title": f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}",
+                "hours": rng.randint(1, 6),
+                "topics": [f"{rng.choice(WORDS)} {rng.choice(WORDS)}" for _ in range(4)],
+                "exercises": [f"Basic {rng.choice(WORDS)} exercise", f"{rng.choice(WORDS).title()} project"]
+            }
+            for i in range(modules)
+        ],
+        "prerequisites": ["Basic programming"],
+        "resources": ["Documentation"]
+    })
+
+def synthetic_syllabus(modules: int, level: str = "intermediate") -> dict:
+    """Build a syllabus over a synthetic knowledge entry"""
+    knowledge = synthetic_knowledge(modules)
+    total_hours = sum(module.hours for module in knowledge["modules"])
+    return SyllabusBuilder()._build_syllabus("Synthetic", total_hours, level, 5, knowledge)
+
+def linear_scan(topic: str, keys: list):
+    """Original get_topic_knowledge lookup, kept for comparison"""
+    topic_lower = topic.lower()
+    if topic_lower in keys:
+        return topic_lower
+    for key in keys:
+        if key in topic_lower or topic_lower in key:
+            return key
+    return None
+
+def legacy_adjust_hours(hours: list, total_hours: int) -> list:
+    """Original round-and-patch _adjust_hours, kept for comparison"""
+    hours = list(hours)
+    current_total = sum(hours)
+    if current_total == total_hours:
+        return hours
+    ratio = total_hours / current_total
+    hours = [max(1, round(h * ratio)) for h in hours]
+    current_total = sum(hours)
+    if current_total != total_hours:
+        diff = total_hours - current_total
+        if diff > 0:
+            hours[-1] += diff
+        else:
+            hours[0] = max(1, hours[0] + diff)
+    return hours
+
+def legacy_display(syllabus: dict):
+    """Original print-based _display_syllabus, kept for comparison"""
+    print(f"\n📋 SYLLABUS: {syllabus['topic'].upper()}")
+    print("=" * 50)
+    print(f"📝 Description: {syllabus['description']}")
+    print(f"⏱️  Total Hours: {syllabus['total_hours']}")
+    print(f"🎓 Level: {syllabus['level']}")
+    print(f"\n📚 Prerequisites:")
+    for prereq in syllabus['prerequisites']:
+        print(f"  • {prereq}")
+    print(f"\n📖 Modules:")
+    for i, module in enumerate(syllabus['modules'], 1):
+        print(f"\n  {i}. {module['title']} ({module['hours']} hours)")
+        print(f"     📌 Topics to cover:")
+        for topic in module['topics']:
+            print(f"       • {topic}")
+        print(f"     💻 Exercises:")
+        for exercise in module['exercises']:
+            print(f"       • {exercise}")
+    print(f"\n📅 Weekly Study Plan:")
+    for week in syllabus['study_plan']:
+        print(f"\n  Week {week['week']} ({week['hours']} hours):")
+        for module in week['modules']:
+            print(f"    • {module['title']}")
+
+def legacy_find(table: dict, text: str, default=None):
+    """Original `for key in table: if key in text` lookup, kept for comparison"""
+    text = text.lower()
+    for key in table:
+        if key in text:
+            return table[key]
+    return default
+
+def rescan_sessions(start: date, weekly: list, blackouts, study_plan: list, follow_weeks: bool = True) -> list:
+    """Place a plan by scanning the calendar from the start day for every session, kept for comparison"""
+    sessions = []
+    earliest = 0  # Minutes from the start day
+    for week in study_plan:
+        if follow_weeks:
+            earliest = max(earliest, (week["week"] - 1) * 7 * 24 * 60)
+        for part in week["modules"]:
+            left = part["hours"] * 60
+            while left > 0:
+                day = 0
+                window = None
+                while window is None:
+                    current = start + timedelta(days=day)
+                    if current not in blackouts:
+                        for begin, end in weekly[current.weekday()]:
+                            begin, end = day * 24 * 60 + begin, day * 24 * 60 + end
+                            if end > earliest:
+                                window = (max(begin, earliest), end)
+                                break
+                    day += 1
+                begin, end = window[0], min(window[1], window[0] + left)
+                sessions.append((part["module"], part["title"], begin, end))
+                earliest = end
+                left -= end - begin
+    return sessions
+
+def timed(func, repeat: int = 1) -> float:
+    """Return the best wall time of func over repeat runs (with the garbage collector paused, as timeit)"""
+    best = float("inf")
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if enabled:
+            gc.enable()
+    return best
+
+def per_call(func, repeat: int = 7, min_time: float = 0.1) -> float:
+    """Return the best seconds per call, looping fast calls until min_time is reached"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        if time.perf_counter() - start >= min_time or loops >= 1 << 20:
+            break
+        loops *= 4
+    return timed(lambda: [func() for _ in range(loops)], repeat) / loops
+
+def record(name: str, seconds: float):
+    """Keep a timing for the JSON results (the best one when a benchmark is re-run) and print it"""
+    RESULTS[name] = min(seconds, RESULTS.get(name, seconds))
+    SOURCES[name] = CURRENT
+    print(f"{name:<44} {seconds * 1000:>12.4f}")
+
+def bench_resolver(sizes=(3, 1000, 10000, 100000)):
+    """Compare the topic resolver with the linear substring scan"""
+    print("\n🔎 Topic resolution (ms per query)")
+    print(f"{'topics':>8} {'build ms':>10} {'scan':>10} {'index':>10}")
+    for size in sizes:
+        topics = synthetic_topics(size)
+        keys = dict.fromkeys(topics)
+        rng = random.Random(size)
+        queries = [rng.choice(topics).upper() for _ in range(50)]
+        queries += [f"intro to {rng.choice(topics)}" for _ in range(50)]
+        queries += [f"unknown subject {i}x" for i in range(100)]
+        queries += ["os", "ml", "qz", "x"]  # Shorter than a trigram
+
+        build = timed(lambda: TopicResolver(topics))
+        resolver = TopicResolver(topics)
+        for query in queries:
+            assert resolver.resolve(query, fuzzy=False) == linear_scan(query, keys), query
+
+        scan = timed(lambda: [linear_scan(q, keys) for q in queries], 3) / len(queries)
+        index = timed(lambda: [resolver.resolve(q) for q in queries], 3) / len(queries)
+        print(f"{size:>8} {build * 1000:>10.1f} {scan * 1000:>10.4f} {index * 1000:>10.4f}")
+
+def bench_batch(workers=(1, 2, 4, 8), repeat: int = 5):
+    """Syllabi per second for the nightly catalog grid at several pool sizes"""
+    grid = [(topic, hours, level)
+            for topic in TOPIC_KNOWLEDGE
+            for hours in range(1, 101)
+            for level in ("beginner", "intermediate", "advanced")] * repeat
+    builder = SyllabusBuilder()
+    print(f"\n🏭 Batch generation ({len(grid)} syllabi)")
+    print(f"{'workers':>8} {'syllabi/s':>12}")
+    elapsed = timed(lambda: sum(1 for _ in builder.create_syllabi(grid)))
+    print(f"{'inline':>8} {len(grid) / elapsed:>12.0f}")
+    for count in workers:
+        elapsed = timed(lambda: sum(1 for _ in builder.create_syllabi(grid, workers=count, chunksize=256)))
+        print(f"{count:>8} {len(grid) / elapsed:>12.0f}")
+
+def bench_allocator(sizes=(4, 100, 1000, 5000)):
+    """Compare the apportionment engine with the round-and-patch routine"""
+    print("\n⚖️  Hour allocation (ms per call, share of calls hitting the target)")
+    print(f"{'modules':>8} {'legacy':>10} {'exact':>8} {'hamilton':>10} {'exact':>8}")
+    for size in sizes:
+        rng = random.Random(size)
+        cases = [([rng.randint(1, 6) for _ in range(size)], rng.randint(1, size * 4)) for _ in range(20)]
+        legacy_hits = sum(sum(legacy_adjust_hours(h, t)) == t for h, t in cases) / len(cases)
+        hits = sum(sum(apportion(h, t, 1 if t >= size else 0)) == t for h, t in cases) / len(cases)
+        legacy = timed(lambda: [legacy_adjust_hours(h, t) for h, t in cases], 3) / len(cases)
+        hamilton = timed(lambda: [apportion(h, t, 1 if t >= size else 0) for h, t in cases], 3) / len(cases)
+        print(f"{size:>8} {legacy * 1000:>10.3f} {legacy_hits:>8.0%} {hamilton * 1000:>10.3f} {hits:>8.0%}")
+        assert hits == 1, "apportion missed the target total"
+
+def bench_render(modules: int = 1000):
+    """Render a large syllabus to /dev/null with print loops and with the pipeline"""
+    syllabus = synthetic_syllabus(modules)
+    with io.StringIO() as old, io.StringIO() as new:
+        with contextlib.redirect_stdout(old):
+            legacy_display(syllabus)
+        write_stream(render_syllabus(syllabus), new)
+        assert old.getvalue() == new.getvalue()
+
+    print(f"\n🖨️  Rendering a {modules}-module syllabus to /dev/null (ms)")
+    with open("/dev/null", "w", encoding="utf-8") as devnull:
+        def legacy():
+            with contextlib.redirect_stdout(devnull):
+                legacy_display(syllabus)
+        legacy_time = timed(legacy, 5)
+        stream_time = timed(lambda: write_stream(render_syllabus(syllabus), devnull), 5)
+        partial_time = timed(lambda: write_stream(render_syllabus(syllabus, range(3, 6)), devnull), 5)
+    print(f"{'print loop':>14} {legacy_time * 1000:>8.2f}")
+    print(f"{'stream':>14} {stream_time * 1000:>8.2f}")
+    print(f"{'weeks 3-5':>14} {partial_time * 1000:>8.2f}")
+
+def bench_export(count: int = 2000):
+    """Compare export formats with the text plan layout by size and throughput"""
+    requests = [(topic, hours, level)
+                for topic in TOPIC_KNOWLEDGE
+                for hours in range(1, 101)
+                for level in ("beginner", "intermediate", "advanced")]
+    plans = [syllabus for _, syllabus in SyllabusBuilder().create_syllabi(requests[:count])]
+    print(f"\n📦 Exporting {len(plans)} syllabi")
+    print(f"{'format':>14} {'bytes/plan':>12} {'write/s':>10} {'read/s':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "plans.txt")
+
+        def write_text():
+            with open(path, "w", encoding="utf-8") as f:
+                for syllabus in plans:
+                    write_stream(render_plan_file(syllabus), f)
+        elapsed = timed(write_text, 3)
+        print(f"{'text':>14} {os.path.getsize(path) / len(plans):>12.0f} {len(plans) / elapsed:>10.0f} {'-':>10}")
+
+        for format in FORMATS:
+            for compress in (False, True):
+                path = os.path.join(directory, f"plans.{format}{'.gz' if compress else ''}")
+
+                def write():
+                    if os.path.exists(path):
+                        os.remove(path)
+                    with SyllabusWriter(path, format, compress) as writer:
+                        writer.write_many(plans)
+                write_time = timed(write, 3)
+                assert list(read_syllabi(path, format)) == plans, f"{format} round trip changed the plans"
+                read_time = timed(lambda: sum(1 for _ in read_syllabi(path, format)), 3)
+                name = format + (" + gzip" if compress else "")
+                print(f"{name:>14} {os.path.getsize(path) / len(plans):>12.0f} "
+                      f"{len(plans) / write_time:>10.0f} {len(plans) / read_time:>10.0f}")
+
+def bench_lookup(modules: int = 1000, table_sizes=(5, 40, 100, 1000, 5000)):
+    """Explanation/importance/FAQ lookups over a large syllabus: scan vs automaton"""
+    syllabus = synthetic_syllabus(modules)
+    texts = [topic for module in syllabus["modules"] for topic in module["topics"]]
+    texts += [module["title"] for module in syllabus["modules"]] * 2  # Importance and FAQ
+    print(f"\n🔤 Lookups for a {modules}-module syllabus ({len(texts)} strings, ms)")
+    print(f"{'table':>8} {'scan':>10} {'automaton':>10} {'matcher':>10}")
+    rng = random.Random(1)
+    for size in table_sizes:
+        table = {f"{rng.choice(WORDS)} {rng.choice(WORDS)}{rng.randint(0, size * 10)}": i for i in range(size)}
+        table.update({"graph": -1, "systems design": -2})
+        automaton = KeywordMatcher(table, scan_below=0)
+        matcher = KeywordMatcher(table)  # Scans tables below KeywordMatcher.scan_below keys
+        for text in texts:
+            assert automaton.find(text) == matcher.find(text) == legacy_find(table, text)
+        times = [timed(lambda: [legacy_find(table, text) for text in texts], 3),
+                 timed(lambda: [automaton.find(text) for text in texts], 3),
+                 timed(lambda: [matcher.find(text) for text in texts], 3)]
+        print(f"{len(table):>8} " + " ".join(f"{seconds * 1000:>10.2f}" for seconds in times))
+
+def bench_progress(updates: int = 100000, users: int = 1000, batch_sizes=(1, 100, 1000)):
+    """Progress updates per second and weekly query latency"""
+    syllabus = synthetic_syllabus(40)
+    rng = random.Random(5)
+    events = [(f"user{rng.randrange(users)}", rng.randrange(40), rng.random(), rng.random() < 0.3)
+              for _ in range(updates)]
+    print(f"\n📈 Progress store ({updates} updates, {users} users)")
+    print(f"{'batch':>8} {'updates/s':>12} {'query ms':>10}")
+    for batch_size in batch_sizes:
+        count = updates if batch_size > 1 else updates // 20  # Unbatched commits are slow
+        with tempfile.TemporaryDirectory() as directory:
+            with ProgressStore(os.path.join(directory, "progress.db"), batch_size=batch_size) as store:
+                plans = {f"user{i}": store.register_plan(f"user{i}", syllabus) for i in range(users)}
+                start = time.perf_counter()
+                for user, module, hours, completed in events[:count]:
+                    store.record(user, plans[user], module, hours, completed)
+                store.flush()
+                elapsed = time.perf_counter() - start
+                query = timed(lambda: [store.remaining_this_week(f"user{i}", plans[f"user{i}"], 3)
+                                       for i in range(100)]) / 100
+            print(f"{batch_size:>8} {count / elapsed:>12.0f} {query * 1000:>10.3f}")
+
+STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[3])
+if sys.argv[1] == "literal":
+    import knowledge_base, catalog_literal
+    knowledge_base.TOPIC_KNOWLEDGE.update(catalog_literal.TOPICS)
+else:
+    import knowledge_base, storage
+    backend = storage.SQLiteBackend(sys.argv[2]) if sys.argv[1] == "sqlite" else storage.JsonDirectoryBackend(sys.argv[2])
+    knowledge_base.set_backend(backend)
+knowledge_base.get_topic_knowledge(sys.argv[4])
+elapsed = (time.perf_counter() - start) * 1000
+# ru_maxrss survives exec on Linux, so read the peak of this process image instead
+with open("/proc/self/status") as status:
+    peak = next(int(line.split()[1]) for line in status if line.startswith("VmHWM"))
+print(elapsed, peak / 1024)
+"""
+
+MEMORY_SCRIPT = """
+import sys
+sys.path.insert(0, sys.argv[3])
+import knowledge_base
+from benchmark import synthetic_knowledge, synthetic_topics
+from plan_store import PlanStore
+from storage import DictBackend
+from syllabus_builder import SyllabusBuilder
+from syllabus_cache import SyllabusCache
+
+def resident():
+    with open("/proc/self/status") as status:
+        return next(int(line.split()[1]) for line in status if line.startswith("VmRSS")) * 1024
+
+count = int(sys.argv[2])
+topics = synthetic_topics(200)
+knowledge_base.set_backend(DictBackend({topic: synthetic_knowledge(6, seed=i) for i, topic in enumerate(topics)}))
+levels = ("beginner", "intermediate", "advanced")
+requests = ((topics[i % 200], 1 + (i // 200) % 100, levels[(i // 20000) % 3], 3 + (i // 60000) % 20)
+            for i in range(count))
+cache = SyllabusCache(maxsize=count, store=PlanStore() if sys.argv[1] == "store" else None)
+builder = SyllabusBuilder(cache)
+before = resident()
+for _ in builder.create_syllabi(requests):
+    pass
+unique = len(cache.store) if cache.store is not None else len(cache)
+print(resident() - before, unique)
+"""
+
+def bench_memory(sizes=(10000, 100000, 1000000), limit: int = 200000):
+    """Resident size of a syllabus cache holding many plans, with and without a PlanStore
+
+    Plain copies are skipped above limit plans (1M of them need several GB);
+    their size is then estimated from the largest measured run.
+    """
+    print("\n🧠 Cached plans: resident size growth (MB, bytes per plan)")
+    print(f"{'plans':>9} {'copies':>20} {'plan store':>20} {'unique':>9}")
+    per_plan = None
+    for size in sizes:
+        results = {}
+        for kind in ("copies", "store"):
+            if kind == "copies" and size > limit:
+                continue
+            output = subprocess.run(
+                [sys.executable, "-c", MEMORY_SCRIPT, kind, str(size), os.path.dirname(os.path.abspath(__file__))],
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            results[kind] = (int(output[0]), int(output[1]))
+        if "copies" in results:
+            per_plan = results["copies"][0] / size
+            copies = f"{results['copies'][0] / 2 ** 20:.0f} / {per_plan:.0f}"
+        else:
+            copies = f"~{per_plan * size / 2 ** 20:.0f} / {per_plan:.0f} (est.)"
+        growth, unique = results["store"]
+        print(f"{size:>9} {copies:>20} {f'{growth / 2 ** 20:.0f} / {growth / size:.0f}':>20} {unique:>9}")
+
+def bench_storage(sizes=(1000, 10000, 100000), limit: int = 10000):
+    """Startup time and peak memory for one lookup as the catalog grows
+
+    The dict literal and JSON directory are skipped above limit topics (compiling
+    a 100k-topic literal takes several GB).
+    """
+    print("\n🗄️  Knowledge base startup + first lookup (ms / peak MB)")
+    print(f"{'topics':>8} {'literal':>16} {'sqlite':>16} {'json dir':>16}")
+    template = synthetic_knowledge(4)
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            topics = synthetic_topics(size)
+            catalog = {topic: {
+                "description": f"Study of {topic}",
+                "modules": [module.to_dict() for module in template["modules"]],
+                "prerequisites": list(template["prerequisites"]),
+                "resources": list(template["resources"])
+            } for topic in topics}
+
+            # The old approach: a module-level dict literal
+            if size <= limit:
+                with open(os.path.join(directory, "catalog_literal.py"), "w", encoding="utf-8") as f:
+                    f.write(f"TOPICS = {catalog!r}\n")
+            database = os.path.join(directory, f"topics_{size}.sqlite")
+            SQLiteBackend(database).put_many(catalog.items())
+            json_root = os.path.join(directory, f"topics_{size}")
+            if size <= limit:
+                JsonDirectoryBackend(json_root).put_many(catalog.items())
+
+            results = []
+            for kind, path in (("literal", ""), ("sqlite", database), ("json", json_root)):
+                if kind != "sqlite" and size > limit:
+                    results.append("skipped")
+                    continue
+                output = subprocess.run(
+                    [sys.executable, "-c", STARTUP_SCRIPT, kind, path, directory, topics[-1]],
+                    capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+                ).stdout.split()
+                results.append(f"{float(output[0]):.0f} / {float(output[1]):.0f}")
+            print(f"{size:>8} {results[0]:>16} {results[1]:>16} {results[2]:>16}")
+
+def bench_pipeline(catalog_sizes=(3, 1000, 10000, 100000), module_counts=(4, 100, 1000, 5000)):
+    """Time every syllabus pipeline stage as the catalog and the syllabi grow"""
+    print("\n🧪 Pipeline stages (ms per call)")
+
+    # get_topic_knowledge: exact, partial and unknown topics (warm resolver and cache)
+    template = synthetic_knowledge(4)
+    try:
+        for size in catalog_sizes:
+            topics = synthetic_topics(size)
+            knowledge_base.set_backend(DictBackend(dict.fromkeys(topics, template)))
+            rng = random.Random(size)
+            queries = ([rng.choice(topics) for _ in range(20)]
+                       + [f"intro to {rng.choice(topics)}" for _ in range(20)]
+                       + [f"unknown subject {i}x" for i in range(20)])
+            for query in queries:
+                get_topic_knowledge(query)
+            record(f"get_topic_knowledge[topics={size}]",
+                   per_call(lambda: [get_topic_knowledge(query) for query in queries]) / len(queries))
+    finally:
+        knowledge_base.set_backend(DictBackend(TOPIC_KNOWLEDGE))
+
+    builder = SyllabusBuilder()
+    assistant = StudyAssistant()
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, "w", encoding="utf-8") as devnull:
+        for count in module_counts:
+            knowledge = synthetic_knowledge(count)
+            modules = tuple(Module.from_dict(module) for module in knowledge["modules"])
+            total_hours = sum(module.hours for module in modules)
+            for level in ("beginner", "advanced"):
+                record(f"_adjust_for_level[modules={count},{level}]",
+                       per_call(lambda: builder._adjust_for_level(modules, level)))
+            adjusted = builder._adjust_for_level(modules, "intermediate")
+            record(f"_adjust_hours[modules={count}]",
+                   per_call(lambda: builder._adjust_hours(adjusted, total_hours * 2 // 3)))
+            record(f"_create_study_plan[modules={count}]",
+                   per_call(lambda: builder._create_study_plan(adjusted, 5)))
+
+            assistant.current_syllabus = builder._build_syllabus("Synthetic", total_hours, "intermediate",
+                                                                 5, knowledge)
+            path = os.path.join(directory, "plan.txt")
+            with contextlib.redirect_stdout(devnull):
+                display = per_call(assistant._display_syllabus)
+                save = per_call(lambda: save_syllabus(assistant.current_syllabus, path))
+            record(f"_display_syllabus[modules={count}]", display)
+            record(f"save_syllabus[modules={count}]", save)
+
+def bench_startup(size: int = 100000, runs: int = 9, budget: float = 0.05):
+    """Cold start of the scripted CLI: --help and one plan from a catalog snapshot"""
+    print(f"\n🚀 CLI cold start, median of {runs} runs (ms, budget {budget * 1000:.0f})")
+    root = os.path.dirname(os.path.abspath(__file__))
+    environment = dict(os.environ)
+    environment.pop("PYTHONDONTWRITEBYTECODE", None)  # Deployed containers have compiled modules
+    template = synthetic_knowledge(4)
+    with tempfile.TemporaryDirectory() as directory:
+        topics = synthetic_topics(size)
+        snapshot = os.path.join(directory, "catalog.snap")
+        SnapshotBackend.build(snapshot, ((topic, template) for topic in topics))
+        TopicResolver(topics).save(snapshot + ".resolver")  # As saved by --build-snapshot
+        commands = {
+            "python": [sys.executable, "-c", "pass"],
+            "--help": [sys.executable, "main.py", "--help"],
+            f"plan,topics={size}": [sys.executable, "main.py", "--catalog", snapshot, "--topic", topics[-1]],
+            f"partial,topics={size}": [sys.executable, "main.py", "--catalog", snapshot, "--topic", "quantum"],
+        }
+        for name, command in commands.items():
+            subprocess.run(command, cwd=root, env=environment, stdout=subprocess.DEVNULL, check=True)
+            times = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                subprocess.run(command, cwd=root, env=environment, stdout=subprocess.DEVNULL, check=True)
+                times.append(time.perf_counter() - start)
+            median = sorted(times)[runs // 2]
+            record(f"startup[{name}]", median)
+            if name != "python" and median > budget:
+                print(f"   ⚠️  over the {budget * 1000:.0f} ms budget")
+
+def bench_kernel(synthetic: int = 300, totals=range(1, 101), capacities=(3, 5, 10)):
+    """Time the bulk kernel against the scalar path on the full plan grid"""
+    builder = SyllabusBuilder()
+    catalog = [knowledge["modules"] for knowledge in TOPIC_KNOWLEDGE.values()]
+    catalog += [synthetic_knowledge(3 + i % 10, seed=i)["modules"] for i in range(synthetic)]
+
+    # Grid rows: every (topic, level) base hours against every total, grouped by module count
+    groups = {}
+    for entry in catalog:
+        modules = tuple(Module.from_dict(module) for module in entry)
+        for level in ("beginner", "intermediate", "advanced"):
+            adjusted = builder._adjust_for_level(modules, level)
+            groups.setdefault(len(adjusted), []).append(adjusted)
+    cells = sum(len(rows) for rows in groups.values()) * len(totals) * len(capacities)
+    print(f"\n🧮 Bulk plan kernel on {cells} (topic, level, hours, hours per week) cells")
+
+    def scalar():
+        results = []
+        for rows in groups.values():
+            for modules in rows:
+                for total in totals:
+                    hours = [module.hours for module in builder._adjust_hours(modules, total)]
+                    results.append((hours, [schedule(hours, capacity) for capacity in capacities]))
+        return results
+
+    def kernel(use_numpy):
+        results = []
+        for count, rows in groups.items():
+            weights = [[module.hours for module in modules] for modules in rows]
+            shares = allocate_hours(weights, totals, use_numpy=use_numpy)
+            results.append((shares, [schedule_weeks(shares, capacity, use_numpy=use_numpy)
+                                     for capacity in capacities]))
+        return results
+
+    # Equivalence with the scalar path is checked by tests/test_plan_kernel.py
+    modes = [False] + ([True] if numpy is not None else [])
+    scalar_time = timed(scalar)
+    record(f"kernel[scalar,cells={cells}]", scalar_time)
+    for use_numpy in modes:
+        name = "numpy" if use_numpy else "python"
+        elapsed = timed(lambda: kernel(use_numpy), 3)
+        record(f"kernel[{name},cells={cells}]", elapsed)
+        print(f"   {name}: {scalar_time / elapsed:.1f}x faster than the scalar path")
+    if numpy is None:
+        print("   ℹ️  NumPy is not installed; install it for the vectorized kernel")
+
+def bench_threads(threads: int = 64, plans: int = 4000):
+    """Time study sessions on one shared assistant from many threads against one thread, checking the results"""
+    rng = random.Random(21)
+    topics = list(TOPIC_KNOWLEDGE) + ["python", "intro to databases", "quantum basket weaving"]
+    requests = [(rng.choice(topics), rng.randint(1, 100), rng.choice(("beginner", "intermediate", "advanced")))
+                for _ in range(plans)]
+    print(f"\n🧵 {plans} study sessions on one shared assistant from {threads} threads")
+
+    def run(assistant, request):
+        output = io.StringIO()
+        syllabus = assistant.start_study_session(*request, output=output, ask=lambda prompt: "")
+        return syllabus, output.getvalue()
+
+    start = time.perf_counter()
+    expected = [run(StudyAssistant(), request) for request in requests]
+    record(f"threads[1,sessions={plans}]", time.perf_counter() - start)
+
+    # Shared builder and cache (with a plan store), every thread switch as often as possible
+    assistant = StudyAssistant(SyllabusBuilder(SyllabusCache(maxsize=64, store=PlanStore())))
+    results = [None] * plans
+    barrier = threading.Barrier(threads)
+    errors = []
+
+    def worker(offset):
+        barrier.wait()
+        try:
+            for index in range(offset, plans, threads):
+                results[index] = run(assistant, requests[index])
+        except Exception as error:  # Reported by the main thread
+            errors.append(error)
+
+    interval = sys.getswitchinterval()
+    stray = io.StringIO()
+    sys.setswitchinterval(1e-6)
+    try:
+        with contextlib.redirect_stdout(stray):
+            workers = [threading.Thread(target=worker, args=(offset,)) for offset in range(threads)]
+            start = time.perf_counter()
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            elapsed = time.perf_counter() - start
+    finally:
+        sys.setswitchinterval(interval)
+    record(f"threads[{threads},sessions={plans}]", elapsed)
+    if errors:
+        raise errors[0]
+    assert stray.getvalue() == "", "session output leaked to stdout"
+    mismatches = sum(result != reference for result, reference in zip(results, expected))
+    assert not mismatches, f"{mismatches} of {plans} threaded sessions differ from the single-threaded run"
+
+def bench_replan(modules: int = 1000):
+    """Time incremental re-planning of a large plan against a full rebuild (checked by tests/test_replan.py)"""
+    builder = SyllabusBuilder()
+    knowledge = synthetic_knowledge(modules)
+    total = sum(module.hours for module in knowledge["modules"])
+    syllabus = builder._build_syllabus("Synthetic", total, "intermediate", 5, knowledge)
+    print(f"\n🔁 Re-planning a {modules}-module plan")
+    record(f"rebuild[modules={modules}]",
+           per_call(lambda: builder._build_syllabus("Synthetic", total + 50, "advanced", 8, knowledge)))
+    for completed in (0, modules // 2, modules * 9 // 10, modules * 99 // 100):
+        record(f"replan[modules={modules},completed={completed},capacity]",
+               per_call(lambda: builder.replan(syllabus, completed, hours_per_week=8)))
+        record(f"replan[modules={modules},completed={completed},hours+level]",
+               per_call(lambda: builder.replan(syllabus, completed, total + 50, 8, "advanced", knowledge)))
+
+def bench_index(size: int = 100000, queries: int = 200, added: int = 1000):
+    """Build, save and query the semantic topic index of a large catalog and check its results"""
+    topics = synthetic_topics(size)
+    entries = [synthetic_knowledge(4, seed=i) for i in range(50)]
+    rng = random.Random(23)
+    texts = ([rng.choice(topics) for _ in range(queries // 2)]
+             + [" ".join(rng.sample(WORDS, 2)) for _ in range(queries // 2)])
+
+    start = time.perf_counter()
+    index = TopicIndex.build((topic, entries[i % 50]) for i, topic in enumerate(topics))
+    build = time.perf_counter() - start
+
+    # Queries read the heaviest postings of each feature (reading them all finds every name)
+    names = texts[:queries // 2]
+    index.max_posting = None
+    assert all(result[0][0] == name for name, result in zip(names, index.search_many(names, 1)))
+    index.max_posting = TopicIndex().max_posting
+    results = index.search_many(texts)
+    recall = sum(result[0][0] == name for name, result in zip(names, results)) / len(names)
+    assert recall >= 0.9, f"top-1 recall {recall:.0%}"
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.index")
+        save = timed(lambda: index.save(path))
+        start = time.perf_counter()
+        loaded = TopicIndex.load(path)
+        assert loaded.search_many(texts) == results
+        load = time.perf_counter() - start
+        print(f"\n🧭 Topic index of {size} topics: built in {build:.1f}s, {os.path.getsize(path) / 1e6:.1f} MB "
+              f"saved in {save:.2f}s, loaded and queried in {load:.2f}s; top-1 recall {recall:.0%}")
+        record(f"index_search[topics={size}]", per_call(lambda: [loaded.search(text) for text in texts]) / queries)
+        record(f"index_search_many[topics={size}]", per_call(lambda: loaded.search_many(texts)) / queries)
+
+        # New topics are found at once, and still after a compact packs them with the rest
+        start = time.perf_counter()
+        for i in range(added):
+            loaded.add(f"added topic {i}", entries[i % 50])
+        record(f"index_add[topics={size}]", (time.perf_counter() - start) / added)
+        new = [f"added topic {i}" for i in range(0, added, 50)]
+        assert [result[0][0] for result in loaded.search_many(new, 1)] == new
+        record(f"index_search[topics={size},added={added}]",
+               per_call(lambda: [loaded.search(text) for text in texts]) / queries)
+        loaded.compact()
+        assert len(loaded) == size + added and [result[0][0] for result in loaded.search_many(new, 1)] == new
+
+def bench_calendar(checks: int = 300, modules: int = 200, plans: int = 3000):
+    """Check calendar placement against a full rescan, then time placement and batch .ics export"""
+    rng = random.Random(24)
+    builder = SyllabusBuilder()
+    start = date(2026, 1, 5)
+    for trial in range(checks):
+        availability = {day: [(hour * 60, (hour + rng.randint(1, 4)) * 60 + rng.choice((0, 30)))
+                              for hour in rng.sample(range(6, 20), rng.randint(0, 2))]
+                        for day in range(7)}
+        if not any(availability.values()):
+            availability[rng.randrange(7)] = [(540, 600)]
+        blackouts = {start + timedelta(days=rng.randrange(120)) for _ in range(rng.randint(0, 20))}
+        calendar = StudyCalendar(start, availability, blackouts, horizon_weeks=rng.randint(1, 4))
+        knowledge = synthetic_knowledge(rng.randint(1, 12), seed=trial)
+        syllabus = builder._build_syllabus("Synthetic", rng.randint(1, 60), "intermediate", rng.randint(1, 12),
+                                           knowledge)
+        for follow_weeks in (True, False):
+            assert (list(calendar._sessions(syllabus["study_plan"], follow_weeks))
+                    == rescan_sessions(start, calendar.weekly, blackouts, syllabus["study_plan"], follow_weeks))
+
+    syllabus = synthetic_syllabus(modules)
+    calendar = StudyCalendar(start, "mon-fri 18:00-20:00; sat 10:00-12:00")
+    sessions = len(calendar.place(syllabus["study_plan"]))
+    print(f"\n📅 Calendar placement ({checks} random calendars checked against a rescan)")
+    record(f"place_sessions[sessions={sessions},timeline]", per_call(lambda: calendar.place(syllabus["study_plan"])))
+    record(f"place_sessions[sessions={sessions},rescan]",
+           per_call(lambda: rescan_sessions(start, calendar.weekly, (), syllabus["study_plan"]), repeat=1))
+
+    grid = [builder._get_syllabus(topic, hours, "beginner")
+            for topic in TOPIC_KNOWLEDGE for hours in range(1, 101)] * (plans // (len(TOPIC_KNOWLEDGE) * 100))
+    with open(os.devnull, "w", encoding="utf-8", newline="") as devnull:
+        record(f"write_ics[plans={len(grid)}]", timed(lambda: write_ics(grid, devnull, calendar)))
+
+def compare(baseline: dict, results: dict, tolerance: float) -> list:
+    """Print the change against a baseline and return the names that got slower"""
+    print(f"\n📊 Compared with baseline (tolerance ±{tolerance:.0%})")
+    print(f"{'benchmark':<44} {'baseline ms':>12} {'now ms':>12} {'change':>8}")
+    regressions = []
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if not before:
+            print(f"{name:<44} {'-':>12} {seconds * 1000:>12.4f} {'new':>8}")
+            continue
+        change = seconds / before - 1
+        flag = ""
+        if change > tolerance:
+            flag = " ⚠️"
+            regressions.append(name)
+        elif change < -tolerance / (1 + tolerance):
+            flag = " 🚀"
+        print(f"{name:<44} {before * 1000:>12.4f} {seconds * 1000:>12.4f} {change:>+8.0%}{flag}")
+    return regressions
+
+CURRENT = None  # Name of the benchmark being run
+
+def run_benchmark(name: str):
+    """Run one benchmark, noting which timings it records"""
+    global CURRENT
+    CURRENT = name
+    try:
+        BENCHMARKS[name]()
+    finally:
+        CURRENT = None
+
+BENCHMARKS = {
+    "resolver": bench_resolver,
+    "batch": bench_batch,
+    "allocator": bench_allocator,
+    "render": bench_render,
+    "export": bench_export,
+    "storage": bench_storage,
+    "lookup": bench_lookup,
+    "progress": bench_progress,
+    "pipeline": bench_pipeline,
+    "startup": bench_startup,
+    "memory": bench_memory,
+    "kernel": bench_kernel,
+    "threads": bench_threads,
+    "replan": bench_replan,
+    "index": bench_index,
+    "calendar": bench_calendar,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Study Assistant benchmarks")
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--json", help="write the recorded timings to this file")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store the timings as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown before flagging")
+    parser.add_argument("--confirm", type=int, default=2,
+                        help="re-runs of benchmarks with slow timings before they count as regressions")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    for name in args.names or list(BENCHMARKS):
+        run_benchmark(name)
+
+    regressions = []
+    if RESULTS and not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(baseline, RESULTS, args.tolerance)
+        # One slow run on a busy machine is noise; a regression is slow every time
+        for attempt in range(args.confirm):
+            if not regressions:
+                break
+            suspects = list(dict.fromkeys(SOURCES[name] for name in regressions))
+            print(f"\n🔁 Re-running {', '.join(suspects)} to confirm ({attempt + 1}/{args.confirm})")
+            for name in suspects:
+                run_benchmark(name)
+            regressions = compare(baseline, {name: RESULTS[name] for name in regressions}, args.tolerance)
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": RESULTS
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if RESULTS and args.save_baseline:
+        baseline = {"results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(report, results={**baseline["results"], **RESULTS})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\n💾 Baseline saved to {args.baseline}")
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} benchmark(s) slower than the baseline")
+        sys.exit(1)
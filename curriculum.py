@@ -0,0 +1,89 @@
+"""
+Immutable curriculum records shared by every syllabus build
+"""
+
+from collections.abc import Mapping
+from types import MappingProxyType
+
+class Module(Mapping):
+    """Frozen study module that still reads like the original dict"""
+
+    __slots__ = ("title", "hours", "topics", "exercises")
+
+    def __init__(self, title: str, hours: int, topics=(), exercises=()):
+        object.__setattr__(self, "title", title)
+        object.__setattr__(self, "hours", hours)
+        object.__setattr__(self, "topics", tuple(topics))
+        object.__setattr__(self, "exercises", tuple(exercises))
+
+    @classmethod
+    def from_dict(cls, data) -> "Module":
+        """Build a module from a knowledge base dict (modules pass through)"""
+        if isinstance(data, cls):
+            return data
+        return cls(data["title"], data["hours"], data.get("topics", ()), data.get("exercises", ()))
+
+    def replace(self, **changes) -> "Module":
+        """Return a copy with some fields changed; the other fields are shared"""
+        if all(getattr(self, name) == value for name, value in changes.items()):
+            return self
+        module = object.__new__(Module)
+        for name in self.__slots__:
+            value = changes[name] if name in changes else getattr(self, name)
+            if name in ("topics", "exercises"):
+                value = tuple(value)
+            object.__setattr__(module, name, value)
+        return module
+
+    def to_dict(self) -> dict:
+        """Convert back to a plain dict (e.g. for JSON)"""
+        return {
+            "title": self.title,
+            "hours": self.hours,
+            "topics": list(self.topics),
+            "exercises": list(self.exercises)
+        }
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Module records are immutable, use replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError("Module records are immutable")
+
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __eq__(self, other):
+        if isinstance(other, Module):
+            return self._fields() == other._fields()
+        return Mapping.__eq__(self, other)
+
+    def __hash__(self):
+        return hash(self._fields())
+
+    def __reduce__(self):
+        return (Module, self._fields())
+
+    def __repr__(self):
+        return f"Module(title={self.title!r}, hours={self.hours!r})"
+
+    def _fields(self) -> tuple:
+        return (self.title, self.hours, self.topics, self.exercises)
+
+def freeze_knowledge(knowledge) -> MappingProxyType:
+    """Convert a knowledge entry to a read-only mapping of modules and tuples"""
+    if isinstance(knowledge, MappingProxyType):
+        return knowledge
+    frozen = dict(knowledge)
+    frozen["modules"] = tuple(Module.from_dict(module) for module in knowledge["modules"])
+    frozen["prerequisites"] = tuple(knowledge.get("prerequisites", ()))
+    frozen["resources"] = tuple(knowledge.get("resources", ()))
+    return MappingProxyType(frozen)
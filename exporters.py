@@ -0,0 +1,322 @@
+"""
+Machine-readable syllabus export: JSON Lines, CSV and a compact binary format
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import struct
+
+from curriculum import Module
+
+BINARY_MAGIC = b"SYLB\x01"
+CSV_MODULE_FIELDS = ["plan", "topic", "description", "total_hours", "level", "prerequisites",
+                     "resources", "module", "title", "hours", "topics", "exercises", "weeks"]
+CSV_WEEK_FIELDS = ["plan", "topic", "level", "total_hours", "week", "hours", "modules"]
+
+def syllabus_to_dict(syllabus: dict) -> dict:
+    """Convert a syllabus to plain JSON-ready data"""
+    data = dict(syllabus)
+    data["prerequisites"] = list(syllabus["prerequisites"])
+    data["resources"] = list(syllabus["resources"])
+    data["modules"] = [Module.from_dict(module).to_dict() for module in syllabus["modules"]]
+    data["study_plan"] = [
+        dict(week, modules=[dict(part) for part in week["modules"]])
+        for week in syllabus["study_plan"]
+    ]
+    return data
+
+def syllabus_from_dict(data: dict) -> dict:
+    """Convert plain data back into a syllabus with immutable modules"""
+    syllabus = dict(data)
+    syllabus["prerequisites"] = tuple(data["prerequisites"])
+    syllabus["resources"] = tuple(data["resources"])
+    syllabus["modules"] = tuple(Module.from_dict(module) for module in data["modules"])
+    return syllabus
+
+# JSON Lines
+
+def write_jsonl(syllabi, f):
+    """Write syllabi to a text file, one JSON object per line"""
+    for syllabus in syllabi:
+        f.write(json.dumps(syllabus_to_dict(syllabus), ensure_ascii=False, separators=(",", ":")))
+        f.write("\n")
+
+def read_jsonl(f):
+    """Yield syllabi from a JSON Lines text file"""
+    for line in f:
+        if line.strip():
+            yield syllabus_from_dict(json.loads(line))
+
+# CSV
+
+def write_csv(syllabi, f, rows: str = "modules", header: bool = True, start: int = 0):
+    """
+    Write syllabi as CSV with one row per module (rows="modules", loadable)
+    or one row per week (rows="weeks", export only). List cells hold JSON.
+    """
+    if rows not in ("modules", "weeks"):
+        raise ValueError("rows must be 'modules' or 'weeks'")
+    writer = csv.writer(f)
+    if header:
+        writer.writerow(CSV_MODULE_FIELDS if rows == "modules" else CSV_WEEK_FIELDS)
+
+    for plan, syllabus in enumerate(syllabi, start):
+        if rows == "weeks":
+            for week in syllabus["study_plan"]:
+                parts = [[part["title"], part["hours"]] for part in week["modules"]]
+                writer.writerow([plan, syllabus["topic"], syllabus["level"], syllabus["total_hours"],
+                                 week["week"], week["hours"], _json_cell(parts)])
+            continue
+
+        # Weekly parts are stored with their module so the plan can be rebuilt
+        weeks = [[] for _ in syllabus["modules"]]
+        for week in syllabus["study_plan"]:
+            for part in week["modules"]:
+                weeks[part["module"]].append([week["week"], part["hours"], part["title"]])
+        for i, module in enumerate(syllabus["modules"]):
+            writer.writerow([plan, syllabus["topic"], syllabus["description"], syllabus["total_hours"],
+                             syllabus["level"], _json_cell(syllabus["prerequisites"]),
+                             _json_cell(syllabus["resources"]), i, module["title"], module["hours"],
+                             _json_cell(module["topics"]), _json_cell(module["exercises"]),
+                             _json_cell(weeks[i])])
+
+def read_csv(f):
+    """Yield syllabi from a CSV file written with rows="modules\""""
+    rows = []
+    for row in csv.DictReader(f):
+        # Every plan starts again at module 0 (plan ids restart in appended files)
+        if rows and row["module"] == "0":
+            yield _syllabus_from_rows(rows)
+            rows = []
+        rows.append(row)
+    if rows:
+        yield _syllabus_from_rows(rows)
+
+def _syllabus_from_rows(rows: list) -> dict:
+    first = rows[0]
+    weeks = {}
+    modules = []
+    for row in rows:
+        module_id = int(row["module"])
+        modules.append(Module(row["title"], int(row["hours"]), json.loads(row["topics"]),
+                              json.loads(row["exercises"])))
+        for week, hours, title in json.loads(row["weeks"]):
+            weeks.setdefault(week, []).append({"module": module_id, "title": title, "hours": hours})
+    return {
+        "topic": first["topic"],
+        "description": first["description"],
+        "total_hours": int(first["total_hours"]),
+        "level": first["level"],
+        "prerequisites": tuple(json.loads(first["prerequisites"])),
+        "resources": tuple(json.loads(first["resources"])),
+        "modules": tuple(modules),
+        "study_plan": [
+            {"week": week, "modules": parts, "hours": sum(part["hours"] for part in parts)}
+            for week, parts in sorted(weeks.items())
+        ]
+    }
+
+def _json_cell(values) -> str:
+    return json.dumps(list(values), ensure_ascii=False)
+
+# Compact binary: each record is a per-record string table plus uint16 fields
+
+def pack_syllabus(syllabus: dict) -> bytes:
+    """Pack a syllabus into a length-prefixed binary record"""
+    strings = {}
+
+    def ref(text: str) -> int:
+        return strings.setdefault(text, len(strings))
+
+    def refs(values) -> list:
+        return [len(values)] + [ref(value) for value in values]
+
+    fields = [ref(syllabus["topic"]), ref(syllabus["description"]), syllabus["total_hours"],
+              ref(syllabus["level"])]
+    fields += refs(syllabus["prerequisites"])
+    fields += refs(syllabus["resources"])
+    fields.append(len(syllabus["modules"]))
+    for module in syllabus["modules"]:
+        fields += [ref(module["title"]), module["hours"]]
+        fields += refs(module["topics"])
+        fields += refs(module["exercises"])
+    fields.append(len(syllabus["study_plan"]))
+    for week in syllabus["study_plan"]:
+        fields += [week["week"], week["hours"], len(week["modules"])]
+        for part in week["modules"]:
+            fields += [part["module"], ref(part["title"]), part["hours"]]
+
+    try:
+        table = bytearray(struct.pack("<H", len(strings)))
+        for text in strings:
+            encoded = text.encode("utf-8")
+            table += struct.pack("<H", len(encoded)) + encoded
+        body = bytes(table) + struct.pack(f"<I{len(fields)}H", len(fields), *fields)
+    except struct.error:
+        raise ValueError(f"syllabus '{syllabus['topic']}' does not fit the binary format: "
+                         f"{_out_of_range(syllabus, strings)}") from None
+    return struct.pack("<I", len(body)) + body
+
+def _out_of_range(syllabus: dict, strings: dict) -> str:
+    """Describe the first value of a syllabus that is not a uint16 (0-65535) in the binary format"""
+    def values():
+        yield "total_hours", syllabus["total_hours"]
+        yield "number of distinct strings", len(strings)
+        for text in strings:
+            yield f"UTF-8 length of {text[:30]!r}", len(text.encode("utf-8"))
+        yield "number of prerequisites", len(syllabus["prerequisites"])
+        yield "number of resources", len(syllabus["resources"])
+        yield "number of modules", len(syllabus["modules"])
+        for i, module in enumerate(syllabus["modules"]):
+            yield f"hours of module {i}", module["hours"]
+            yield f"number of topics of module {i}", len(module["topics"])
+            yield f"number of exercises of module {i}", len(module["exercises"])
+        yield "number of weeks", len(syllabus["study_plan"])
+        for week in syllabus["study_plan"]:
+            yield "week number", week["week"]
+            yield f"hours of week {week['week']}", week["hours"]
+            yield f"number of parts in week {week['week']}", len(week["modules"])
+            for part in week["modules"]:
+                yield f"module id in week {week['week']}", part["module"]
+                yield f"hours of {part['title']!r} in week {week['week']}", part["hours"]
+
+    for name, value in values():
+        if not isinstance(value, int) or not 0 <= value <= 0xFFFF:
+            return f"{name} is {value!r}, but it must be a whole number from 0 to 65535"
+    return "a value is not a whole number from 0 to 65535"
+
+def unpack_syllabus(record: bytes) -> dict:
+    """Unpack a record body written by pack_syllabus (without its length prefix)"""
+    (count,) = struct.unpack_from("<H", record)
+    offset = 2
+    strings = []
+    for _ in range(count):
+        (length,) = struct.unpack_from("<H", record, offset)
+        offset += 2
+        strings.append(record[offset:offset + length].decode("utf-8"))
+        offset += length
+    (field_count,) = struct.unpack_from("<I", record, offset)
+    fields = iter(struct.unpack_from(f"<{field_count}H", record, offset + 4))
+
+    def text() -> str:
+        return strings[next(fields)]
+
+    def texts() -> tuple:
+        return tuple(strings[next(fields)] for _ in range(next(fields)))
+
+    syllabus = {
+        "topic": text(),
+        "description": text(),
+        "total_hours": next(fields),
+        "level": text(),
+        "prerequisites": texts(),
+        "resources": texts()
+    }
+    modules = []
+    for _ in range(next(fields)):
+        title, hours = text(), next(fields)
+        modules.append(Module(title, hours, texts(), texts()))
+    syllabus["modules"] = tuple(modules)
+    plan = []
+    for _ in range(next(fields)):
+        week, hours = next(fields), next(fields)
+        parts = []
+        for _ in range(next(fields)):
+            module_id = next(fields)
+            parts.append({"module": module_id, "title": text(), "hours": next(fields)})
+        plan.append({"week": week, "modules": parts, "hours": hours})
+    syllabus["study_plan"] = plan
+    return syllabus
+
+def write_binary(syllabi, f, header: bool = True):
+    """Write syllabi to a binary file"""
+    if header:
+        f.write(BINARY_MAGIC)
+    for syllabus in syllabi:
+        f.write(pack_syllabus(syllabus))
+
+def read_binary(f):
+    """Yield syllabi from a binary file"""
+    if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+        raise ValueError("not a binary syllabus file")
+    while True:
+        prefix = f.read(4)
+        if not prefix:
+            return
+        (length,) = struct.unpack("<I", prefix)
+        yield unpack_syllabus(f.read(length))
+
+# Bulk files
+
+FORMATS = ("jsonl", "csv", "binary")
+
+class SyllabusWriter:
+    """Append many syllabi to one file with buffered (optionally gzip) output"""
+
+    def __init__(self, path: str, format: str = "jsonl", compress: bool = False,
+                 buffer_size: int = 1024 * 1024):
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+        self.path = path
+        self.format = format
+        self.count = 0
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._raw = open(path, "ab", buffering=buffer_size)
+        # Compressed writers append a gzip member; readers see one stream
+        self._file = gzip.GzipFile(fileobj=self._raw, mode="ab") if compress else self._raw
+        if format == "binary":
+            self._stream = self._file
+            if new_file:
+                self._stream.write(BINARY_MAGIC)
+        else:
+            self._stream = io.TextIOWrapper(self._file, encoding="utf-8", newline="")
+            if format == "csv" and new_file:
+                csv.writer(self._stream).writerow(CSV_MODULE_FIELDS)
+
+    def write(self, syllabus: dict):
+        """Append one syllabus"""
+        self.write_many([syllabus])
+
+    def write_many(self, syllabi):
+        """Append many syllabi"""
+        syllabi = list(syllabi)
+        if self.format == "jsonl":
+            write_jsonl(syllabi, self._stream)
+        elif self.format == "csv":
+            write_csv(syllabi, self._stream, header=False, start=self.count)
+        else:
+            write_binary(syllabi, self._stream, header=False)
+        self.count += len(syllabi)
+
+    def close(self):
+        """Flush and close the file"""
+        if self._stream is not self._file:
+            self._stream.flush()
+            self._stream.detach()
+        if self._file is not self._raw:
+            self._file.close()
+        self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_syllabi(path: str, format: str = "jsonl"):
+    """Yield syllabi from a file written by SyllabusWriter (gzip is detected)"""
+    with open(path, "rb") as raw:
+        compressed = raw.read(2) == b"\x1f\x8b"
+    opener = gzip.open if compressed else open
+    if format == "binary":
+        with opener(path, "rb") as f:
+            yield from read_binary(f)
+        return
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        if format == "csv":
+            yield from read_csv(f)
+        else:
+            yield from read_jsonl(f)
@@ -0,0 +1,206 @@
+"""
+Opt-in instrumentation: stage timers, counters, cache statistics and profiling
+Enable with environment variables before the modules are imported:
+  STUDY_METRICS=1                      time stages and count lookups
+  STUDY_METRICS_FILE=metrics.prom      write a snapshot at exit (.prom -> Prometheus text, else JSON)
+  STUDY_PROFILE=cprofile|tracemalloc   capture profiles of whole study sessions
+  STUDY_PROFILE_DIR=profiles           where captures are written (default: current directory)
+When disabled the decorators return the functions unchanged, so they cost nothing.
+"""
+
+import atexit
+import functools
+import itertools
+import os
+import threading
+import time
+import weakref
+
+ENABLED = os.environ.get("STUDY_METRICS", "").lower() not in ("", "0", "false", "no")
+PROFILE = os.environ.get("STUDY_PROFILE", "").lower()
+PROFILE_DIR = os.environ.get("STUDY_PROFILE_DIR", ".")
+METRICS_FILE = os.environ.get("STUDY_METRICS_FILE")
+
+_lock = threading.Lock()
+_timers = {}      # stage -> [calls, total seconds, max seconds]
+_counters = {}    # (name, labels) -> value
+_caches = {}      # cache name -> weak references to caches with a stats() method
+_collectors = {}  # cache name -> function returning stats() of the current cache
+_captures = itertools.count(1)
+
+def stage(name: str):
+    """Decorator timing every call of a function as a pipeline stage"""
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+def counted(name: str, **labels):
+    """Decorator counting the calls of a function"""
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            increment(name, **labels)
+            return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def profiled(func):
+    """Decorator capturing a cProfile or tracemalloc profile of each call (see STUDY_PROFILE)"""
+    if PROFILE == "cprofile":
+        import cProfile
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(func, *args, **kwargs)
+            finally:
+                profile.dump_stats(_capture_path(func.__name__, "prof"))
+        return wrapper
+
+    if PROFILE == "tracemalloc":
+        import tracemalloc
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start(25)
+            if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+                tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                after = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+                if started:
+                    tracemalloc.stop()
+                with open(_capture_path(func.__name__, "txt"), "w", encoding="utf-8") as f:
+                    f.write(f"current {current} bytes, peak {peak} bytes\n\n")
+                    for difference in after.compare_to(before, "lineno")[:25]:
+                        f.write(f"{difference}\n")
+        return wrapper
+
+    return func
+
+def observe(name: str, seconds: float):
+    """Add one timed call to a stage"""
+    with _lock:
+        timer = _timers.get(name)
+        if timer is None:
+            _timers[name] = [1, seconds, seconds]
+        else:
+            timer[0] += 1
+            timer[1] += seconds
+            if seconds > timer[2]:
+                timer[2] = seconds
+
+def increment(name: str, value: float = 1, **labels):
+    """Add to a counter"""
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def track_cache(name: str, cache):
+    """Report a cache's stats() under name (live caches of the same name are summed)"""
+    with _lock:
+        _caches.setdefault(name, []).append(weakref.ref(cache))
+
+def collect_cache(name: str, stats):
+    """Report stats() of whichever cache stats currently returns the statistics of"""
+    with _lock:
+        _collectors[name] = stats
+
+def snapshot() -> dict:
+    """Get every metric as plain data"""
+    with _lock:
+        timers = {name: {"calls": calls, "total_seconds": total, "max_seconds": longest}
+                  for name, (calls, total, longest) in sorted(_timers.items())}
+        counters = [{"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(_counters.items())]
+        for name, references in _caches.items():
+            references[:] = [reference for reference in references if reference() is not None]
+        caches = {name: [reference() for reference in references] for name, references in _caches.items()}
+        collectors = dict(_collectors)
+
+    cache_stats = {}
+    for name, live in caches.items():
+        totals = {}
+        for cache in live:
+            if cache is not None:
+                for field, value in cache.stats().items():
+                    totals[field] = totals.get(field, 0) + value
+        cache_stats[name] = totals
+    for name, stats in collectors.items():
+        cache_stats[name] = stats()
+    return {"enabled": ENABLED, "timers": timers, "counters": counters, "caches": cache_stats}
+
+def to_json() -> str:
+    """Snapshot as JSON"""
+    import json
+    return json.dumps(snapshot(), indent=2, sort_keys=True)
+
+def to_prometheus() -> str:
+    """Snapshot in the Prometheus text exposition format"""
+    data = snapshot()
+    lines = [
+        "# HELP study_stage_seconds Time spent in each pipeline stage",
+        "# TYPE study_stage_seconds summary",
+    ]
+    for name, timer in data["timers"].items():
+        lines.append(f'study_stage_seconds_count{{stage="{name}"}} {timer["calls"]}')
+        lines.append(f'study_stage_seconds_sum{{stage="{name}"}} {timer["total_seconds"]:.9f}')
+    lines += ["# HELP study_stage_max_seconds Slowest call of each pipeline stage",
+              "# TYPE study_stage_max_seconds gauge"]
+    for name, timer in data["timers"].items():
+        lines.append(f'study_stage_max_seconds{{stage="{name}"}} {timer["max_seconds"]:.9f}')
+
+    names = sorted({counter["name"] for counter in data["counters"]})
+    for name in names:
+        lines.append(f"# TYPE study_{name}_total counter")
+        for counter in data["counters"]:
+            if counter["name"] == name:
+                labels = ",".join(f'{key}="{value}"' for key, value in counter["labels"].items())
+                lines.append(f"study_{name}_total{{{labels}}} {counter['value']}" if labels
+                             else f"study_{name}_total {counter['value']}")
+
+    fields = sorted({field for stats in data["caches"].values() for field in stats})
+    for field in fields:
+        lines.append(f"# TYPE study_cache_{field} gauge")
+        for name, stats in sorted(data["caches"].items()):
+            if field in stats:
+                lines.append(f'study_cache_{field}{{cache="{name}"}} {stats[field]}')
+    return "\n".join(lines) + "\n"
+
+def write_snapshot(path: str):
+    """Write a snapshot; .prom and .txt files get Prometheus text, others JSON"""
+    text = to_prometheus() if path.endswith((".prom", ".txt")) else to_json()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def reset():
+    """Drop all timers and counters (cache statistics belong to the caches)"""
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+def _capture_path(name: str, suffix: str) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    return os.path.join(PROFILE_DIR, f"{name}-{os.getpid()}-{next(_captures)}.{suffix}")
+
+if ENABLED and METRICS_FILE:
+    atexit.register(write_snapshot, METRICS_FILE)
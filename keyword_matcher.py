@@ -0,0 +1,88 @@
+"""
+Aho-Corasick keyword matcher for the explanation and FAQ lookup tables
+"""
+
+from collections import deque
+
+class KeywordMatcher:
+    """
+    Find which keys of a table occur in a text in one pass, however large the
+    table. Like the original `for key in table: if key in text` loops, the
+    earliest key in table order wins. Tables with fewer than scan_below keys
+    keep using those loops, which are faster than the automaton for them.
+    """
+
+    scan_below = 64
+
+    def __init__(self, table: dict, scan_below: int = None):
+        if scan_below is not None:
+            self.scan_below = scan_below
+        self.values = list(table.values())
+        self._items = None     # (lowercased key, value) pairs, for tables small enough to scan
+        if len(table) < self.scan_below:
+            self._items = [(key.lower(), value) for key, value in table.items()]
+            return
+        self._children = [{}]  # Trie edges per node
+        self._fail = [0]
+        self._best = [None]    # Lowest key rank ending at a node or along its fail chain
+        for rank, key in enumerate(table):
+            self._insert(key.lower(), rank)
+        self._link()
+
+    def __len__(self):
+        return len(self.values)
+
+    def find(self, text: str, default=None):
+        """Get the value of the earliest table key found in text"""
+        if self._items is not None:
+            text = text.lower()
+            for key, value in self._items:
+                if key in text:
+                    return value
+            return default
+
+        children = self._children
+        fail = self._fail
+        best = self._best
+        node = 0
+        found = None
+        for char in text.lower():
+            while node and char not in children[node]:
+                node = fail[node]
+            node = children[node].get(char, 0)
+            rank = best[node]
+            if rank is not None and (found is None or rank < found):
+                found = rank
+                if found == 0:
+                    break
+        return default if found is None else self.values[found]
+
+    def _insert(self, key: str, rank: int):
+        node = 0
+        for char in key:
+            child = self._children[node].get(char)
+            if child is None:
+                child = len(self._children)
+                self._children[node][char] = child
+                self._children.append({})
+                self._fail.append(0)
+                self._best.append(None)
+            node = child
+        if self._best[node] is None:
+            self._best[node] = rank
+
+    def _link(self):
+        # Breadth-first, so every fail target is final before it is used
+        queue = deque(self._children[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._children[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._children[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._children[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                inherited = self._best[self._fail[child]]
+                if inherited is not None and (self._best[child] is None or inherited < self._best[child]):
+                    self._best[child] = inherited
+                queue.append(child)
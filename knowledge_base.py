@@ -2,6 +2,14 @@
 Knowledge base with real curriculum data for common CS topics
 """
 
+import threading
+
+import instrumentation
+from curriculum import freeze_knowledge
+from instrumentation import counted, stage
+from storage import DictBackend, LRUCache
+from topic_resolver import TopicResolver
+
 TOPIC_KNOWLEDGE = {
     "operating systems": {
         "description": "Software that manages computer hardware and software resources",
@@ -100,21 +108,205 @@ TOPIC_KNOWLEDGE = {
     }
 }
 
-def get_topic_knowledge(topic: str):
-    """Get knowledge for a specific topic"""
+# Entries are shared by every syllabus build, so store them read-only;
+# replace an entry with add_topic (rather than editing it) to change a topic.
+# This dict is the default storage backend; set_backend switches to another one.
+TOPIC_KNOWLEDGE = {topic: freeze_knowledge(knowledge) for topic, knowledge in TOPIC_KNOWLEDGE.items()}
+
+_backend = DictBackend(TOPIC_KNOWLEDGE)
+_loaded = LRUCache(1024)  # Frozen entries loaded from the backend
+_resolver = None
+_resolver_revision = None
+_resolver_lock = threading.Lock()  # Threads wait for one rebuild instead of each indexing the catalog
+_index = None                      # Semantic TopicIndex for topics nothing else matches
+_index_lock = threading.Lock()
+_semantic = None                   # Build _index from the catalog when there is none (None: small catalogs only)
+_matches = LRUCache(1024)          # Lowercased topic -> closest (key, similarity) in the index
+_listeners = []
+
+SEMANTIC_CUTOFF = 0.2        # Least cosine similarity for using a catalog topic for an unknown one
+SEMANTIC_AUTO_TOPICS = 1000  # Largest catalog indexed for semantic matching unless it is enabled explicitly
+
+if instrumentation.ENABLED:
+    instrumentation.collect_cache("knowledge_base", lambda: _loaded.stats())
+
+def set_backend(backend, cache_size: int = 1024):
+    """Serve topics from another storage backend (see storage.py)"""
+    global _backend, _loaded, _resolver, _index
+    _backend = backend
+    _loaded = LRUCache(cache_size)
+    _resolver = None
+    _index = None
+    _matches.clear()
+
+def get_backend():
+    """Get the storage backend topics are served from"""
+    return _backend
+
+def get_resolver() -> TopicResolver:
+    """Get the topic index, rebuilding it if the knowledge base changed"""
+    global _resolver, _resolver_revision
+    resolver, revision = _resolver, _backend.revision()
+    if resolver is not None and _resolver_revision == revision:
+        return resolver
+    with _resolver_lock:
+        if _resolver is None or _resolver_revision != revision:
+            _resolver = TopicResolver(_backend.keys())
+            _resolver_revision = revision
+        return _resolver
+
+def set_resolver(resolver: TopicResolver):
+    """Resolve topics with a prebuilt TopicResolver of the current backend's keys (e.g. TopicResolver.load)"""
+    global _resolver, _resolver_revision
+    with _resolver_lock:
+        _resolver = resolver
+        _resolver_revision = _backend.revision()
+
+def get_topic_index():
+    """
+    Get the semantic topic index: the one set with set_topic_index, or one
+    built from the whole catalog on first use. By default only catalogs of
+    up to SEMANTIC_AUTO_TOPICS topics (such as the built-in one) are indexed,
+    as building reads every entry and would undo lazy loading for large
+    ones; enable_semantic_matching overrides this. Returns None otherwise.
+    """
+    global _index
+    index = _index
+    if index is not None:
+        return index
+    if not (_semantic if _semantic is not None else len(_backend) <= SEMANTIC_AUTO_TOPICS):
+        return None
+    with _index_lock:
+        if _index is None:
+            from topic_index import TopicIndex  # Only needed once a topic is not in the catalog
+            _index = TopicIndex.build((key, _backend.get(key)) for key in _backend.keys())
+        return _index
+
+def set_topic_index(index):
+    """Match unknown topics with a prebuilt TopicIndex (e.g. TopicIndex.load), or None for no index"""
+    global _index
+    _index = index
+    _matches.clear()
+
+def enable_semantic_matching(enabled: bool = True):
+    """
+    Build a topic index from the catalog when an unknown topic needs one and
+    none was set (False never builds one, None restores the size-based default)
+    """
+    global _semantic
+    _semantic = enabled
+    _matches.clear()
+
+def get_state() -> tuple:
+    """Picklable catalog state (backend, topic index, semantic matching) for worker processes"""
+    return _backend, _index, _semantic
+
+def set_state(state: tuple):
+    """Serve topics as in the process get_state was called in"""
+    backend, index, semantic = state
+    set_backend(backend)
+    set_topic_index(index)
+    enable_semantic_matching(semantic)
+
+def match_topic(topic: str, cutoff: float = None):
+    """Get the catalog key semantically closest to a topic, or None if none is close enough"""
+    index = get_topic_index()
+    if index is None:
+        return None
+    topic_lower = topic.lower()
+    best = _matches.get(topic_lower)
+    if best is None:
+        matches = index.search(topic_lower, 1)
+        best = matches[0] if matches else (None, 0.0)
+        _matches.put(topic_lower, best)
+    key, similarity = best
+    if key is not None and similarity >= (SEMANTIC_CUTOFF if cutoff is None else cutoff):
+        return key
+    return None
+
+@stage("resolve_topic")
+def resolve_topic(topic: str, fuzzy: bool = True):
+    """Get the knowledge base key for a topic, or None for unknown topics"""
     topic_lower = topic.lower()
     
     # Check for exact matches
-    if topic_lower in TOPIC_KNOWLEDGE:
-        return TOPIC_KNOWLEDGE[topic_lower]
+    if _loaded.get(topic_lower) is not None or topic_lower in _backend:
+        return topic_lower
     
-    # Check for partial matches
-    for key in TOPIC_KNOWLEDGE:
-        if key in topic_lower or topic_lower in key:
-            return TOPIC_KNOWLEDGE[key]
+    # Check for partial and fuzzy matches
+    return get_resolver().resolve(topic, fuzzy)
+
+def add_topic(topic: str, knowledge: dict):
+    """Add a topic to the knowledge base, or replace an existing one"""
+    global _resolver_revision
+    key = topic.lower()
+    knowledge = freeze_knowledge(knowledge)
+    _backend.put(key, knowledge)
+    _loaded.put(key, knowledge)
+    if _resolver is not None and _resolver_revision is not None:
+        _resolver.add(key)
+        _resolver_revision = _backend.revision()
+    if _index is not None:
+        _index.add(key, knowledge)
+        _matches.clear()
+    for callback in list(_listeners):
+        callback(key)
+
+def subscribe(callback):
+    """Call callback(key) whenever add_topic adds or replaces a topic; returns callback"""
+    _listeners.append(callback)
+    return callback
+
+def unsubscribe(callback):
+    """Stop calling a callback passed to subscribe"""
+    try:
+        _listeners.remove(callback)
+    except ValueError:
+        pass
+
+@stage("get_catalog_entry")
+def get_catalog_entry(topic: str):
+    """Get the stored knowledge entry for a topic, or None for unknown topics"""
+    key = resolve_topic(topic)
+    if key is None:
+        return None
+    
+    # Load the topic on first access and keep it in the bounded cache
+    knowledge = _loaded.get(key)
+    if knowledge is None:
+        knowledge = _backend.get(key)
+        if knowledge is None:
+            return None
+        knowledge = freeze_knowledge(knowledge)
+        _loaded.put(key, knowledge)
+    return knowledge
+
+def find_entry(topic: str):
+    """Get the catalog entry a topic resolves to by name or, failing that, by meaning; None if neither"""
+    knowledge = get_catalog_entry(topic)
+    if knowledge is not None:
+        return knowledge
+    
+    # Use the semantically closest catalog topic ("deep learning" -> machine learning)
+    key = match_topic(topic)
+    if key is not None:
+        return get_catalog_entry(key)
+    return None
+
+@stage("get_topic_knowledge")
+def get_topic_knowledge(topic: str):
+    """Get knowledge for a specific topic"""
+    knowledge = find_entry(topic)
+    if knowledge is not None:
+        return knowledge
     
     # Return generic template for unknown topics
-    return {
+    return _generic_knowledge(topic)
+
+@counted("generic_templates")
+def _generic_knowledge(topic: str):
+    """Generic knowledge template for a topic missing from the catalog"""
+    return freeze_knowledge({
         "description": f"Study of {topic}",
         "modules": [
             {
@@ -138,4 +330,4 @@ def get_topic_knowledge(topic: str):
         ],
         "prerequisites": ["Basic knowledge in the field"],
         "resources": ["Online courses", "Textbooks", "Documentation"]
-    }
\ No newline at end of file
+    })
\ No newline at end of file
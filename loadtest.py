@@ -0,0 +1,103 @@
+"""
+Load test for the HTTP service: many concurrent guided sessions
+Run with: python loadtest.py [--sessions 1000] [--host HOST --port PORT]
+Without --port an in-process server is started on a free port.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import time
+
+from knowledge_base import TOPIC_KNOWLEDGE
+from server import start_server
+
+async def request(reader, writer, method: str, path: str, body: dict = None) -> dict:
+    """Send one keep-alive request and read the JSON response"""
+    payload = json.dumps(body or {}).encode("utf-8")
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    data = json.loads(await reader.readexactly(length))
+    if status != 200:
+        raise RuntimeError(f"{method} {path} -> {status}: {data}")
+    return data
+
+async def run_session(host: str, port: int, rng: random.Random, latencies: list, start_gate: asyncio.Event):
+    """Create a session and walk through every module"""
+    reader, writer = await asyncio.open_connection(host, port)
+    await start_gate.wait()
+    try:
+        body = {"topic": rng.choice(list(TOPIC_KNOWLEDGE)), "hours": rng.randint(1, 100),
+                "level": rng.choice(["beginner", "intermediate", "advanced"])}
+        started = time.perf_counter()
+        session = await request(reader, writer, "POST", "/sessions", body)
+        latencies.append(time.perf_counter() - started)
+        while True:
+            started = time.perf_counter()
+            step = await request(reader, writer, "POST", f"/sessions/{session['session']}/next")
+            latencies.append(time.perf_counter() - started)
+            if step["finished"]:
+                break
+    finally:
+        writer.close()
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+async def main(sessions: int, host: str, port: int):
+    # Every session holds a connection; make sure there are enough descriptors
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = sessions * 2 + 64
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, hard), hard))
+
+    server = None
+    if port is None:
+        server = await start_server(host, 0)
+        port = server.sockets[0].getsockname()[1]
+
+    rng = random.Random(0)
+    latencies = []
+    start_gate = asyncio.Event()
+    tasks = [asyncio.create_task(run_session(host, port, random.Random(rng.random()), latencies, start_gate))
+             for _ in range(sessions)]
+    await asyncio.sleep(0.5)  # Let the connections open before the burst
+    started = time.perf_counter()
+    start_gate.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    failures = [result for result in results if isinstance(result, Exception)]
+
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+
+    print(f"🚦 {sessions} concurrent sessions, {len(latencies)} requests in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.0f} req/s), {len(failures)} failed")
+    if latencies:
+        print(f"   p50 {percentile(latencies, 0.50) * 1000:.1f} ms   "
+              f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms   "
+              f"max {max(latencies) * 1000:.1f} ms")
+    if failures:
+        print(f"   first failure: {failures[0]!r}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the study service")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.host, args.port))
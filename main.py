@@ -1,12 +1,156 @@
 """
 Main entry point for the Study Assistant
+Run interactively with: python main.py
+Script one plan with:   python main.py --topic "machine learning" --hours 20 [--output plan.txt]
 """
 
-from study_assistant import StudyAssistant
-from utils import display_banner, validate_input, save_syllabus
+import os
+import sys
+from types import SimpleNamespace
+
+# Modules are imported where they are needed so scripted runs and --help start fast
+
+OPTIONS = {  # option -> (default, metavar, help)
+    "--topic": (None, "TOPIC", "build a plan for this topic without prompts"),
+    "--hours": ("10", "HOURS", "total study hours (1-100, default 10)"),
+    "--level": ("beginner", "LEVEL", "beginner, intermediate or advanced"),
+    "--hours-per-week": ("5", "HOURS", "weekly study hours (default 5)"),
+    "--format": ("text", "FORMAT", "plan output format: text, json or ics (calendar events)"),
+    "--output": (None, "PATH", "write the plan to this file instead of stdout"),
+    "--start": (None, "DATE", "first study day for ics output, YYYY-MM-DD (default today)"),
+    "--availability": ("mon-fri 18:00-20:00", "WINDOWS",
+                       "weekly study times for ics output, e.g. 'mon-fri 18:00-20:00; sat 10:00-14:00'"),
+    "--blackouts": ("", "DATES", "comma-separated YYYY-MM-DD dates without study time (ics output)"),
+    "--catalog": (os.environ.get("STUDY_CATALOG"), "PATH",
+                  "catalog snapshot, SQLite database or JSON directory (default: $STUDY_CATALOG)"),
+    "--build-snapshot": (None, "PATH", "write a snapshot of the catalog for fast startup and exit"),
+}
+
+def main(argv=None):
+    """Run the Study Assistant interactively, or build one plan when --topic is given"""
+    args = parse_args(argv)
+    if args.catalog:
+        import knowledge_base
+        from storage import open_backend
+        knowledge_base.set_backend(open_backend(args.catalog))
+        # Saved with the snapshot by --build-snapshot; both are memory-mapped when a topic first needs them
+        if os.path.exists(args.catalog + ".resolver"):
+            from topic_resolver import TopicResolver
+            knowledge_base.set_resolver(TopicResolver.load(args.catalog + ".resolver"))
+        if os.path.exists(args.catalog + ".index"):
+            from topic_index import TopicIndex
+            knowledge_base.set_topic_index(TopicIndex.load(args.catalog + ".index"))
+    if args.build_snapshot:
+        build_snapshot(args.build_snapshot)
+        return
+    if args.topic is not None:
+        plan_topic(args)
+        return
+
+    while True:
+        study_topic()
+        
+        # Ask if user wants to study another topic
+        another = input("\n📚 Study another topic? (y/n): ").strip().lower()
+        if another != 'y':
+            break
+        print("\n" + "="*50)
+    
+    print("\n👋 Happy learning! Come back anytime you need guidance.")
+    print("="*50)
+
+def parse_args(argv=None) -> SimpleNamespace:
+    """Parse the command line (no arguments starts the interactive assistant)
+
+    A small hand-written parser: argparse imports re and enum, which would
+    double the cold-start time of scripted runs.
+    """
+    args = {name[2:].replace("-", "_"): default for name, (default, _, _) in OPTIONS.items()}
+    argv = list(sys.argv[1:] if argv is None else argv)
+    while argv:
+        option, _, value = argv.pop(0).partition("=")
+        if option in ("-h", "--help"):
+            print(_usage())
+            sys.exit(0)
+        if option not in OPTIONS:
+            _fail(f"unrecognized argument: {option}")
+        if not value:
+            if not argv:
+                _fail(f"argument {option}: expected one argument")
+            value = argv.pop(0)
+        args[option[2:].replace("-", "_")] = value
+    try:
+        args["hours_per_week"] = int(args["hours_per_week"])
+    except ValueError:
+        _fail(f"argument --hours-per-week: invalid int value: {args['hours_per_week']!r}")
+    if args["format"] not in ("text", "json", "ics"):
+        _fail(f"argument --format: invalid choice: {args['format']!r} (choose from 'text', 'json', 'ics')")
+    return SimpleNamespace(**args)
+
+def _usage() -> str:
+    options = [f"{name} {metavar}" for name, (_, metavar, _) in OPTIONS.items()]
+    lines = [f"usage: {os.path.basename(sys.argv[0])} [-h] " + " ".join(f"[{option}]" for option in options),
+             "", "AI Study Assistant: personalized study plans", "", "options:",
+             f"  {'-h, --help':<24}show this help message and exit"]
+    lines += [f"  {option:<24}{text}" for option, (_, _, text) in zip(options, OPTIONS.values())]
+    return "\n".join(lines)
+
+def _fail(message: str):
+    print(f"{_usage().splitlines()[0]}\n{os.path.basename(sys.argv[0])}: error: {message}", file=sys.stderr)
+    sys.exit(2)
+
+def plan_topic(args: SimpleNamespace):
+    """Build one plan quietly and write it to stdout or --output"""
+    from renderer import render_plan_file, write_stream
+    from syllabus_builder import SyllabusBuilder
+    from utils import validate_input
+
+    topic, hours, level = validate_input(args.topic, args.hours, args.level)
+    _, syllabus = next(SyllabusBuilder().create_syllabi([(topic, hours, level, max(1, args.hours_per_week))]))
+    if args.format == "ics":
+        from study_calendar import StudyCalendar
+        try:
+            calendar = StudyCalendar(args.start, args.availability,
+                                     [day.strip() for day in args.blackouts.split(",") if day.strip()])
+        except ValueError as error:
+            _fail(str(error))
+
+    # iCalendar lines end in CRLF already, so they are written untranslated
+    newline = "" if args.format == "ics" else None
+    target = open(args.output, "w", encoding="utf-8", newline=newline) if args.output else sys.stdout
+    try:
+        if args.format == "ics":
+            from study_calendar import write_ics
+            write_ics([syllabus], target, calendar, name=f"Study plan: {topic}")
+        elif args.format == "json":
+            import json
+            from exporters import syllabus_to_dict
+            json.dump(syllabus_to_dict(syllabus), target, ensure_ascii=False)
+            target.write("\n")
+        else:
+            write_stream(render_plan_file(syllabus), target)
+    finally:
+        if args.output:
+            target.close()
+
+def build_snapshot(path: str):
+    """Snapshot the current catalog, its resolver and topic index so later runs can load them lazily"""
+    from knowledge_base import get_backend
+    from storage import SnapshotBackend
+    from topic_index import TopicIndex
+    from topic_resolver import TopicResolver
+
+    backend = get_backend()
+    snapshot = SnapshotBackend.build(path, ((key, backend.get(key)) for key in backend.keys()))
+    TopicResolver(snapshot.keys()).save(path + ".resolver")
+    TopicIndex.build((key, snapshot.get(key)) for key in snapshot.keys()).save(path + ".index")
+    print(f"💾 Snapshot of {len(snapshot)} topics saved to {path} ({snapshot.stamp})")
+
+def study_topic():
+    """Plan, guide and optionally save one topic"""
+    from study_assistant import StudyAssistant
+    from utils import display_banner, validate_input, save_syllabus
 
-def main():
-    """Run the Study Assistant"""
     display_banner()
     
     print("\nWelcome to your personal AI Study Assistant!")
@@ -15,10 +159,14 @@ def main():
     # Get user input
     topic = input("📘 What topic do you want to study? ").strip()
     hours = input("⏱️  How many hours can you dedicate? (default: 10) ").strip()
-    level = input("🎓 Your level? (beginner/intermediate/advanced) [default: beginner] ").strip()
+    level = input("🎓 Your level? (beginner/intermediate/advanced, or 'quiz' to find out) [default: beginner] ").strip()
+    take_quiz = level.lower() == "quiz"
     
     # Validate input
     topic, hours, level = validate_input(topic, hours, level)
+    if take_quiz:
+        from quiz import run_console_quiz
+        level = run_console_quiz(topic)
     
     # Create and run assistant
     assistant = StudyAssistant()
@@ -31,15 +179,6 @@ def main():
         if not filename:
             filename = "study_plan.txt"
         save_syllabus(syllabus, filename)
-    
-    # Ask if user wants to study another topic
-    another = input("\n📚 Study another topic? (y/n): ").strip().lower()
-    if another == 'y':
-        print("\n" + "="*50)
-        main()
-    else:
-        print("\n👋 Happy learning! Come back anytime you need guidance.")
-        print("="*50)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
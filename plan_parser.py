@@ -0,0 +1,181 @@
+"""
+Parser that loads saved text plans (the os_notes layout) back into syllabus dicts
+"""
+
+import mmap
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from curriculum import Module
+
+MODULE_HEADER = re.compile(r"^(\d+)\. (.*) \((\d+) hours\)$")
+HEADER_FIELDS = {"Description": "description", "Total Hours": "total_hours", "Level": "level"}
+
+class PlanParseError(ValueError):
+    """Raised when a file is not a valid saved study plan"""
+
+    def __init__(self, message: str, line: int = None):
+        super().__init__(message if line is None else f"line {line}: {message}")
+        self.line = line
+
+def parse_plan(lines) -> dict:
+    """
+    Rebuild a syllabus from the lines of a saved plan. The text layout does not
+    store prerequisites, resources or the weekly plan, so those come back empty.
+    """
+    syllabus = {
+        "topic": None,
+        "description": "",
+        "total_hours": None,
+        "level": None,
+        "prerequisites": (),
+        "resources": (),
+        "modules": (),
+        "study_plan": []
+    }
+    modules = []
+    module = None
+    section = None  # "topics" or "exercises" inside a module
+    in_modules = False
+
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if number == 1:
+            if not line.startswith("STUDY PLAN: "):
+                raise PlanParseError("missing 'STUDY PLAN:' header", number)
+            syllabus["topic"] = line[len("STUDY PLAN: "):]
+            continue
+        if not line.strip() or (number == 2 and set(line) == {"="}):
+            continue
+
+        if not in_modules:
+            if line == "MODULES:":
+                in_modules = True
+                continue
+            name, _, value = line.partition(": ")
+            if name not in HEADER_FIELDS:
+                raise PlanParseError(f"unexpected line {line!r}", number)
+            syllabus[HEADER_FIELDS[name]] = value
+            continue
+
+        header = MODULE_HEADER.match(line)
+        if header:
+            if module is not None:
+                modules.append(_build_module(module))
+            module = {"title": header.group(2), "hours": int(header.group(3)), "topics": [], "exercises": []}
+            section = None
+        elif module is None:
+            raise PlanParseError(f"expected a module, got {line!r}", number)
+        elif line == "   Topics:":
+            section = "topics"
+        elif line == "   Exercises:":
+            section = "exercises"
+        elif line.startswith("   • ") and section:
+            module[section].append(line[len("   • "):])
+        else:
+            raise PlanParseError(f"unexpected line {line!r}", number)
+
+    if syllabus["topic"] is None:
+        raise PlanParseError("empty file")
+    if module is not None:
+        modules.append(_build_module(module))
+    if syllabus["total_hours"] is None or syllabus["level"] is None:
+        raise PlanParseError("missing 'Total Hours' or 'Level'")
+    try:
+        syllabus["total_hours"] = int(syllabus["total_hours"])
+    except ValueError:
+        raise PlanParseError(f"invalid total hours {syllabus['total_hours']!r}") from None
+    syllabus["modules"] = tuple(modules)
+    return syllabus
+
+def _build_module(data: dict) -> Module:
+    return Module(data["title"], data["hours"], data["topics"], data["exercises"])
+
+def load_plan(path: str) -> dict:
+    """Load one saved plan, parsing it line by line from a memory map"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise PlanParseError("empty file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return parse_plan(_decoded_lines(mapped))
+
+def _decoded_lines(mapped):
+    """Yield the lines of a memory map as text, without copying the whole file"""
+    for number, line in enumerate(iter(mapped.readline, b""), 1):
+        try:
+            yield line.decode("utf-8")
+        except UnicodeDecodeError as error:
+            raise PlanParseError(f"not UTF-8 text ({error.reason})", number) from None
+
+def iter_plan_files(root: str, suffixes=None, onerror=None):
+    """
+    Yield file paths under root, optionally only those with the given
+    suffixes. A directory that cannot be read raises its OSError, or is
+    passed to onerror(error) and skipped (as with os.walk).
+    """
+    for path, error in _walk(root, suffixes):
+        if error is None:
+            yield path
+        elif onerror is None:
+            raise error
+        else:
+            onerror(error)
+
+def _walk(root: str, suffixes=None):
+    """Yield (file path, None) for files and (directory, OSError) for directories that cannot be read"""
+    suffixes = tuple(suffixes) if suffixes else None
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file() and (not suffixes or entry.name.endswith(suffixes)):
+                        yield entry.path, None
+        except OSError as error:
+            yield directory, error
+
+def scan_plans(root: str, suffixes=None, workers: int = None, chunksize: int = 64):
+    """
+    Parse every plan under root, yielding (path, syllabus, error) tuples.
+    Malformed or unreadable files, and directories that cannot be listed,
+    are reported with error set instead of stopping the scan. With workers
+    set, files are parsed in a process pool as the directory walk goes on.
+    """
+    if not workers:
+        for path, error in _walk(root, suffixes):
+            yield _try_load(path) if error is None else (path, None, error)
+        return
+
+    # Keep a bounded number of chunks in flight (results stay in walk order)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        chunk = []
+        for path, error in _walk(root, suffixes):
+            if error is not None:
+                yield path, None, error
+                continue
+            chunk.append(path)
+            if len(chunk) < chunksize:
+                continue
+            pending.append(pool.submit(_load_chunk, chunk))
+            chunk = []
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        if chunk:
+            pending.append(pool.submit(_load_chunk, chunk))
+        while pending:
+            yield from pending.popleft().result()
+
+def _load_chunk(paths: list) -> list:
+    return [_try_load(path) for path in paths]
+
+def _try_load(path: str) -> tuple:
+    try:
+        return path, load_plan(path), None
+    except (OSError, PlanParseError) as error:
+        return path, None, error
@@ -0,0 +1,161 @@
+"""
+Compact, deduplicated storage for generated syllabi
+Strings and modules are interned once, module lists and weekly plans are kept
+as packed id arrays, and whole plans are content-addressed by hash.
+"""
+
+import hashlib
+import sys
+import threading
+from array import array
+
+from curriculum import Module
+
+class PlanStore:
+    """
+    Stores syllabi built by SyllabusBuilder. Identical plans are stored once
+    and reference-counted; interned strings and modules are kept for the
+    life of the store (they are bounded by the catalog, not by the plans).
+    """
+
+    def __init__(self):
+        self._strings = []         # id -> interned string
+        self._string_ids = {}      # string -> id
+        self._modules = []         # id -> canonical Module
+        self._module_ids = {}      # Module -> id
+        self._module_lists = {}    # packed module ids -> shared tuple of Modules
+        self._string_lists = {}    # packed string ids -> shared tuple of strings
+        self._plans = {}           # digest -> (topic, description, total_hours, level, prerequisites,
+                                   #             resources, module list, packed weekly plan)
+        self._references = {}      # digest -> number of put() calls not yet released
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._plans)
+
+    def __contains__(self, digest: str):
+        return digest in self._plans
+
+    def put(self, syllabus: dict) -> str:
+        """Store a syllabus and return its content address"""
+        with self._lock:
+            module_ids = array("I", (self._module_id(module) for module in syllabus["modules"]))
+            packed_modules = module_ids.tobytes()
+            modules = self._module_lists.get(packed_modules)
+            if modules is None:
+                modules = tuple(self._modules[i] for i in module_ids)
+                self._module_lists[packed_modules] = modules
+
+            # Weekly plan: week, part count, then (module, title, hours) per part
+            plan = array("I")
+            for week in syllabus["study_plan"]:
+                plan.append(week["week"])
+                plan.append(len(week["modules"]))
+                for part in week["modules"]:
+                    plan.extend((part["module"], self._string_id(part["title"]), part["hours"]))
+            prerequisites = self._string_list(syllabus["prerequisites"])
+            resources = self._string_list(syllabus["resources"])
+            header = array("I", (self._string_id(syllabus["topic"]), self._string_id(syllabus["description"]),
+                                 syllabus["total_hours"], self._string_id(syllabus["level"]),
+                                 len(prerequisites[1]), len(resources[1]), len(modules)))
+
+            # Most plans only need 16-bit values; the first byte records the array type
+            code = "H" if max(plan, default=0) < 1 << 16 else "I"
+            packed_plan = code.encode("ascii") + array(code, plan).tobytes()
+
+            digest = hashlib.blake2b(b"".join((header.tobytes(), prerequisites[0], resources[0],
+                                               packed_modules, packed_plan)), digest_size=16).hexdigest()
+            if digest in self._plans:
+                self._references[digest] += 1
+            else:
+                self._plans[digest] = (header[0], header[1], header[2], header[3], prerequisites[1],
+                                       resources[1], modules, packed_plan)
+                self._references[digest] = 1
+            return digest
+
+    def get(self, digest: str):
+        """Rebuild a stored syllabus (modules and strings are shared), or None"""
+        record = self._plans.get(digest)
+        if record is None:
+            return None
+        topic, description, total_hours, level, prerequisites, resources, modules, packed = record
+        strings = self._strings
+        plan = array(chr(packed[0]))
+        plan.frombytes(packed[1:])
+
+        study_plan = []
+        position = 0
+        while position < len(plan):
+            week_plan = {"week": plan[position], "modules": [], "hours": 0}
+            parts = plan[position + 1]
+            position += 2
+            for _ in range(parts):
+                module, title, hours = plan[position:position + 3]
+                week_plan["modules"].append({"module": module, "title": strings[title], "hours": hours})
+                week_plan["hours"] += hours
+                position += 3
+            study_plan.append(week_plan)
+
+        return {
+            "topic": strings[topic],
+            "description": strings[description],
+            "total_hours": total_hours,
+            "level": strings[level],
+            "prerequisites": prerequisites,
+            "resources": resources,
+            "modules": modules,
+            "study_plan": study_plan
+        }
+
+    def release(self, digest: str):
+        """Drop one reference to a plan, removing it when none are left"""
+        with self._lock:
+            count = self._references.get(digest)
+            if count is None:
+                return
+            if count > 1:
+                self._references[digest] = count - 1
+            else:
+                del self._references[digest]
+                del self._plans[digest]
+
+    def stats(self) -> dict:
+        """Get the number of unique plans, strings and modules"""
+        return {
+            "plans": len(self._plans),
+            "references": sum(self._references.values()),
+            "strings": len(self._strings),
+            "modules": len(self._modules),
+            "module_lists": len(self._module_lists)
+        }
+
+    def _string_id(self, text: str) -> int:
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = len(self._strings)
+            text = sys.intern(text)
+            self._strings.append(text)
+            self._string_ids[text] = string_id
+        return string_id
+
+    def _string_list(self, texts) -> tuple:
+        """Packed ids and the shared tuple for a list of strings"""
+        packed = array("I", (self._string_id(text) for text in texts)).tobytes()
+        shared = self._string_lists.get(packed)
+        if shared is None:
+            shared = tuple(self._strings[i] for i in array("I", packed))
+            self._string_lists[packed] = shared
+        return packed, shared
+
+    def _module_id(self, module) -> int:
+        if not isinstance(module, Module):
+            module = Module.from_dict(module)
+        module_id = self._module_ids.get(module)
+        if module_id is None:
+            module_id = len(self._modules)
+            module = Module(self._strings[self._string_id(module.title)], module.hours,
+                            (self._strings[self._string_id(topic)] for topic in module.topics),
+                            (self._strings[self._string_id(exercise)] for exercise in module.exercises))
+            self._modules.append(module)
+            self._module_ids[module] = module_id
+        return module_id
@@ -0,0 +1,245 @@
+"""
+Prerequisite dependency graph across topics and multi-topic learning paths
+"""
+
+import threading
+import weakref
+
+from knowledge_base import get_backend, get_catalog_entry, resolve_topic, subscribe, unsubscribe
+from scheduler import schedule
+from syllabus_builder import SyllabusBuilder
+
+class PrerequisiteCycleError(ValueError):
+    """Raised when topics (transitively) require each other"""
+
+    def __init__(self, cycle: list):
+        super().__init__("prerequisite cycle: " + " -> ".join(cycle))
+        self.cycle = cycle
+
+class PrerequisiteGraph:
+    """
+    Topics linked by their resolved prerequisite strings. Topics are expanded
+    lazily from the knowledge base, transitive closures are cached, and both
+    are updated incrementally when add_topic adds or replaces a topic (and
+    dropped when the knowledge base switches to another backend).
+    """
+
+    def __init__(self, fuzzy: bool = False):
+        self.fuzzy = fuzzy       # Also link prerequisites through fuzzy matches
+        self.requires = {}       # topic -> prerequisite topics, in listed order
+        self.unresolved = {}     # topic -> prerequisite strings with no matching topic
+        self.dependents = {}     # topic -> topics that require it
+        self._waiting = {}       # lowercased unresolved string -> topics listing it
+        self._closure = {}       # topic -> frozenset of all transitive prerequisites
+        self._backend = get_backend()
+        self._lock = threading.RLock()
+        method = weakref.WeakMethod(self.topic_added)
+        listener = subscribe(lambda key: method() and method()(key))
+        weakref.finalize(self, unsubscribe, listener)
+
+    def key(self, topic: str) -> str:
+        """Graph node for a topic (unknown topics stand for themselves)"""
+        return resolve_topic(topic, self.fuzzy) or topic.lower()
+
+    def prerequisites(self, topic: str) -> tuple:
+        """Direct prerequisites of a topic"""
+        with self._lock:
+            self._sync()
+            key = self.key(topic)
+            self._expand(key)
+            return self.requires[key]
+
+    def closure(self, topic: str) -> frozenset:
+        """All transitive prerequisites of a topic"""
+        with self._lock:
+            self._sync()
+            return self._closure_of(self.key(topic))
+
+    def order(self, topics, include_prerequisites: bool = True) -> list:
+        """
+        Order topics so every prerequisite comes before the topics needing it,
+        otherwise keeping the requested order. Raises PrerequisiteCycleError.
+        """
+        with self._lock:
+            self._sync()
+            requested = list(dict.fromkeys(self.key(topic) for topic in topics))
+            for key in requested:
+                self._closure_of(key)  # Expands the graph and detects cycles
+            wanted = set(requested)
+            if include_prerequisites:
+                for key in requested:
+                    wanted |= self._closure[key]
+
+            # Depth-first post-order: prerequisites right before their first user
+            order = []
+            placed = set()
+            for root in requested:
+                stack = [(root, iter(self.requires[root]))]
+                while stack:
+                    node, pending = stack[-1]
+                    child = next((p for p in pending if p in wanted and p not in placed), None)
+                    if child is not None:
+                        stack.append((child, iter(self.requires[child])))
+                    else:
+                        stack.pop()
+                        if node not in placed:
+                            placed.add(node)
+                            order.append(node)
+            return order
+
+    def topic_added(self, key: str):
+        """Update the graph after a topic was added to or replaced in the knowledge base"""
+        with self._lock:
+            self._sync()
+
+            # A replaced topic may list different prerequisites now
+            if key in self.requires:
+                for prerequisite in self.requires.pop(key):
+                    self.dependents.get(prerequisite, set()).discard(key)
+                for text in self.unresolved.pop(key, ()):
+                    self._waiting.get(text.lower(), set()).discard(key)
+                self._invalidate(key)
+
+            # Strings that did not resolve before may match the new topic
+            for text in [text for text in self._waiting if key in text or text in key]:
+                resolved = resolve_topic(text, self.fuzzy)
+                if resolved is None:
+                    continue
+                for topic in self._waiting.pop(text):
+                    if topic not in self.requires:
+                        continue
+                    self.unresolved[topic] = tuple(t for t in self.unresolved[topic] if t.lower() != text)
+                    if resolved != topic and resolved not in self.requires[topic]:
+                        self._link(topic, resolved)
+
+    def _sync(self):
+        """Start over when the knowledge base serves topics from another backend"""
+        backend = get_backend()
+        if backend is self._backend:
+            return
+        self._backend = backend
+        for table in (self.requires, self.unresolved, self.dependents, self._waiting, self._closure):
+            table.clear()
+
+    def _expand(self, key: str):
+        if key in self.requires:
+            return
+        knowledge = get_catalog_entry(key)
+        requires = []
+        unresolved = []
+        for text in (knowledge["prerequisites"] if knowledge is not None else ()):
+            resolved = resolve_topic(text, self.fuzzy)
+            if resolved is None:
+                unresolved.append(text)
+                self._waiting.setdefault(text.lower(), set()).add(key)
+            elif resolved != key and resolved not in requires:
+                requires.append(resolved)
+                self.dependents.setdefault(resolved, set()).add(key)
+        self.requires[key] = tuple(requires)
+        self.unresolved[key] = tuple(unresolved)
+
+    def _closure_of(self, key: str) -> frozenset:
+        """Compute (and cache) closures with an iterative DFS that reports cycles"""
+        if key in self._closure:
+            return self._closure[key]
+        self._expand(key)
+        path = [key]
+        on_path = {key}
+        stack = [iter(self.requires[key])]
+        while stack:
+            node = path[-1]
+            child = next((p for p in stack[-1] if p not in self._closure), None)
+            if child is None:
+                closure = set()
+                for prerequisite in self.requires[node]:
+                    closure.add(prerequisite)
+                    closure |= self._closure[prerequisite]
+                self._closure[node] = frozenset(closure)
+                stack.pop()
+                on_path.discard(path.pop())
+                continue
+            if child in on_path:
+                raise PrerequisiteCycleError(path[path.index(child):] + [child])
+            self._expand(child)
+            path.append(child)
+            on_path.add(child)
+            stack.append(iter(self.requires[child]))
+        return self._closure[key]
+
+    def _link(self, topic: str, prerequisite: str):
+        """Add an edge and extend the cached closures of the topic and its dependents"""
+        self.requires[topic] += (prerequisite,)
+        self.dependents.setdefault(prerequisite, set()).add(topic)
+        try:
+            added = self._closure_of(prerequisite) | {prerequisite}
+        except PrerequisiteCycleError:
+            self._invalidate(topic)
+            return
+        if topic in added:
+            self._invalidate(topic)  # The cycle is reported by the next query
+            return
+        for node in self._affected(topic):
+            if node in self._closure:
+                self._closure[node] = self._closure[node] | added
+
+    def _invalidate(self, topic: str):
+        for node in self._affected(topic):
+            self._closure.pop(node, None)
+
+    def _affected(self, topic: str) -> list:
+        """The topic and every topic that (transitively) requires it"""
+        seen = {topic}
+        queue = [topic]
+        for node in queue:
+            for dependent in self.dependents.get(node, ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    queue.append(dependent)
+        return queue
+
+_default_graph = None
+_default_lock = threading.Lock()
+
+def default_graph() -> PrerequisiteGraph:
+    """The graph plan_learning_path uses when none is given, shared so its closures stay cached"""
+    global _default_graph
+    if _default_graph is None:
+        with _default_lock:
+            if _default_graph is None:
+                _default_graph = PrerequisiteGraph()
+    return _default_graph
+
+def plan_learning_path(topics, hours=10, level: str = "beginner", hours_per_week: int = 5,
+                       graph: PrerequisiteGraph = None, builder: SyllabusBuilder = None) -> dict:
+    """
+    Plan several topics (and their prerequisites) as one weekly schedule.
+    hours is the hours per topic, or a dict of topic -> hours (default 10).
+    """
+    graph = graph or default_graph()
+    builder = builder or SyllabusBuilder()
+    order = graph.order(topics)
+    if isinstance(hours, dict):
+        by_key = {graph.key(topic): value for topic, value in hours.items()}
+        topic_hours = [by_key.get(key, 10) for key in order]
+    else:
+        topic_hours = [hours] * len(order)
+
+    requests = [(key, h, level, hours_per_week) for key, h in zip(order, topic_hours)]
+    syllabi = [syllabus for _, syllabus in builder.create_syllabi(requests)]
+
+    # Topics are already in prerequisite order, so their modules are scheduled back to back
+    modules = [module for syllabus in syllabi for module in syllabus["modules"]]
+    owners = [(t, m) for t, syllabus in enumerate(syllabi) for m in range(len(syllabus["modules"]))]
+    weeks = schedule([module["hours"] for module in modules], hours_per_week)
+    plan = builder._plan_weeks(modules, weeks)
+    for week in plan:
+        week["modules"] = [{"topic": order[owners[part["module"]][0]], "module": owners[part["module"]][1],
+                            "title": part["title"], "hours": part["hours"]} for part in week["modules"]]
+
+    return {
+        "topics": order,
+        "total_hours": sum(topic_hours),
+        "level": level,
+        "syllabi": syllabi,
+        "study_plan": plan
+    }
@@ -0,0 +1,192 @@
+"""
+Persistent progress tracking: per-user, per-module completion and time spent
+Backed by SQLite in WAL mode; updates are buffered and written in batches
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plan_parts (
+    user TEXT NOT NULL,
+    plan TEXT NOT NULL,
+    week INTEGER NOT NULL,
+    module INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    hours REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS plan_parts_week ON plan_parts (user, plan, week);
+CREATE TABLE IF NOT EXISTS progress (
+    user TEXT NOT NULL,
+    plan TEXT NOT NULL,
+    module INTEGER NOT NULL,
+    hours_spent REAL NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    updated REAL NOT NULL,
+    PRIMARY KEY (user, plan, module)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (
+    user TEXT NOT NULL,
+    plan TEXT NOT NULL,
+    module INTEGER NOT NULL,
+    hours REAL NOT NULL,
+    completed INTEGER NOT NULL,
+    at REAL NOT NULL
+);
+"""
+
+UPSERT = """
+INSERT INTO progress (user, plan, module, hours_spent, completed, updated)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (user, plan, module) DO UPDATE SET
+    hours_spent = hours_spent + excluded.hours_spent,
+    completed = MAX(completed, excluded.completed),
+    updated = excluded.updated
+"""
+
+def plan_id(syllabus: dict, hours_per_week: int = None) -> str:
+    """
+    Stable id for a generated plan. Syllabi do not record the weekly hours
+    they were planned with, so the id also carries a digest of the weekly
+    layout; plans for other capacities or changed catalog entries differ.
+    """
+    layout = [(week["week"], [(part["module"], part["hours"]) for part in week["modules"]])
+              for week in syllabus["study_plan"]]
+    digest = hashlib.blake2b(repr(layout).encode(), digest_size=6).hexdigest()
+    capacity = "" if hours_per_week is None else hours_per_week
+    return f"{syllabus['topic'].lower()}|{syllabus['total_hours']}|{syllabus['level']}|{capacity}|{digest}"
+
+class ProgressStore:
+    """
+    Records progress updates. Updates are buffered and written in one
+    transaction per batch, at the latest flush_interval seconds after they
+    were recorded (by a timer thread when no further updates arrive) and on
+    close; a crash loses at most the unflushed batch (batch_size=1 writes
+    every update immediately). The current state is kept in an indexed
+    table, so queries never replay the event history.
+    """
+
+    def __init__(self, path: str, batch_size: int = 500, flush_interval: float = 1.0,
+                 history: bool = True):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval  # Seconds before a partial batch is written
+        self.history = history                # Also append every update to the events log
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._timer = None    # Flushes a partial batch once the store is idle
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def register_plan(self, user: str, syllabus: dict, plan: str = None, hours_per_week: int = None) -> str:
+        """Store the weekly layout of a plan so weekly queries can use the index"""
+        plan = plan or plan_id(syllabus, hours_per_week)
+        rows = [(user, plan, week["week"], part["module"], part["title"], part["hours"])
+                for week in syllabus["study_plan"] for part in week["modules"]]
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.execute("DELETE FROM plan_parts WHERE user = ? AND plan = ?", (user, plan))
+                self._connection.executemany("INSERT INTO plan_parts VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return plan
+
+    def record(self, user: str, plan: str, module: int, hours: float = 0, completed: bool = False):
+        """Buffer a progress update (time spent and/or completion)"""
+        with self._lock:
+            self._pending.append((user, plan, module, hours, int(completed), time.time()))
+            due = (len(self._pending) >= self.batch_size
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+            if due:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write all buffered updates in one transaction"""
+        with self._lock:
+            self._flush_locked()
+
+    def module_progress(self, user: str, plan: str) -> dict:
+        """Get {module: {"hours_spent", "completed"}} for a plan"""
+        self.flush()
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT module, hours_spent, completed FROM progress WHERE user = ? AND plan = ?",
+                (user, plan)).fetchall()
+        return {module: {"hours_spent": hours, "completed": bool(done)} for module, hours, done in rows}
+
+    def remaining_this_week(self, user: str, plan: str, week: int) -> list:
+        """Get the parts of a week whose modules are not completed yet"""
+        self.flush()
+        with self._lock:
+            rows = self._connection.execute(
+                """
+                SELECT parts.module, parts.title, parts.hours
+                FROM plan_parts AS parts
+                LEFT JOIN progress ON progress.user = parts.user AND progress.plan = parts.plan
+                                  AND progress.module = parts.module
+                WHERE parts.user = ? AND parts.plan = ? AND parts.week = ?
+                  AND COALESCE(progress.completed, 0) = 0
+                ORDER BY parts.rowid
+                """, (user, plan, week)).fetchall()
+        return [{"module": module, "title": title, "hours": hours} for module, title, hours in rows]
+
+    def compact(self, before: float = None):
+        """Drop event history older than before (default: all), then checkpoint the WAL"""
+        self.flush()
+        with self._lock:
+            if before is None:
+                self._connection.execute("DELETE FROM events")
+            else:
+                self._connection.execute("DELETE FROM events WHERE at < ?", (before,))
+            self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        """Flush pending updates and close the database"""
+        self.flush()
+        with self._lock:
+            self._closed = True
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _timed_flush(self):
+        with self._lock:
+            self._timer = None
+            if not self._closed:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        self._connection.execute("BEGIN")
+        try:
+            self._connection.executemany(UPSERT, pending)
+            if self.history:
+                self._connection.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?)", pending)
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            self._pending = pending + self._pending
+            raise
@@ -0,0 +1,210 @@
+"""
+Diagnostic quiz: question banks built from the knowledge base and
+Elo-style adaptive selection that recommends a study level
+"""
+
+import random
+import threading
+from bisect import bisect_left
+
+from knowledge_base import get_topic_knowledge, resolve_topic
+from storage import LRUCache
+
+START_RATING = 1400
+K_FACTOR = 64
+LEVEL_THRESHOLDS = ((1300, "beginner"), (1600, "intermediate"))  # Ratings below -> level
+
+class Question:
+    """Multiple-choice question with a fixed Elo difficulty"""
+
+    __slots__ = ("id", "module", "prompt", "options", "answer", "difficulty")
+
+    def __init__(self, id: int, module: int, prompt: str, options: tuple, answer: int, difficulty: float):
+        self.id = id
+        self.module = module
+        self.prompt = prompt
+        self.options = options
+        self.answer = answer  # Index of the correct option
+        self.difficulty = difficulty
+
+    def to_dict(self) -> dict:
+        """Question as shown to a learner (without the answer)"""
+        return {"id": self.id, "module": self.module, "prompt": self.prompt, "options": list(self.options)}
+
+class QuestionBank:
+    """Questions for one topic, sorted by difficulty for O(log n) selection"""
+
+    def __init__(self, topic: str, knowledge):
+        self.topic = topic
+        questions = _build_questions(topic, knowledge)
+        questions.sort(key=lambda q: (q.difficulty, q.id))
+        self.questions = tuple(questions)
+        self.difficulties = [q.difficulty for q in questions]
+        self.by_id = {q.id: q for q in questions}
+
+    def __len__(self):
+        return len(self.questions)
+
+    def closest(self, rating: float, exclude=()):
+        """Get the unasked question whose difficulty is closest to rating"""
+        right = bisect_left(self.difficulties, rating)
+        left = right - 1
+        # Walk outwards from the insertion point; only asked questions are skipped
+        while left >= 0 or right < len(self.questions):
+            take_right = left < 0 or (right < len(self.questions)
+                                      and self.difficulties[right] - rating <= rating - self.difficulties[left])
+            index = right if take_right else left
+            if take_right:
+                right += 1
+            else:
+                left -= 1
+            if self.questions[index].id not in exclude:
+                return self.questions[index]
+        return None
+
+class QuizSession:
+    """One learner's quiz: a rating and the ids of questions already asked"""
+
+    __slots__ = ("bank", "rating", "asked", "correct", "max_questions", "current")
+
+    def __init__(self, bank: QuestionBank, max_questions: int = 8, rating: float = START_RATING):
+        self.bank = bank
+        self.rating = rating
+        self.asked = []
+        self.correct = 0
+        self.max_questions = max_questions
+        self.current = None
+
+    @property
+    def finished(self) -> bool:
+        return len(self.asked) >= min(self.max_questions, len(self.bank))
+
+    def next_question(self):
+        """Pick the most informative unasked question, or None when done"""
+        if self.finished:
+            return None
+        self.current = self.bank.closest(self.rating, self.asked)
+        self.asked.append(self.current.id)
+        return self.current
+
+    def answer(self, choice: int) -> bool:
+        """Score the current question and update the learner rating"""
+        question = self.current
+        if question is None:
+            raise ValueError("no question pending")
+        self.current = None
+        correct = choice == question.answer
+        expected = 1 / (1 + 10 ** ((question.difficulty - self.rating) / 400))
+        self.rating += K_FACTOR * ((1 if correct else 0) - expected)
+        self.correct += correct
+        return correct
+
+    def recommended_level(self) -> str:
+        """Level to pass to SyllabusBuilder.create_syllabus"""
+        if not self.asked:
+            return "beginner"  # No evidence either way, so use the default level
+        for threshold, level in LEVEL_THRESHOLDS:
+            if self.rating < threshold:
+                return level
+        return "advanced"
+
+class QuizEngine:
+    """Shares precomputed question banks between many quiz sessions"""
+
+    def __init__(self, max_banks: int = 1024):
+        self._banks = LRUCache(max_banks)
+        self._lock = threading.Lock()
+
+    def bank(self, topic: str) -> QuestionBank:
+        """Get (building on first use) the question bank for a topic"""
+        key = resolve_topic(topic) or topic.lower()
+        bank = self._banks.get(key)
+        if bank is None:
+            with self._lock:
+                bank = self._banks.get(key)
+                if bank is None:
+                    bank = QuestionBank(key, get_topic_knowledge(topic))
+                    self._banks.put(key, bank)
+        return bank
+
+    def precompute(self, topics):
+        """Build the banks for many topics ahead of time"""
+        for topic in topics:
+            self.bank(topic)
+
+    def start(self, topic: str, max_questions: int = 8) -> QuizSession:
+        """Start a quiz on a topic"""
+        return QuizSession(self.bank(topic), max_questions)
+
+def _build_questions(topic: str, knowledge) -> list:
+    """Generate questions from a topic's modules; later modules are harder"""
+    modules = knowledge["modules"]
+    titles = [(i, module["title"]) for i, module in enumerate(modules)]
+    all_topics = [(i, name) for i, module in enumerate(modules) for name in module["topics"]]
+    all_exercises = [(i, name) for i, module in enumerate(modules) for name in module["exercises"]]
+    questions = []
+    span = max(1, len(modules) - 1)
+
+    for i, module in enumerate(modules):
+        base = 1000 + 800 * i / span  # 1000 (first module) .. 1800 (last module)
+        rng = random.Random(f"{topic}:{i}")  # Stable options for the same catalog
+
+        # Which module covers this topic?
+        for name in module["topics"]:
+            options, answer = _options(module["title"], titles, i, rng, {module["title"]})
+            if len(options) > 1:
+                questions.append(Question(len(questions), i, f"Which module covers '{name}'?",
+                                          options, answer, base + 50))
+
+        # Which of these topics belongs to this module?
+        if module["topics"]:
+            options, answer = _options(rng.choice(module["topics"]), all_topics, i, rng, set(module["topics"]))
+            if len(options) > 1:
+                questions.append(Question(len(questions), i, f"Which topic is part of '{module['title']}'?",
+                                          options, answer, base + 150))
+
+        # Which exercise practises this module?
+        if module["exercises"]:
+            options, answer = _options(rng.choice(module["exercises"]), all_exercises, i, rng,
+                                       set(module["exercises"]))
+            if len(options) > 1:
+                questions.append(Question(len(questions), i, f"Which exercise practises '{module['title']}'?",
+                                          options, answer, base + 250))
+    return questions
+
+def _options(correct: str, candidates: list, module: int, rng: random.Random, own: set,
+             count: int = 4) -> tuple:
+    """Shuffle the correct option in with distractors taken from other modules"""
+    options = [correct]
+    # Random picks keep bank building linear; small catalogs fall back to a full scan
+    for _ in range(count * 4):
+        if len(options) == count:
+            break
+        owner, text = candidates[rng.randrange(len(candidates))]
+        if owner != module and text not in own and text not in options:
+            options.append(text)
+    if len(options) < count and len(candidates) <= count * 8:
+        for owner, text in candidates:
+            if len(options) == count:
+                break
+            if owner != module and text not in own and text not in options:
+                options.append(text)
+    rng.shuffle(options)
+    return tuple(options), options.index(correct)
+
+def run_console_quiz(topic: str, max_questions: int = 5, engine: QuizEngine = None) -> str:
+    """Ask a short diagnostic quiz on the console and return the recommended level"""
+    session = (engine or QuizEngine()).start(topic, max_questions)
+    print(f"\n🧪 Diagnostic quiz: {topic} ({min(max_questions, len(session.bank))} questions)")
+    question = session.next_question()
+    while question is not None:
+        print(f"\n❓ {question.prompt}")
+        for number, option in enumerate(question.options, 1):
+            print(f"  {number}. {option}")
+        choice = input("Your answer (number): ").strip()
+        correct = session.answer(int(choice) - 1 if choice.isdigit() else -1)
+        print("  ✅ Correct!" if correct else f"  ❌ Answer: {question.options[question.answer]}")
+        question = session.next_question()
+    level = session.recommended_level()
+    print(f"\n🎓 Score {session.correct}/{len(session.asked)} → recommended level: {level}")
+    return level
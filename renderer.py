@@ -0,0 +1,88 @@
+"""
+Streaming text rendering for syllabi
+Renderers yield text chunks; write_stream sends them to any writer in large blocks
+"""
+
+def write_stream(chunks, target, buffer_size: int = 64 * 1024) -> int:
+    """Write text chunks to a file-like object or socket, batching small chunks"""
+    send = target.sendall if hasattr(target, "sendall") else target.write
+    encode = hasattr(target, "sendall")
+    buffer = []
+    buffered = 0
+    written = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= buffer_size:
+            block = "".join(buffer)
+            send(block.encode("utf-8") if encode else block)
+            written += len(block)
+            buffer = []
+            buffered = 0
+    if buffer:
+        block = "".join(buffer)
+        send(block.encode("utf-8") if encode else block)
+        written += len(block)
+    return written
+
+def select_weeks(syllabus: dict, weeks=None) -> tuple:
+    """Get the weekly plan entries and module numbers for the selected weeks"""
+    if weeks is None:
+        return syllabus["study_plan"], range(len(syllabus["modules"]))
+    weeks = set(weeks)
+    plan = [week for week in syllabus["study_plan"] if week["week"] in weeks]
+    module_ids = sorted({part["module"] for week in plan for part in week["modules"]})
+    return plan, module_ids
+
+def render_syllabus(syllabus: dict, weeks=None):
+    """Yield the console view of a syllabus, optionally only some weeks"""
+    plan, module_ids = select_weeks(syllabus, weeks)
+
+    yield f"\n📋 SYLLABUS: {syllabus['topic'].upper()}\n"
+    yield "=" * 50 + "\n"
+    yield f"📝 Description: {syllabus['description']}\n"
+    yield f"⏱️  Total Hours: {syllabus['total_hours']}\n"
+    yield f"🎓 Level: {syllabus['level']}\n"
+
+    yield "\n📚 Prerequisites:\n"
+    for prereq in syllabus['prerequisites']:
+        yield f"  • {prereq}\n"
+
+    yield "\n📖 Modules:\n"
+    for i in module_ids:
+        module = syllabus['modules'][i]
+        yield f"\n  {i + 1}. {module['title']} ({module['hours']} hours)\n"
+        yield "     📌 Topics to cover:\n"
+        for topic in module['topics']:
+            yield f"       • {topic}\n"
+        yield "     💻 Exercises:\n"
+        for exercise in module['exercises']:
+            yield f"       • {exercise}\n"
+
+    yield "\n📅 Weekly Study Plan:\n"
+    for week in plan:
+        yield f"\n  Week {week['week']} ({week['hours']} hours):\n"
+        for module in week['modules']:
+            yield f"    • {module['title']}\n"
+
+def render_plan_file(syllabus: dict, weeks=None):
+    """Yield the saved text plan layout (as in os_notes), optionally only some weeks"""
+    _, module_ids = select_weeks(syllabus, weeks)
+
+    yield f"STUDY PLAN: {syllabus['topic']}\n"
+    yield "=" * 50 + "\n\n"
+
+    yield f"Description: {syllabus['description']}\n"
+    yield f"Total Hours: {syllabus['total_hours']}\n"
+    yield f"Level: {syllabus['level']}\n\n"
+
+    yield "MODULES:\n"
+    for i in module_ids:
+        module = syllabus['modules'][i]
+        yield f"\n{i + 1}. {module['title']} ({module['hours']} hours)\n"
+        yield "   Topics:\n"
+        for topic in module['topics']:
+            yield f"   • {topic}\n"
+        yield "   Exercises:\n"
+        for exercise in module['exercises']:
+            yield f"   • {exercise}\n"
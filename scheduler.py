@@ -0,0 +1,82 @@
+"""
+Weekly scheduling engine that packs module hours into study weeks
+"""
+
+import heapq
+from itertools import islice, repeat
+
+def weekly_capacities(capacity=5, daily=None):
+    """
+    Yield the study hours available in each week. capacity is a fixed number
+    of hours per week or an iterable of per-week hours; daily is an iterable
+    of per-day hours (grouped into weeks of seven days) and overrides capacity.
+    """
+    if daily is not None:
+        days = iter(daily)
+        while True:
+            week = list(islice(days, 7))
+            if not week:
+                return
+            yield sum(week)
+    elif isinstance(capacity, (int, float)):
+        if capacity <= 0:
+            raise ValueError("weekly capacity must be positive")
+        yield from repeat(capacity)
+    else:
+        yield from capacity
+
+def module_order(count: int, prerequisites: dict = None) -> list:
+    """Order module ids so prerequisites come first, otherwise keeping the original order"""
+    if not prerequisites:
+        return list(range(count))
+
+    waiting = [0] * count
+    unlocks = [[] for _ in range(count)]
+    for module_id, required in prerequisites.items():
+        for prerequisite in required:
+            waiting[module_id] += 1
+            unlocks[prerequisite].append(module_id)
+
+    ready = [module_id for module_id in range(count) if not waiting[module_id]]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        module_id = heapq.heappop(ready)
+        order.append(module_id)
+        for unlocked in unlocks[module_id]:
+            waiting[unlocked] -= 1
+            if not waiting[unlocked]:
+                heapq.heappush(ready, unlocked)
+
+    if len(order) != count:
+        raise ValueError("module prerequisites contain a cycle")
+    return order
+
+def schedule(hours, capacity=5, daily=None, prerequisites: dict = None) -> dict:
+    """
+    Split module hours into weekly parts: {week: [(module_id, hours), ...]}.
+    Weeks are numbered from 1 and weeks without capacity stay in the plan
+    (empty). Runs in time linear in the number of parts and weeks.
+    """
+    hours = list(hours)
+    weeks = enumerate(weekly_capacities(capacity, daily), 1)
+    plan = {}
+    week = 0
+    free = 0
+
+    for module_id in module_order(len(hours), prerequisites):
+        left = hours[module_id]
+        while left > 0:
+            # Move on to the next week with room left
+            while free <= 0:
+                try:
+                    week, free = next(weeks)
+                except StopIteration:
+                    raise ValueError("not enough weekly capacity for the plan") from None
+                plan[week] = []
+            part = min(left, free)
+            plan[week].append((module_id, part))
+            left -= part
+            free -= part
+
+    return plan
@@ -0,0 +1,170 @@
+"""
+Lightweight asyncio HTTP/JSON service for syllabi and guided study sessions
+Run with: python server.py [--host HOST] [--port PORT]
+
+Endpoints:
+  POST   /syllabus             {"topic", "hours", "level", "hours_per_week"} -> syllabus
+  POST   /sessions             same body -> {"session": id, "syllabus": ...}
+  POST   /sessions/<id>/next   -> next module, or {"finished": true, "summary": ...}
+  DELETE /sessions/<id>        -> {"deleted": true}
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+from collections import OrderedDict
+
+from exporters import syllabus_to_dict
+from study_assistant import StudyAssistant, StudySession
+from utils import validate_input
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class StudyService:
+    """Routes JSON requests to one shared assistant and per-learner sessions"""
+
+    def __init__(self, assistant: StudyAssistant = None, max_sessions: int = 100000,
+                 max_body: int = 64 * 1024):
+        self.assistant = assistant or StudyAssistant()
+        self.max_sessions = max_sessions
+        self.max_body = max_body
+        self.sessions = OrderedDict()  # Oldest sessions are dropped first
+        self._ids = itertools.count(1)
+
+    def handle(self, method: str, path: str, body: dict) -> dict:
+        """Handle one request and return the JSON response body"""
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        if parts == ["syllabus"]:
+            self._require(method, "POST")
+            topic, hours, level, hours_per_week = self._plan_request(body)
+            _, syllabus = next(self.assistant.builder.create_syllabi([(topic, hours, level, hours_per_week)]))
+            return syllabus_to_dict(syllabus)
+
+        if parts == ["sessions"]:
+            self._require(method, "POST")
+            topic, hours, level, hours_per_week = self._plan_request(body)
+            session = StudySession(topic, hours, level, hours_per_week, assistant=self.assistant)
+            session_id = str(next(self._ids))
+            self.sessions[session_id] = session
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+            return {"session": session_id, "syllabus": syllabus_to_dict(session.start())}
+
+        if len(parts) >= 2 and parts[0] == "sessions":
+            session = self.sessions.get(parts[1])
+            if session is None:
+                raise HTTPError(404, "unknown session")
+            if len(parts) == 2:
+                self._require(method, "DELETE")
+                del self.sessions[parts[1]]
+                return {"deleted": True}
+            if parts[2:] == ["next"]:
+                self._require(method, "POST")
+                self.sessions.move_to_end(parts[1])
+                step = session.next_module()
+                if step is None:
+                    return {"finished": True, "summary": session.summary()}
+                return {"finished": False, "module": step}
+
+        raise HTTPError(404, "not found")
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve keep-alive HTTP/1.1 requests on one connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() == "HTTP/1.1")
+
+                status, payload = 200, None
+                try:
+                    length = int(headers.get("content-length", 0))
+                    if length > self.max_body:
+                        raise HTTPError(413, "request body too large")
+                    raw = await reader.readexactly(length) if length else b""
+                    try:
+                        body = json.loads(raw) if raw else {}
+                    except ValueError:
+                        raise HTTPError(400, "body must be JSON") from None
+                    payload = self.handle(method.upper(), path, body)
+                except HTTPError as error:
+                    status, payload = error.status, {"error": str(error)}
+                except Exception as error:  # Report and keep serving other requests
+                    status, payload = 500, {"error": repr(error)}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: dict, keep_alive: bool):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    def _plan_request(self, body: dict) -> tuple:
+        if not isinstance(body, dict):
+            raise HTTPError(400, "body must be a JSON object")
+        topic, hours, level = validate_input(str(body.get("topic", "")), str(body.get("hours", 10)),
+                                             str(body.get("level", "beginner")))
+        try:
+            hours_per_week = int(body.get("hours_per_week", 5))
+        except (TypeError, ValueError):
+            raise HTTPError(400, "hours_per_week must be a number") from None
+        if hours_per_week < 1:
+            raise HTTPError(400, "hours_per_week must be positive")
+        return topic, hours, level, hours_per_week
+
+    def _require(self, method: str, expected: str):
+        if method != expected:
+            raise HTTPError(405, f"use {expected}")
+
+async def start_server(host: str = "127.0.0.1", port: int = 8000, service: StudyService = None):
+    """Start serving and return the asyncio server"""
+    service = service or StudyService()
+    return await asyncio.start_server(service.serve_connection, host, port, backlog=4096)
+
+async def _serve_forever(host: str, port: int):
+    server = await start_server(host, port)
+    address = server.sockets[0].getsockname()
+    print(f"🌐 Study Assistant service on http://{address[0]}:{address[1]}")
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve study plans over HTTP/JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
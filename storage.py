@@ -0,0 +1,378 @@
+"""
+Storage backends for the knowledge base
+Every backend maps lowercase topic keys to knowledge dicts and keeps insertion order
+Backends import what they need on first use, so importing this module stays cheap
+"""
+
+import marshal
+import mmap
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+
+SNAPSHOT_MAGIC = b"SYLSNAP\0"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<8sIIQQQI")  # magic, format, marshal version, slots, count, table offset, stamp length
+SNAPSHOT_RECORD = struct.Struct("<II")        # key length, data length
+
+class LRUCache:
+    """Small thread-safe LRU mapping used for loaded topics"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+    def stats(self) -> dict:
+        """Get size and hit/miss counters"""
+        return {"size": len(self._items), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+class DictBackend:
+    """Topics kept in an in-memory dict (the built-in TOPIC_KNOWLEDGE)"""
+
+    def __init__(self, topics: dict):
+        self.topics = topics
+
+    def get(self, key: str):
+        return self.topics.get(key)
+
+    def put(self, key: str, knowledge):
+        self.topics[key] = knowledge
+
+    def keys(self):
+        return iter(list(self.topics))
+
+    def revision(self):
+        """Cheap value that changes when topics are added"""
+        return len(self.topics)
+
+    def __reduce__(self):
+        # Backends are pickled for worker processes; frozen entries travel as plain data
+        return (DictBackend, ({key: _plain(knowledge) for key, knowledge in self.topics.items()},))
+
+    def __contains__(self, key: str):
+        return key in self.topics
+
+    def __len__(self):
+        return len(self.topics)
+
+class JsonDirectoryBackend:
+    """One JSON file per topic plus an append-only index of keys"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.index_path = os.path.join(root, "index.jsonl")
+        self._count = None  # Number of indexed keys, counted on first use
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        """File that stores a topic (sharded by hash to keep directories small)"""
+        import hashlib
+        from urllib.parse import quote
+        shard = hashlib.md5(key.encode("utf-8")).hexdigest()[:2]
+        return os.path.join(self.root, shard, quote(key, safe="") + ".json")
+
+    def get(self, key: str):
+        import json
+        try:
+            with open(self.path_for(key), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, knowledge):
+        self.put_many([(key, knowledge)])
+
+    def put_many(self, items):
+        """Write many topics, appending new keys to the index"""
+        import json
+        with self._lock, open(self.index_path, "a", encoding="utf-8") as index:
+            for key, knowledge in items:
+                path = self.path_for(key)
+                new = not os.path.exists(path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(_plain(knowledge), f, ensure_ascii=False)
+                if new:
+                    index.write(json.dumps(key, ensure_ascii=False) + "\n")
+                    if self._count is not None:
+                        self._count += 1
+
+    def keys(self):
+        import json
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, encoding="utf-8") as index:
+            for line in index:
+                yield json.loads(line)
+
+    def revision(self):
+        return len(self)
+
+    def __reduce__(self):
+        return (JsonDirectoryBackend, (self.root,))
+
+    def __contains__(self, key: str):
+        return os.path.exists(self.path_for(key))
+
+    def __len__(self):
+        if self._count is None:
+            self._count = sum(1 for _ in self.keys())
+        return self._count
+
+class SQLiteBackend:
+    """Topics stored as JSON rows in a SQLite database"""
+
+    def __init__(self, path: str):
+        import sqlite3
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS topics (key TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        self._count = None
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        import json
+        with self._lock:
+            row = self._connection.execute("SELECT data FROM topics WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, knowledge):
+        self.put_many([(key, knowledge)])
+
+    def put_many(self, items):
+        """Write many topics in one transaction"""
+        import json
+        rows = [(key, json.dumps(_plain(knowledge), ensure_ascii=False)) for key, knowledge in items]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO topics (key, data) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET data = excluded.data", rows)
+            self._count = None
+
+    def keys(self):
+        with self._lock:
+            rows = self._connection.execute("SELECT key FROM topics ORDER BY rowid").fetchall()
+        return (key for (key,) in rows)
+
+    def revision(self):
+        return len(self)
+
+    def close(self):
+        self._connection.close()
+
+    def __reduce__(self):
+        return (SQLiteBackend, (self.path,))
+
+    def __contains__(self, key: str):
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM topics WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self):
+        if self._count is None:
+            with self._lock:
+                (self._count,) = self._connection.execute("SELECT COUNT(*) FROM topics").fetchone()
+        return self._count
+
+class SnapshotBackend:
+    """
+    Read-only catalog snapshot: marshalled entries plus an on-disk hash table,
+    memory-mapped on first lookup so opening it costs nothing for any catalog size.
+    Topics added at runtime are kept in memory; rebuild the snapshot to keep them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map = None
+        self._added = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, path: str, items, stamp: str = "") -> "SnapshotBackend":
+        """Write (key, knowledge) pairs to a new snapshot; stamp defaults to a content checksum"""
+        records = []
+        offsets = []
+        position = 0
+        checksum = 0
+        for key, knowledge in items:
+            encoded = key.encode("utf-8")
+            data = marshal.dumps(_plain(knowledge))
+            record = SNAPSHOT_RECORD.pack(len(encoded), len(data)) + encoded + data
+            offsets.append((zlib.crc32(encoded), position))
+            records.append(record)
+            position += len(record)
+            checksum = zlib.crc32(record, checksum)
+
+        # Open addressing at a load factor of at most 1/2; slot values are record offsets + 1
+        slots = 2
+        while slots < len(offsets) * 2:
+            slots *= 2
+        table = [0] * slots
+        for hashed, offset in offsets:
+            slot = hashed & (slots - 1)
+            while table[slot]:
+                slot = (slot + 1) & (slots - 1)
+            table[slot] = offset + 1
+
+        stamp = (stamp or f"crc32:{checksum:08x}:{len(offsets)}").encode("utf-8")
+        table_offset = SNAPSHOT_HEADER.size + len(stamp)
+        table_offset += -table_offset % 8
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, marshal.version, slots, len(offsets),
+                                      table_offset, len(stamp))
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(header + stamp)
+            f.write(b"\0" * (table_offset - SNAPSHOT_HEADER.size - len(stamp)))
+            f.write(struct.pack(f"<{slots}Q", *table))
+            for record in records:
+                f.write(record)
+        os.replace(temporary, path)  # Readers never see a half-written snapshot
+        return cls(path)
+
+    @property
+    def stamp(self) -> str:
+        """Version stamp recorded when the snapshot was built"""
+        self._open()
+        return self._stamp
+
+    def get(self, key: str):
+        if key in self._added:
+            return self._added[key]
+        offset = self._find(key)
+        if offset is None:
+            return None
+        key_length, data_length = SNAPSHOT_RECORD.unpack_from(self._map, offset)
+        start = offset + SNAPSHOT_RECORD.size + key_length
+        return marshal.loads(self._map[start:start + data_length])
+
+    def put(self, key: str, knowledge):
+        self._added[key] = knowledge
+
+    def keys(self):
+        self._open()
+        offset = self._records
+        for _ in range(self._count):
+            key_length, data_length = SNAPSHOT_RECORD.unpack_from(self._map, offset)
+            start = offset + SNAPSHOT_RECORD.size
+            key = self._map[start:start + key_length].decode("utf-8")
+            if key not in self._added:
+                yield key
+            offset = start + key_length + data_length
+        yield from list(self._added)
+
+    def revision(self):
+        return len(self)
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                # The slot table is a view into the map, which cannot close while it exists
+                self._table.release()
+                self._table = None
+                self._map.close()
+                self._map = None
+
+    def __reduce__(self):
+        # Reopened from the file, with the topics added at runtime
+        added = {key: _plain(knowledge) for key, knowledge in self._added.items()}
+        return (SnapshotBackend, (self.path,), {"_added": added})
+
+    def __contains__(self, key: str):
+        return key in self._added or self._find(key) is not None
+
+    def __len__(self):
+        self._open()
+        return self._count + sum(1 for key in self._added if self._find(key) is None)
+
+    def _open(self):
+        if self._map is not None:
+            return
+        with self._lock:
+            if self._map is not None:
+                return
+            with open(self.path, "rb") as f:
+                snapshot = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, marshal_version, slots, count, table_offset, stamp_length = \
+                SNAPSHOT_HEADER.unpack_from(snapshot)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or marshal_version != marshal.version:
+                snapshot.close()
+                raise ValueError(f"{self.path} is not a compatible catalog snapshot; rebuild it")
+            start = SNAPSHOT_HEADER.size
+            self._stamp = snapshot[start:start + stamp_length].decode("utf-8")
+            self._slots = slots
+            self._count = count
+            self._table = memoryview(snapshot)[table_offset:table_offset + slots * 8].cast("Q")
+            self._records = table_offset + slots * 8
+            self._map = snapshot
+
+    def _find(self, key: str):
+        """Offset of a key's record, or None"""
+        self._open()
+        encoded = key.encode("utf-8")
+        mask = self._slots - 1
+        slot = zlib.crc32(encoded) & mask
+        while True:
+            value = self._table[slot]
+            if not value:
+                return None
+            offset = self._records + value - 1
+            key_length = SNAPSHOT_RECORD.unpack_from(self._map, offset)[0]
+            if key_length == len(encoded):
+                start = offset + SNAPSHOT_RECORD.size
+                if self._map[start:start + key_length] == encoded:
+                    return offset
+            slot = (slot + 1) & mask
+
+def open_backend(path: str):
+    """Open a catalog by path: a JSON directory, a SQLite database or a snapshot"""
+    if os.path.isdir(path):
+        return JsonDirectoryBackend(path)
+    with open(path, "rb") as f:
+        magic = f.read(len(SNAPSHOT_MAGIC))
+    if magic == SNAPSHOT_MAGIC:
+        return SnapshotBackend(path)
+    if magic.startswith(b"SQLite f"):
+        return SQLiteBackend(path)
+    raise ValueError(f"unknown catalog format: {path}")
+
+def _plain(knowledge) -> dict:
+    """Convert a (possibly frozen) knowledge entry to JSON-ready data"""
+    data = dict(knowledge)
+    data["modules"] = [dict(module, topics=list(module["topics"]), exercises=list(module["exercises"]))
+                       for module in knowledge["modules"]]
+    data["prerequisites"] = list(knowledge.get("prerequisites", ()))
+    data["resources"] = list(knowledge.get("resources", ()))
+    return data
@@ -3,235 +3,366 @@ Main Study Assistant AI Agent
 Combines planning, teaching, and guidance
 """
 
+import json
+import sys
+import threading
+
+from instrumentation import profiled, stage
+from keyword_matcher import KeywordMatcher
+from renderer import render_syllabus, write_stream
 from syllabus_builder import SyllabusBuilder
 
+# Lookup tables: keys are matched as substrings of topics and module titles,
+# earlier keys winning. Extend them with load_tables().
+EXPLANATIONS = {
+    "beginner": {
+        "process vs thread": "Process is a program in execution, thread is a lightweight process within it",
+        "virtual memory": "Makes computer think it has more memory than physically available",
+        "paging": "Memory management technique that avoids external fragmentation",
+        "linear regression": "Predicts continuous values using a straight line",
+        "classes & objects": "Blueprint (class) creates instances (objects) with specific properties"
+    }
+}
+
+IMPORTANCE = {
+    "process management": "Essential for understanding how OS manages multiple programs",
+    "memory management": "Critical for optimizing computer performance",
+    "python basics": "Foundation for all Python programming",
+    "supervised learning": "Most common ML approach used in industry"
+}
+
+LEARNING_TIPS = {
+    "beginner": [
+        "Take notes as you learn",
+        "Practice with simple examples first",
+        "Don't rush - focus on understanding",
+        "Ask questions when stuck",
+        "Review previous lessons regularly"
+    ],
+    "intermediate": [
+        "Build small projects to apply concepts",
+        "Read documentation alongside tutorials",
+        "Join study groups or forums",
+        "Teach others to reinforce learning",
+        "Challenge yourself with complex problems"
+    ],
+    "advanced": [
+        "Read research papers in the field",
+        "Contribute to open source projects",
+        "Attend conferences or webinars",
+        "Mentor beginners",
+        "Stay updated with latest developments"
+    ]
+}
+
+COMMON_QUESTIONS = {
+    "process management": [
+        {
+            "question": "What's the difference between process and thread?",
+            "answer": "Process has separate memory space, threads share memory within a process"
+        },
+        {
+            "question": "What is deadlock?",
+            "answer": "When two or more processes wait for each other indefinitely"
+        }
+    ],
+    "python programming": [
+        {
+            "question": "What are Python lists vs tuples?",
+            "answer": "Lists are mutable, tuples are immutable (cannot be changed)"
+        },
+        {
+            "question": "What is __init__ in Python?",
+            "answer": "Constructor method that initializes object attributes"
+        }
+    ]
+}
+
+DEFAULT_QUESTIONS = [
+    {
+        "question": "How do I get started?",
+        "answer": "Begin with the first exercise and build from there"
+    },
+    {
+        "question": "What if I don't understand something?",
+        "answer": "Review the basics, search online, or ask for help"
+    }
+]
+
+def compile_tables():
+    """Rebuild the keyword matchers after the lookup tables change"""
+    global _explanation_matchers, _importance_matcher, _question_matcher
+    _explanation_matchers = {level: KeywordMatcher(table) for level, table in EXPLANATIONS.items()}
+    _importance_matcher = KeywordMatcher(IMPORTANCE)
+    _question_matcher = KeywordMatcher(COMMON_QUESTIONS)
+
+def load_tables(path: str):
+    """
+    Extend the lookup tables from a JSON file with any of the keys
+    "explanations" (level -> {key: text}), "importance", "learning_tips"
+    and "common_questions"
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for level, table in data.get("explanations", {}).items():
+        EXPLANATIONS.setdefault(level, {}).update((key.lower(), text) for key, text in table.items())
+    IMPORTANCE.update((key.lower(), text) for key, text in data.get("importance", {}).items())
+    LEARNING_TIPS.update(data.get("learning_tips", {}))
+    COMMON_QUESTIONS.update((key.lower(), qs) for key, qs in data.get("common_questions", {}).items())
+    compile_tables()
+
+compile_tables()
+
+class SessionContext:
+    """
+    State of one interactive study session: the syllabus being studied, the
+    text stream its output goes to and the function asking the learner to go
+    on (called with a prompt, like input). Created per call, so one
+    StudyAssistant can run sessions on many threads at once.
+    """
+    
+    def __init__(self, output=None, ask=None, syllabus: dict = None):
+        self.output = output if output is not None else sys.stdout
+        self.ask = ask if ask is not None else input
+        self.syllabus = syllabus
+    
+    def write(self, *lines: str):
+        """Write lines to the session output"""
+        write_stream((f"{line}\n" for line in lines), self.output)
+
 class StudyAssistant:
-    def __init__(self):
+    """
+    Runs study sessions. The assistant and its builder hold no per-session
+    state, so one instance can be shared between threads; each session's
+    output goes to its own sink (see SessionContext).
+    """
+    
+    def __init__(self, builder: SyllabusBuilder = None, output=None):
         self.name = "AI Study Assistant"
-        self.builder = SyllabusBuilder()
-        self.current_syllabus = None
+        self.builder = builder or SyllabusBuilder()
+        self.output = output  # Default text stream for sessions, None for sys.stdout
+        self._local = threading.local()
+    
+    @property
+    def current_syllabus(self):
+        """Syllabus of the latest session started on the calling thread"""
+        return getattr(self._local, "syllabus", None)
+    
+    @current_syllabus.setter
+    def current_syllabus(self, syllabus: dict):
+        self._local.syllabus = syllabus
     
-    def start_study_session(self, topic: str, hours: int = 10, level: str = "beginner"):
-        """Start a complete study session"""
-        print(f"\n🤖 {self.name} starting session...")
-        print(f"📘 Topic: {topic}")
-        print(f"⏱️  Hours: {hours}")
-        print(f"🎓 Level: {level}")
-        print("=" * 50)
+    @profiled
+    @stage("study_session")
+    def start_study_session(self, topic: str, hours: int = 10, level: str = "beginner",
+                            output=None, ask=None):
+        """Start a complete study session, writing to output (default: the assistant's output)"""
+        context = SessionContext(output if output is not None else self.output, ask)
+        context.write(f"\n🤖 {self.name} starting session...",
+                      f"📘 Topic: {topic}",
+                      f"⏱️  Hours: {hours}",
+                      f"🎓 Level: {level}",
+                      "=" * 50)
         
         # Step 1: Create syllabus
-        self.current_syllabus = self.builder.create_syllabus(topic, hours, level)
+        context.syllabus = self.builder.create_syllabus(topic, hours, level, output=context.output)
+        self.current_syllabus = context.syllabus
         
         # Step 2: Display syllabus
-        self._display_syllabus()
+        self._display_syllabus(context=context)
         
         # Step 3: Guide through modules
-        self._guide_study()
+        self._guide_study(context)
         
         # Step 4: Provide summary
-        self._provide_summary()
-        
-        return self.current_syllabus
-    
-    def _display_syllabus(self):
-        """Display the created syllabus"""
-        syllabus = self.current_syllabus
-        
-        print(f"\n📋 SYLLABUS: {syllabus['topic'].upper()}")
-        print("=" * 50)
-        print(f"📝 Description: {syllabus['description']}")
-        print(f"⏱️  Total Hours: {syllabus['total_hours']}")
-        print(f"🎓 Level: {syllabus['level']}")
-        
-        print(f"\n📚 Prerequisites:")
-        for prereq in syllabus['prerequisites']:
-            print(f"  • {prereq}")
-        
-        print(f"\n📖 Modules:")
-        for i, module in enumerate(syllabus['modules'], 1):
-            print(f"\n  {i}. {module['title']} ({module['hours']} hours)")
-            print(f"     📌 Topics to cover:")
-            for topic in module['topics']:
-                print(f"       • {topic}")
-            print(f"     💻 Exercises:")
-            for exercise in module['exercises']:
-                print(f"       • {exercise}")
-        
-        print(f"\n📅 Weekly Study Plan:")
-        for week in syllabus['study_plan']:
-            print(f"\n  Week {week['week']} ({week['hours']} hours):")
-            for module in week['modules']:
-                print(f"    • {module['title']}")
-    
-    def _guide_study(self):
+        self._provide_summary(context)
+        
+        return context.syllabus
+    
+    def _context(self, context: SessionContext = None) -> SessionContext:
+        """The given session, or one for this thread's current syllabus"""
+        if context is None:
+            context = SessionContext(self.output, syllabus=self.current_syllabus)
+        return context
+    
+    @stage("display_syllabus")
+    def _display_syllabus(self, weeks=None, context: SessionContext = None):
+        """Display the created syllabus (optionally only some weeks)"""
+        context = self._context(context)
+        write_stream(render_syllabus(context.syllabus, weeks), context.output)
+    
+    @stage("guide_study")
+    def _guide_study(self, context: SessionContext = None):
         """Guide user through study modules"""
-        syllabus = self.current_syllabus
+        context = self._context(context)
+        session = StudySession.resume(context.syllabus, self)
         
-        print(f"\n🚀 LET'S START LEARNING!")
-        print("=" * 50)
+        context.write(f"\n🚀 LET'S START LEARNING!", "=" * 50)
         
-        for i, module in enumerate(syllabus['modules'], 1):
-            print(f"\n📘 MODULE {i}: {module['title']}")
-            print(f"⏱️  Estimated time: {module['hours']} hours")
-            print("-" * 40)
+        step = session.next_module()
+        while step is not None:
+            context.write(f"\n📘 MODULE {step['number']}: {step['title']}",
+                          f"⏱️  Estimated time: {step['hours']} hours",
+                          "-" * 40)
             
             # Explain the module
-            self._explain_module(module, syllabus['level'])
+            write_stream([step['explanation']], context.output)
             
             # Ask if ready to proceed
-            if i < len(syllabus['modules']):
-                input(f"\n⏭️  Press Enter to continue to next module...")
+            if not step['last']:
+                context.ask(f"\n⏭️  Press Enter to continue to next module...")
             else:
-                print(f"\n✅ Module completed!")
+                context.write(f"\n✅ Module completed!")
+            step = session.next_module()
     
-    def _explain_module(self, module: dict, level: str):
+    def _explain_module(self, module: dict, level: str, output=None):
         """Explain a module in detail"""
-        print(f"\n📚 What you'll learn:")
+        context = SessionContext(output if output is not None else self.output)
+        write_stream(self._render_module(module, level), context.output)
+    
+    def _render_module(self, module: dict, level: str):
+        """Yield the explanation of a module as text chunks"""
+        yield f"\n📚 What you'll learn:\n"
         for topic in module['topics']:
-            print(f"  • {self._explain_topic(topic, level)}")
+            yield f"  • {self._explain_topic(topic, level)}\n"
         
-        print(f"\n🎯 Why this matters:")
-        print(f"  {self._get_importance(module['title'], level)}")
+        yield f"\n🎯 Why this matters:\n"
+        yield f"  {self._get_importance(module['title'], level)}\n"
         
-        print(f"\n💡 Learning tips for {level} level:")
-        tips = self._get_learning_tips(level)
-        for tip in tips:
-            print(f"  • {tip}")
+        yield f"\n💡 Learning tips for {level} level:\n"
+        for tip in self._get_learning_tips(level):
+            yield f"  • {tip}\n"
         
-        print(f"\n💻 Hands-on exercises:")
+        yield f"\n💻 Hands-on exercises:\n"
         for exercise in module['exercises']:
-            print(f"  • {exercise}")
+            yield f"  • {exercise}\n"
         
-        print(f"\n❓ Common questions:")
-        questions = self._get_common_questions(module['title'])
-        for q in questions:
-            print(f"  Q: {q['question']}")
-            print(f"  A: {q['answer']}")
+        yield f"\n❓ Common questions:\n"
+        for q in self._get_common_questions(module['title']):
+            yield f"  Q: {q['question']}\n"
+            yield f"  A: {q['answer']}\n"
     
     def _explain_topic(self, topic: str, level: str) -> str:
         """Explain a topic based on level"""
-        explanations = {
-            "beginner": {
-                "process vs thread": "Process is a program in execution, thread is a lightweight process within it",
-                "virtual memory": "Makes computer think it has more memory than physically available",
-                "paging": "Memory management technique that avoids external fragmentation",
-                "linear regression": "Predicts continuous values using a straight line",
-                "classes & objects": "Blueprint (class) creates instances (objects) with specific properties"
-            }
-        }
-        
-        topic_lower = topic.lower()
-        for key in explanations.get(level, {}):
-            if key in topic_lower:
-                return explanations[level][key]
-        
-        return topic  # Return as-is if no specific explanation
+        matcher = _explanation_matchers.get(level)
+        if matcher is None:
+            return topic
+        return matcher.find(topic, topic)  # Return as-is if no specific explanation
     
     def _get_importance(self, module_title: str, level: str) -> str:
         """Explain why module is important"""
-        importance = {
-            "process management": "Essential for understanding how OS manages multiple programs",
-            "memory management": "Critical for optimizing computer performance",
-            "python basics": "Foundation for all Python programming",
-            "supervised learning": "Most common ML approach used in industry"
-        }
-        
-        for key in importance:
-            if key in module_title.lower():
-                return importance[key]
-        
-        return "Fundamental for building strong understanding"
+        return _importance_matcher.find(module_title, "Fundamental for building strong understanding")
     
     def _get_learning_tips(self, level: str) -> list:
         """Get learning tips for the level"""
-        tips = {
-            "beginner": [
-                "Take notes as you learn",
-                "Practice with simple examples first",
-                "Don't rush - focus on understanding",
-                "Ask questions when stuck",
-                "Review previous lessons regularly"
-            ],
-            "intermediate": [
-                "Build small projects to apply concepts",
-                "Read documentation alongside tutorials",
-                "Join study groups or forums",
-                "Teach others to reinforce learning",
-                "Challenge yourself with complex problems"
-            ],
-            "advanced": [
-                "Read research papers in the field",
-                "Contribute to open source projects",
-                "Attend conferences or webinars",
-                "Mentor beginners",
-                "Stay updated with latest developments"
-            ]
-        }
-        
-        return tips.get(level, tips["beginner"])
+        return LEARNING_TIPS.get(level, LEARNING_TIPS["beginner"])
     
     def _get_common_questions(self, module_title: str) -> list:
         """Get common questions for the module"""
-        questions_db = {
-            "process management": [
-                {
-                    "question": "What's the difference between process and thread?",
-                    "answer": "Process has separate memory space, threads share memory within a process"
-                },
-                {
-                    "question": "What is deadlock?",
-                    "answer": "When two or more processes wait for each other indefinitely"
-                }
-            ],
-            "python programming": [
-                {
-                    "question": "What are Python lists vs tuples?",
-                    "answer": "Lists are mutable, tuples are immutable (cannot be changed)"
-                },
-                {
-                    "question": "What is __init__ in Python?",
-                    "answer": "Constructor method that initializes object attributes"
-                }
-            ]
-        }
-        
-        for key in questions_db:
-            if key in module_title.lower():
-                return questions_db[key]
-        
-        return [
-            {
-                "question": "How do I get started?",
-                "answer": "Begin with the first exercise and build from there"
-            },
-            {
-                "question": "What if I don't understand something?",
-                "answer": "Review the basics, search online, or ask for help"
-            }
-        ]
-    
-    def _provide_summary(self):
+        return _question_matcher.find(module_title, DEFAULT_QUESTIONS)
+    
+    def _provide_summary(self, context: SessionContext = None):
         """Provide end of session summary"""
-        syllabus = self.current_syllabus
+        context = self._context(context)
+        syllabus = context.syllabus
         
-        print(f"\n" + "=" * 50)
-        print(f"🎉 STUDY SESSION COMPLETE!")
-        print("=" * 50)
+        context.write(f"\n" + "=" * 50,
+                      f"🎉 STUDY SESSION COMPLETE!",
+                      "=" * 50)
         
-        print(f"\n📊 Summary:")
-        print(f"  • Topic: {syllabus['topic']}")
-        print(f"  • Total hours: {syllabus['total_hours']}")
-        print(f"  • Modules completed: {len(syllabus['modules'])}")
-        print(f"  • Level: {syllabus['level']}")
+        context.write(f"\n📊 Summary:",
+                      f"  • Topic: {syllabus['topic']}",
+                      f"  • Total hours: {syllabus['total_hours']}",
+                      f"  • Modules completed: {len(syllabus['modules'])}",
+                      f"  • Level: {syllabus['level']}")
         
-        print(f"\n📚 Recommended next steps:")
-        print(f"  1. Review your notes")
-        print(f"  2. Complete all exercises")
-        print(f"  3. Build a small project")
-        print(f"  4. Teach someone what you learned")
+        context.write(f"\n📚 Recommended next steps:",
+                      f"  1. Review your notes",
+                      f"  2. Complete all exercises",
+                      f"  3. Build a small project",
+                      f"  4. Teach someone what you learned")
         
-        print(f"\n🔗 Useful resources:")
-        for resource in syllabus['resources']:
-            print(f"  • {resource}")
+        context.write(f"\n🔗 Useful resources:", *(f"  • {resource}" for resource in syllabus['resources']))
         
-        print(f"\n💪 Keep learning! Consistency is key to mastery.")
\ No newline at end of file
+        context.write(f"\n💪 Keep learning! Consistency is key to mastery.")
+
+class StudySession:
+    """
+    One learner's guided walkthrough, without console I/O. Every call is a
+    separate event (start, next module), so a server can interleave many
+    sessions and keep only this small object per learner.
+    """
+    
+    def __init__(self, topic: str, hours: int = 10, level: str = "beginner",
+                 hours_per_week: int = 5, assistant: StudyAssistant = None,
+                 progress=None, user: str = "local"):
+        self.topic = topic
+        self.hours = hours
+        self.level = level
+        self.hours_per_week = hours_per_week
+        self.assistant = assistant or StudyAssistant()
+        self.progress = progress  # Optional ProgressStore
+        self.user = user
+        self.plan = None
+        self.syllabus = None
+        self.position = 0   # Modules explained so far
+        self.completed = 0  # Modules recorded as completed
+    
+    @classmethod
+    def resume(cls, syllabus: dict, assistant: StudyAssistant = None, position: int = 0) -> "StudySession":
+        """Create a session for an existing syllabus"""
+        session = cls(syllabus['topic'], syllabus['total_hours'], syllabus['level'], assistant=assistant)
+        session.syllabus = syllabus
+        session.position = position
+        return session
+    
+    @property
+    def finished(self) -> bool:
+        return self.syllabus is not None and self.position >= len(self.syllabus['modules'])
+    
+    def start(self) -> dict:
+        """Create the syllabus for this session"""
+        request = (self.topic, self.hours, self.level, self.hours_per_week)
+        _, self.syllabus = next(self.assistant.builder.create_syllabi([request]))
+        if self.progress is not None:
+            self.plan = self.progress.register_plan(self.user, self.syllabus, hours_per_week=self.hours_per_week)
+        return self.syllabus
+    
+    def next_module(self):
+        """Explain the next module, or return None once every module is done"""
+        if self.syllabus is None:
+            self.start()
+        
+        # Moving on means the previous module is done
+        self._record_completed()
+        if self.finished:
+            return None
+        
+        module = self.syllabus['modules'][self.position]
+        self.position += 1
+        return {
+            "number": self.position,
+            "title": module['title'],
+            "hours": module['hours'],
+            "explanation": "".join(self.assistant._render_module(module, self.syllabus['level'])),
+            "last": self.finished
+        }
+    
+    def _record_completed(self):
+        if self.progress is None or self.plan is None:
+            return
+        while self.completed < self.position:
+            module = self.syllabus['modules'][self.completed]
+            self.progress.record(self.user, self.plan, self.completed, module['hours'], completed=True)
+            self.completed += 1
+    
+    def summary(self) -> dict:
+        """Get the end of session summary"""
+        syllabus = self.syllabus
+        return {
+            "topic": syllabus['topic'],
+            "total_hours": syllabus['total_hours'],
+            "modules_completed": self.position,
+            "level": syllabus['level'],
+            "resources": list(syllabus['resources'])
+        }
\ No newline at end of file
@@ -0,0 +1,254 @@
+"""
+Calendar-aware scheduling: dated study sessions and iCalendar (.ics) export
+A weekly study plan is placed into real study windows from a start date on,
+skipping blackout dates, and can be streamed out as calendar events.
+"""
+
+import threading
+import zlib
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta, timezone
+
+from renderer import write_stream
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+DEFAULT_AVAILABILITY = "mon-fri 18:00-20:00"
+MINUTES_PER_DAY = 24 * 60
+ICS_PRODUCT = "-//Study Assistant//Study Plan//EN"
+
+class StudyCalendar:
+    """
+    Free study time from a start date on: weekly windows minus blackout
+    dates. The windows are precomputed as a timeline with the free minutes
+    before each one, so placing a session is one binary search and placing N
+    sessions costs O(N log N). The timeline grows on demand and is shared by
+    every plan placed with the calendar (e.g. a whole batch run).
+    """
+
+    def __init__(self, start=None, availability=DEFAULT_AVAILABILITY, blackouts=(), horizon_weeks: int = 26):
+        self.start = _date(start) if start is not None else date.today()
+        if isinstance(availability, str):
+            availability = parse_availability(availability)
+        self.weekly = _weekly_windows(availability)  # Weekday -> [(start, end)] minutes after midnight
+        if not any(self.weekly):
+            raise ValueError("availability has no study time")
+        self.blackouts = frozenset(_date(day) for day in blackouts)
+        self._starts = array("q")  # Window start, in minutes from the start date
+        self._ends = array("q")    # Window end
+        self._before = array("q")  # Free minutes before the window
+        self._free = 0             # Free minutes in the timeline so far
+        self._dates = []           # Day -> "YYYYMMDD"
+        self._lock = threading.Lock()
+        self._extend(horizon_weeks * 7)
+
+    def place(self, study_plan: list, follow_weeks: bool = True) -> list:
+        """
+        Place a weekly plan (syllabus["study_plan"]) into study windows:
+        [(module_id, title, start, end)] with datetimes, in plan order. With
+        follow_weeks, week n of the plan starts no earlier than n - 1 weeks
+        after the start date; otherwise sessions follow each other in the
+        next free time. Parts longer than a window continue in the next one.
+        """
+        base = datetime.combine(self.start, time())
+        return [(module_id, title, base + timedelta(minutes=start), base + timedelta(minutes=end))
+                for module_id, title, start, end in self._sessions(study_plan, follow_weeks)]
+
+    def _sessions(self, study_plan: list, follow_weeks: bool = True):
+        """Yield (module_id, title, start minute, end minute) for each session of a plan"""
+        position = 0  # Free minutes used so far
+        for week in study_plan:
+            if follow_weeks:
+                position = max(position, self._free_before((week["week"] - 1) * 7 * MINUTES_PER_DAY))
+            for part in week["modules"]:
+                left = round(part["hours"] * 60)
+                while left > 0:
+                    if position >= self._free:
+                        self._grow()
+                        continue
+                    i = bisect_right(self._before, position) - 1
+                    start = self._starts[i] + position - self._before[i]
+                    end = min(self._ends[i], start + left)
+                    yield part["module"], part["title"], start, end
+                    position += end - start
+                    left -= end - start
+
+    def _free_before(self, minute: int) -> int:
+        """Free minutes in the timeline before a minute"""
+        while len(self._dates) * MINUTES_PER_DAY < minute:
+            self._grow()
+        i = bisect_right(self._ends, minute)
+        if i == len(self._ends):
+            return self._free
+        return self._before[i] + max(0, minute - self._starts[i])
+
+    def _grow(self):
+        """Double the timeline (by at least a week, so an empty one grows too)"""
+        self._extend(len(self._dates) + max(7, len(self._dates)))
+
+    def _extend(self, days: int):
+        """Add the windows of the days up to days (blackout dates have none)"""
+        with self._lock:
+            for day in range(len(self._dates), days):
+                current = self.start + timedelta(days=day)
+                self._dates.append(current.strftime("%Y%m%d"))
+                if current in self.blackouts:
+                    continue
+                offset = day * MINUTES_PER_DAY
+                for start, end in self.weekly[current.weekday()]:
+                    self._starts.append(offset + start)
+                    self._ends.append(offset + end)
+                    self._before.append(self._free)
+                    self._free += end - start
+
+    def _stamp(self, minute: int) -> str:
+        """Local (floating) iCalendar date-time of a minute"""
+        day, minute = divmod(minute, MINUTES_PER_DAY)
+        if day >= len(self._dates):  # A window ending at midnight of the last day
+            self._extend(day + 1)
+        return f"{self._dates[day]}T{minute // 60:02d}{minute % 60:02d}00"
+
+def parse_availability(text: str) -> list:
+    """
+    Parse weekly study windows such as "mon-fri 18:00-20:00; sat,sun
+    10:00-12:00 14:00-16:00" (days are mon..sun, ranges of them, "daily",
+    "weekdays" or "weekends"). Returns seven lists of (start, end) minutes.
+    """
+    windows = {}
+    for group in text.split(";"):
+        fields = group.split()
+        if not fields:
+            continue
+        if len(fields) < 2:
+            raise ValueError(f"availability '{group.strip()}' needs days and at least one time range")
+        days = _days(fields[0])
+        for field in fields[1:]:
+            start, separator, end = field.partition("-")
+            if not separator:
+                raise ValueError(f"time range '{field}' should look like 18:00-20:00")
+            for day in days:
+                windows.setdefault(day, []).append((start, end))
+    return _weekly_windows(windows)
+
+def write_ics(syllabi, f, calendar: StudyCalendar, follow_weeks: bool = True, name: str = None,
+              stamp: datetime = None, start: int = 0) -> int:
+    """
+    Stream the sessions of syllabi into one iCalendar file (a text stream
+    opened with newline=""). Events are written as they are placed, so
+    batches of any size use constant memory. Returns the characters written.
+    """
+    return write_stream(ics_chunks(syllabi, calendar, follow_weeks, name, stamp, start), f)
+
+def ics_chunks(syllabi, calendar: StudyCalendar, follow_weeks: bool = True, name: str = None,
+               stamp: datetime = None, start: int = 0):
+    """Yield the iCalendar text of syllabi, one event at a time"""
+    stamp = (stamp or datetime.now(timezone.utc)).astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:{ICS_PRODUCT}\r\nCALSCALE:GREGORIAN\r\n"
+    if name:
+        yield _fold(f"X-WR-CALNAME:{_escape(name)}")
+
+    for plan, syllabus in enumerate(syllabi, start):
+        topic = _escape(syllabus["topic"])
+        # UIDs are stable for a plan, so re-importing an updated export replaces its events
+        uid = f"{plan}-{zlib.crc32(syllabus['topic'].encode('utf-8')):08x}-{calendar.start:%Y%m%d}"
+        descriptions = {}
+        for n, (module_id, title, begin, end) in enumerate(calendar._sessions(syllabus["study_plan"],
+                                                                              follow_weeks)):
+            description = descriptions.get(module_id)
+            if description is None:
+                topics = ", ".join(syllabus["modules"][module_id]["topics"])
+                description = descriptions[module_id] = _fold(f"DESCRIPTION:{_escape(topics)}") if topics else ""
+            yield (f"BEGIN:VEVENT\r\nUID:{uid}-{n}@study-assistant\r\nDTSTAMP:{stamp}\r\n"
+                   f"DTSTART:{calendar._stamp(begin)}\r\nDTEND:{calendar._stamp(end)}\r\n"
+                   f"{_fold(f'SUMMARY:{topic}: {_escape(title)}')}{description}END:VEVENT\r\n")
+    yield "END:VCALENDAR\r\n"
+
+def _date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid date {value!r}, expected YYYY-MM-DD") from None
+
+def _days(text: str) -> list:
+    """Weekday numbers (0 = Monday) of a day list such as mon,wed or mon-fri"""
+    named = {"daily": range(7), "weekdays": range(5), "weekends": range(5, 7)}
+    days = []
+    for item in text.lower().split(","):
+        if item in named:
+            days.extend(named[item])
+            continue
+        first, _, last = item.partition("-")
+        if first not in WEEKDAYS or (last and last not in WEEKDAYS):
+            raise ValueError(f"unknown day '{item}', use mon..sun, daily, weekdays or weekends")
+        first = WEEKDAYS.index(first)
+        last = WEEKDAYS.index(last) if last else first
+        days.extend(day % 7 for day in range(first, last + 1 if last >= first else last + 8))
+    return days
+
+def _weekly_windows(windows) -> list:
+    """Sorted, merged (start, end) minutes per weekday from {day: [(start, end)]} or seven lists"""
+    if not isinstance(windows, dict):
+        windows = dict(enumerate(windows))
+    weekly = [[] for _ in WEEKDAYS]
+    for day, ranges in windows.items():
+        if isinstance(day, str):
+            day = WEEKDAYS.index(day.lower()[:3]) if day.lower()[:3] in WEEKDAYS else -1
+        if not 0 <= day < 7:
+            raise ValueError(f"unknown day {day!r}")
+        for start, end in ranges:
+            start, end = _minutes(start), _minutes(end)
+            if end <= start:
+                raise ValueError("study windows must end after they start (and within the day)")
+            weekly[day].append((start, end))
+    for day, ranges in enumerate(weekly):
+        merged = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        weekly[day] = merged
+    return weekly
+
+def _minutes(value) -> int:
+    """Minutes after midnight of a time, "HH:MM" (up to 24:00) or a minute count"""
+    if isinstance(value, int):
+        minutes = value
+    elif isinstance(value, time):
+        minutes = value.hour * 60 + value.minute
+    else:
+        hours, _, minutes = str(value).partition(":")
+        try:
+            minutes = int(hours) * 60 + int(minutes or 0)
+        except ValueError:
+            raise ValueError(f"invalid time {value!r}, expected HH:MM") from None
+    if not 0 <= minutes <= MINUTES_PER_DAY:
+        raise ValueError(f"time {value!r} is outside the day")
+    return minutes
+
+def _escape(text: str) -> str:
+    """Escape iCalendar TEXT"""
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+def _fold(line: str) -> str:
+    """End a content line, folding it at 75 octets"""
+    if len(line) <= 75 and line.isascii():
+        return line + "\r\n"
+    parts = []
+    current = []
+    size = 0
+    for char in line:
+        length = len(char.encode("utf-8"))
+        if size + length > 75:
+            parts.append("".join(current))
+            current = [" "]  # Continuation lines start with a space
+            size = 1
+        current.append(char)
+        size += length
+    parts.append("".join(current))
+    return "\r\n".join(parts) + "\r\n"
@@ -2,23 +2,89 @@
 Builds structured syllabus based on topic and hours
 """
 
-from knowledge_base import get_topic_knowledge
+from itertools import chain, islice, repeat
+
+from allocator import apportion
+from curriculum import Module
+from instrumentation import stage
+from knowledge_base import find_entry, get_state, get_topic_knowledge, set_state
+from scheduler import schedule
+from syllabus_cache import SyllabusCache
 
 class SyllabusBuilder:
-    def __init__(self):
+    """
+    Builds syllabi from the knowledge base. Builds are pure functions of
+    their arguments and the (immutable) catalog entries, so one builder can
+    be shared between threads; progress messages go to output.
+    """
+    
+    def __init__(self, cache: SyllabusCache = None, output=None):
         self.name = "Study Assistant"
+        self.cache = cache    # Optional SyllabusCache shared between requests
+        self.output = output  # Text stream for progress messages, None for sys.stdout
     
-    def create_syllabus(self, topic: str, total_hours: int = 10, level: str = "beginner") -> dict:
+    @stage("create_syllabus")
+    def create_syllabus(self, topic: str, total_hours: int = 10, level: str = "beginner",
+                        hours_per_week: int = 5, output=None) -> dict:
         """
         Create a structured syllabus for the given topic
         """
-        print(f"\n📝 Creating syllabus for '{topic}'...")
+        print(f"\n📝 Creating syllabus for '{topic}'...", file=output if output is not None else self.output)
+        return self._get_syllabus(topic, total_hours, level, hours_per_week)
+    
+    def create_syllabi(self, requests, workers: int = None, chunksize: int = 64):
+        """
+        Create many syllabi without console output, yielding (request, syllabus)
+        pairs as they complete. Requests are (topic, hours, level[, hours_per_week])
+        tuples or dicts; with workers set, chunks are built in a process pool.
+        Workers start with the catalog as it is when the pool starts (backend,
+        runtime add_topic changes and topic index) and a cache of their own
+        with this builder's settings; later add_topic calls are not seen.
+        """
+        if not workers:
+            for request in requests:
+                yield request, self._get_syllabus(*_request_args(request))
+            return
         
-        # Get topic knowledge
-        knowledge = get_topic_knowledge(topic)
+        # The process pool machinery is slow to import, so it is only loaded for pooled batches
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+        cache = (self.cache.maxsize, self.cache.ttl) if self.cache is not None else None
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(get_state(), cache)) as pool:
+            pending = set()
+            for chunk in _chunked(requests, chunksize):
+                pending.add(pool.submit(_build_chunk, chunk))
+                # Keep a bounded number of chunks in flight so requests can stream
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            for future in as_completed(pending):
+                yield from future.result()
+    
+    @stage("get_syllabus")
+    def _get_syllabus(self, topic: str, total_hours: int, level: str, hours_per_week: int = 5) -> dict:
+        """Get a syllabus from the cache or build it"""
+        if self.cache is None:
+            return self._build_syllabus(topic, total_hours, level, hours_per_week, get_topic_knowledge(topic))
         
-        # Adjust based on level
-        modules = self._adjust_for_level(knowledge["modules"], level)
+        # Cached syllabi are only reused while the entry the topic resolves to (by name
+        # or by meaning) is unchanged
+        key = (topic, total_hours, level, hours_per_week)
+        source = find_entry(topic)
+        syllabus = self.cache.get(key, source)
+        if syllabus is None:
+            knowledge = source if source is not None else get_topic_knowledge(topic)
+            syllabus = self._build_syllabus(topic, total_hours, level, hours_per_week, knowledge)
+            self.cache.put(key, syllabus, source)
+        return syllabus
+    
+    @stage("build_syllabus")
+    def _build_syllabus(self, topic: str, total_hours: int, level: str, hours_per_week: int, knowledge) -> dict:
+        """Build a syllabus from a knowledge entry"""
+        # Adjust based on level (modules are shared records, never mutated)
+        modules = tuple(Module.from_dict(module) for module in knowledge["modules"])
+        modules = self._adjust_for_level(modules, level)
         
         # Adjust hours distribution
         modules = self._adjust_hours(modules, total_hours)
@@ -32,94 +98,167 @@ class SyllabusBuilder:
             "prerequisites": knowledge["prerequisites"],
             "resources": knowledge["resources"],
             "modules": modules,
-            "study_plan": self._create_study_plan(modules)
+            "study_plan": self._create_study_plan(modules, hours_per_week)
         }
         
         return syllabus
     
-    def _adjust_for_level(self, modules: list, level: str) -> list:
+    @stage("adjust_for_level")
+    def _adjust_for_level(self, modules: tuple, level: str) -> tuple:
         """Adjust modules based on user level"""
-        adjusted_modules = modules.copy()
+        adjusted_modules = []
         
-        if level == "beginner":
-            # Simplify for beginners
-            for module in adjusted_modules:
-                if "advanced" in module["title"].lower():
-                    module["hours"] = max(1, module["hours"] - 1)
+        for module in modules:
+            if level == "beginner":
+                # Simplify for beginners
+                hours = module.hours
+                if "advanced" in module.title.lower():
+                    hours = max(1, hours - 1)
                 # Keep exercises simple
-                module["exercises"] = [ex for ex in module["exercises"] if "simple" in ex.lower() or "basic" in ex.lower() or len(module["exercises"]) == 1]
-        
-        elif level == "advanced":
-            # Add complexity for advanced
-            for module in adjusted_modules:
-                if "advanced" in module["title"].lower():
-                    module["hours"] += 1
-                module["exercises"].append("Research current trends")
+                exercises = [ex for ex in module.exercises if "simple" in ex.lower() or "basic" in ex.lower() or len(module.exercises) == 1]
+                module = module.replace(hours=hours, exercises=exercises)
+            
+            elif level == "advanced":
+                # Add complexity for advanced
+                hours = module.hours
+                if "advanced" in module.title.lower():
+                    hours += 1
+                module = module.replace(hours=hours, exercises=module.exercises + ("Research current trends",))
+            
+            adjusted_modules.append(module)
         
-        return adjusted_modules
+        return tuple(adjusted_modules)
     
-    def _adjust_hours(self, modules: list, total_hours: int) -> list:
+    @stage("adjust_hours")
+    def _adjust_hours(self, modules: tuple, total_hours: int) -> tuple:
         """Adjust module hours to match total hours"""
-        current_total = sum(module["hours"] for module in modules)
-        
-        if current_total == total_hours:
-            return modules
-        
-        # Calculate ratio and adjust
-        ratio = total_hours / current_total
-        for module in modules:
-            module["hours"] = max(1, round(module["hours"] * ratio))
-        
-        # Recalculate to ensure exact total
-        current_total = sum(module["hours"] for module in modules)
-        if current_total != total_hours:
-            diff = total_hours - current_total
-            if diff > 0:
-                # Add hours to largest module
-                modules[-1]["hours"] += diff
-            else:
-                # Remove hours from smallest module
-                modules[0]["hours"] = max(1, modules[0]["hours"] + diff)
-        
-        return modules
+        # Every module gets at least an hour unless there are fewer hours than modules
+        minimum = 1 if total_hours >= len(modules) else 0
+        hours = apportion([module.hours for module in modules], total_hours, minimum)
+        return tuple(module.replace(hours=h) for module, h in zip(modules, hours))
     
-    def _create_study_plan(self, modules: list) -> list:
+    @stage("create_study_plan")
+    def _create_study_plan(self, modules: tuple, hours_per_week=5) -> list:
         """Create weekly study plan"""
-        plan = []
-        week = 1
-        hours_per_week = 5  # Assume 5 hours per week
+        weeks = schedule([module.hours for module in modules], hours_per_week)
+        return self._plan_weeks(modules, weeks)
+    
+    def _plan_weeks(self, modules, weeks: dict, first_module: int = 0, first_week: int = 1) -> list:
+        """Turn a schedule of modules into weekly plan entries (ids and weeks offset as given)"""
+        # Number the parts of modules that span several weeks
+        parts = [0] * len(modules)
+        for week_parts in weeks.values():
+            for module_id, _ in week_parts:
+                parts[module_id] += 1
         
-        current_module = 0
-        while current_module < len(modules):
+        plan = []
+        seen = [0] * len(modules)
+        for week, week_parts in weeks.items():
             week_plan = {
-                "week": week,
+                "week": week + first_week - 1,
                 "modules": [],
                 "hours": 0
             }
-            
-            week_hours = 0
-            while current_module < len(modules) and week_hours + modules[current_module]["hours"] <= hours_per_week:
-                module = modules[current_module]
+            for module_id, hours in week_parts:
+                title = modules[module_id].title
+                seen[module_id] += 1
+                if parts[module_id] > 1:
+                    title = f"{title} (Part {seen[module_id]})"
                 week_plan["modules"].append({
-                    "title": module["title"],
-                    "hours": module["hours"]
+                    "module": module_id + first_module,
+                    "title": title,
+                    "hours": hours
                 })
-                week_hours += module["hours"]
-                current_module += 1
-            
-            # If module is too big, split it
-            if current_module < len(modules) and week_hours < hours_per_week:
-                remaining_hours = hours_per_week - week_hours
-                if remaining_hours > 0:
-                    module = modules[current_module]
-                    week_plan["modules"].append({
-                        "title": f"{module['title']} (Part 1)",
-                        "hours": remaining_hours
-                    })
-                    modules[current_module]["hours"] -= remaining_hours
-            
-            week_plan["hours"] = week_hours
+                week_plan["hours"] += hours
             plan.append(week_plan)
-            week += 1
         
-        return plan
\ No newline at end of file
+        return plan
+    
+    @stage("replan")
+    def replan(self, syllabus: dict, completed: int, total_hours: int = None, hours_per_week: int = 5,
+               level: str = None, knowledge=None) -> dict:
+        """
+        Re-plan the rest of a syllabus after its first completed modules are
+        done, for a new total of hours, weekly capacity and/or level. Finished
+        modules and weeks are kept; the remaining modules are re-leveled and
+        re-apportioned (from the catalog entry, or knowledge if given) and
+        scheduled from where the finished work ends, at hours_per_week (syllabi
+        do not record the capacity they were built with). Work is
+        proportional to the remaining modules. Returns a new syllabus.
+        """
+        modules = syllabus["modules"]
+        if not 0 <= completed <= len(modules):
+            raise ValueError(f"completed must be between 0 and {len(modules)}")
+        level = level or syllabus["level"]
+        total_hours = syllabus["total_hours"] if total_hours is None else total_hours
+        remaining = tuple(modules[completed:])
+        done_hours = syllabus["total_hours"] - sum(module.hours for module in remaining)
+        
+        if level != syllabus["level"] or total_hours != syllabus["total_hours"]:
+            # Level and hour changes start again from the catalog's base hours
+            if knowledge is None:
+                knowledge = get_topic_knowledge(syllabus["topic"])
+            if len(knowledge["modules"]) != len(modules):
+                raise ValueError(f"catalog entry for '{syllabus['topic']}' no longer matches the syllabus")
+            remaining = tuple(Module.from_dict(module) for module in islice(knowledge["modules"], completed, None))
+            remaining = self._adjust_for_level(remaining, level)
+            remaining = self._adjust_hours(remaining, max(0, total_hours - done_hours)) if remaining else ()
+        
+        # Keep the weeks before the first one with unfinished work and the finished
+        # parts of that week; the rest of the plan starts in the last kept week's free hours
+        plan = syllabus["study_plan"]
+        low, high = 0, len(plan)
+        while low < high:
+            middle = (low + high) // 2
+            if plan[middle]["modules"] and plan[middle]["modules"][-1]["module"] >= completed:
+                high = middle
+            else:
+                low = middle + 1
+        kept = plan[:low]
+        if low < len(plan):
+            finished = [part for part in plan[low]["modules"] if part["module"] < completed]
+            if finished:
+                kept.append(dict(plan[low], modules=finished, hours=sum(part["hours"] for part in finished)))
+        
+        rest_hours = [module.hours for module in remaining]
+        free = hours_per_week - kept[-1]["hours"] if kept else 0
+        if free > 0 and any(rest_hours):
+            last = kept.pop()
+            weeks = schedule(rest_hours, chain((free,), repeat(hours_per_week)))
+            rest = self._plan_weeks(remaining, weeks, completed, last["week"])
+            rest[0] = dict(last, modules=last["modules"] + rest[0]["modules"], hours=last["hours"] + rest[0]["hours"])
+        else:
+            weeks = schedule(rest_hours, hours_per_week)
+            rest = self._plan_weeks(remaining, weeks, completed, kept[-1]["week"] + 1 if kept else 1)
+        
+        return dict(syllabus, total_hours=done_hours + sum(module.hours for module in remaining), level=level,
+                    modules=tuple(modules[:completed]) + remaining, study_plan=kept + rest)
+
+def _request_args(request) -> tuple:
+    """Convert a batch request into (topic, total_hours, level, hours_per_week)"""
+    if isinstance(request, dict):
+        return (request["topic"], request.get("hours", request.get("total_hours", 10)),
+                request.get("level", "beginner"), request.get("hours_per_week", 5))
+    return tuple(request)
+
+def _chunked(requests, size: int):
+    """Split an iterable of requests into lists of at most size items"""
+    iterator = iter(requests)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+_worker_builder = None  # Builder of a pool worker process
+
+def _init_worker(state: tuple, cache):
+    """Set up a pool worker with the parent's catalog state and cache settings"""
+    global _worker_builder
+    set_state(state)
+    _worker_builder = SyllabusBuilder(SyllabusCache(*cache) if cache is not None else None)
+
+def _build_chunk(chunk: list) -> list:
+    """Build a chunk of syllabi in a worker process"""
+    builder = _worker_builder or SyllabusBuilder()
+    return [(request, builder._get_syllabus(*_request_args(request))) for request in chunk]
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""
+Bounded cache for generated syllabi
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import instrumentation
+
+def copy_syllabus(syllabus: dict) -> dict:
+    """Copy the mutable parts of a syllabus (modules are immutable and shared)"""
+    copied = dict(syllabus)
+    copied["study_plan"] = [
+        dict(week, modules=[dict(module) for module in week["modules"]])
+        for week in syllabus["study_plan"]
+    ]
+    return copied
+
+class SyllabusCache:
+    """LRU cache with optional TTL, safe to share between threads
+
+    With a PlanStore (see plan_store.py) entries are kept interned and
+    deduplicated instead of as full copies, for caches of many plans.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = None, clock=time.monotonic, store=None):
+        self.maxsize = maxsize
+        self.ttl = ttl  # Seconds an entry stays valid, None for no expiry
+        self.clock = clock
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (syllabus or store digest, source, stored_at)
+        self._lock = threading.Lock()
+        if instrumentation.ENABLED:
+            instrumentation.track_cache("syllabus", self)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, source=None):
+        """Get a copy of a cached syllabus, or None on a miss
+
+        source is the knowledge entry the syllabus must have been built from;
+        entries built from a different (replaced) entry count as misses.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                syllabus, cached_source, stored_at = entry
+                if cached_source is not source or self._expired(stored_at):
+                    self._drop(key)
+                    self.evictions += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    if self.store is not None:
+                        return self.store.get(syllabus)
+                    return copy_syllabus(syllabus)
+            self.misses += 1
+            return None
+
+    def put(self, key, syllabus: dict, source=None):
+        """Store a syllabus built from the given knowledge entry"""
+        stored = copy_syllabus(syllabus) if self.store is None else self.store.put(syllabus)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (stored, source, self.clock())
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every cached syllabus"""
+        with self._lock:
+            while self._entries:
+                self._drop(next(iter(self._entries)))
+
+    def stats(self) -> dict:
+        """Get hit/miss/eviction counters"""
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    def _drop(self, key):
+        stored = self._entries.pop(key)[0]
+        if self.store is not None:
+            self.store.release(stored)
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and self.clock() - stored_at > self.ttl
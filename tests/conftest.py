@@ -0,0 +1,21 @@
+"""
+Shared test setup: the modules live at the repository root
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import knowledge_base
+from storage import DictBackend
+
+@pytest.fixture
+def catalog():
+    """A private copy of the built-in catalog, restored (with default semantic matching) afterwards"""
+    knowledge_base.set_backend(DictBackend(dict(knowledge_base.TOPIC_KNOWLEDGE)))
+    yield knowledge_base
+    knowledge_base.enable_semantic_matching(None)
+    knowledge_base.set_backend(DictBackend(knowledge_base.TOPIC_KNOWLEDGE))
@@ -0,0 +1,75 @@
+import random
+from fractions import Fraction
+
+import pytest
+
+from allocator import apportion
+
+def hamilton(weights: list, total: int) -> list:
+    """Textbook largest-remainder apportionment (no bounds), for comparison"""
+    quotas = [Fraction(w * total, sum(weights)) for w in weights]
+    shares = [int(q) for q in quotas]
+    order = sorted(range(len(weights)), key=lambda i: (-(quotas[i] - shares[i]), i))
+    for i in order[:total - sum(shares)]:
+        shares[i] += 1
+    return shares
+
+@pytest.mark.parametrize("seed", range(200))
+def test_shares_add_up_and_respect_bounds(seed):
+    rng = random.Random(seed)
+    count = rng.randint(1, 60)
+    weights = [rng.randint(0, 12) for _ in range(count)]
+    lows = [rng.randint(0, 3) for _ in range(count)]
+    highs = [low + rng.randint(0, 10) if rng.random() < 0.5 else None for low in lows]
+    effective = weights if any(weights) else [1] * count  # All-zero weights split evenly
+    unbounded = any(high is None and w > 0 for w, high in zip(effective, highs))
+    capacity = sum(low if w == 0 else (high or 0) for w, low, high in zip(effective, lows, highs))
+    total = rng.randint(sum(lows), sum(lows) + 5 * count)
+    if not unbounded and total > capacity:
+        with pytest.raises(ValueError):
+            apportion(weights, total, lows, highs)
+        return
+
+    shares = apportion(weights, total, lows, highs)
+    assert sum(shares) == total
+    for share, w, low, high in zip(shares, weights, lows, highs):
+        assert share >= low
+        assert high is None or share <= high
+        if w == 0 and any(weights):
+            assert share == low
+
+@pytest.mark.parametrize("seed", range(200))
+def test_unbounded_shares_match_largest_remainder(seed):
+    rng = random.Random(seed)
+    weights = [rng.randint(0, 20) for _ in range(rng.randint(1, 80))]
+    weights[0] += 1
+    total = rng.randint(0, 500)
+    shares = apportion(weights, total)
+    assert shares == hamilton(weights, total)
+    # Every share is within one hour of its exact quota
+    assert all(abs(share - Fraction(w * total, sum(weights))) < 1 for share, w in zip(shares, weights))
+
+@pytest.mark.parametrize("seed", range(100))
+def test_minimum_hour_per_module(seed):
+    # _adjust_hours: every module gets an hour when there are enough hours
+    rng = random.Random(seed)
+    weights = [rng.randint(1, 6) for _ in range(rng.randint(1, 5000 if seed < 5 else 100))]
+    total = rng.randint(len(weights), len(weights) * 4)
+    shares = apportion(weights, total, 1)
+    assert sum(shares) == total and min(shares) >= 1
+    # Heavier modules never get fewer hours than lighter ones
+    ranked = sorted(zip(weights, shares))
+    assert all(a[1] <= b[1] for a, b in zip(ranked, ranked[1:]) if a[0] < b[0])
+
+def test_fractional_weights_keep_proportions():
+    assert apportion([0.5, 1.5], 8) == [2, 6]
+
+def test_impossible_splits_raise():
+    with pytest.raises(ValueError):
+        apportion([1, 2], 1, 1)             # Below the minimums
+    with pytest.raises(ValueError):
+        apportion([1, 2], 10, 0, 3)         # Above the maximums
+    with pytest.raises(ValueError):
+        apportion([1, -2], 3)               # Negative weight
+    with pytest.raises(ValueError):
+        apportion([1, 2], 3, [0, 2], [1, 1])  # Maximum below minimum
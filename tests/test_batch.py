@@ -0,0 +1,77 @@
+"""
+Pooled batch builds against serial builds
+"""
+
+import multiprocessing
+
+import pytest
+
+from storage import SnapshotBackend, SQLiteBackend
+from syllabus_builder import SyllabusBuilder
+from syllabus_cache import SyllabusCache
+from topic_index import TopicIndex
+
+REQUESTS = [(topic, hours, level, hours_per_week)
+            for topic in ("operating systems", "python", "cooking", "deep learning", "Quantum Knitting")
+            for hours in (3, 10, 27)
+            for level in ("beginner", "advanced")
+            for hours_per_week in (4, 6)]
+
+COOKING = {
+    "description": "Preparing food",
+    "modules": [{"title": "Knife Skills", "hours": 2, "topics": ["Grips"], "exercises": ["Basic dicing"]},
+                {"title": "Advanced Sauces", "hours": 5, "topics": ["Emulsions"], "exercises": ["Hollandaise"]}],
+    "prerequisites": ["Patience"],
+    "resources": ["Salt Fat Acid Heat"]
+}
+
+@pytest.fixture(params=["fork", "spawn"])
+def start_method(request):
+    """Run pools with each start method (spawn workers only see what is passed to them)"""
+    if request.param not in multiprocessing.get_all_start_methods():
+        pytest.skip(f"{request.param} is not available")
+    previous = multiprocessing.get_start_method(allow_none=True)
+    multiprocessing.set_start_method(request.param, force=True)
+    yield request.param
+    multiprocessing.set_start_method(previous, force=True)
+
+def pooled(builder: SyllabusBuilder) -> dict:
+    return dict(builder.create_syllabi(REQUESTS, workers=2, chunksize=7))
+
+def serial(builder: SyllabusBuilder) -> dict:
+    return dict(builder.create_syllabi(REQUESTS))
+
+def test_runtime_topics_reach_the_workers(catalog, start_method):
+    catalog.add_topic("cooking", COOKING)
+    catalog.add_topic("operating systems", dict(COOKING, description="Replaced"))
+    builder = SyllabusBuilder(SyllabusCache(maxsize=8))
+    results = pooled(builder)
+    assert results == serial(SyllabusBuilder())
+    assert results[("cooking", 10, "beginner", 4)]["modules"][0]["title"] == "Knife Skills"
+    assert results[("operating systems", 3, "advanced", 6)]["description"] == "Replaced"
+
+def test_topic_index_reaches_the_workers(catalog, start_method):
+    catalog.set_topic_index(TopicIndex.build((key, catalog.get_backend().get(key))
+                                             for key in catalog.get_backend().keys()))
+    results = pooled(SyllabusBuilder())
+    assert results == serial(SyllabusBuilder())
+    assert results[("deep learning", 10, "beginner", 4)]["description"] == catalog.TOPIC_KNOWLEDGE[
+        "machine learning"]["description"]
+
+def test_semantic_matching_setting_reaches_the_workers(catalog, start_method):
+    catalog.enable_semantic_matching()
+    assert pooled(SyllabusBuilder()) == serial(SyllabusBuilder())
+
+@pytest.mark.parametrize("kind", ["sqlite", "snapshot"])
+def test_file_backends_reach_the_workers(catalog, start_method, tmp_path, kind):
+    items = [(key, catalog.TOPIC_KNOWLEDGE[key]) for key in catalog.TOPIC_KNOWLEDGE]
+    if kind == "sqlite":
+        backend = SQLiteBackend(str(tmp_path / "catalog.db"))
+        backend.put_many(items)
+    else:
+        backend = SnapshotBackend.build(str(tmp_path / "catalog.snap"), items)
+    catalog.set_backend(backend)
+    catalog.add_topic("cooking", COOKING)
+    results = pooled(SyllabusBuilder())
+    assert results == serial(SyllabusBuilder())
+    assert results[("cooking", 3, "beginner", 4)]["description"] == "Preparing food"
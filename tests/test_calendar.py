@@ -0,0 +1,136 @@
+"""
+Placing study plans into calendar windows and .ics export
+"""
+
+import io
+from datetime import date, datetime, timezone
+
+import pytest
+
+from study_calendar import StudyCalendar, _fold, ics_chunks, parse_availability, write_ics
+
+MONDAY = date(2026, 1, 5)
+STAMP = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+def plan(*weeks) -> list:
+    """A study plan from weeks of (module, hours) parts"""
+    return [{"week": number, "modules": [{"module": module, "title": f"Module {module}", "hours": hours}
+                                         for module, hours in parts], "hours": sum(hours for _, hours in parts)}
+            for number, parts in enumerate(weeks, 1)]
+
+def syllabus(topic: str, study_plan: list, topics=("Basics",)) -> dict:
+    count = 1 + max(part["module"] for week in study_plan for part in week["modules"])
+    return {"topic": topic, "study_plan": study_plan,
+            "modules": [{"title": f"Module {i}", "topics": list(topics)} for i in range(count)]}
+
+def unfold(text: str) -> list:
+    return text.replace("\r\n ", "").split("\r\n")
+
+def test_parse_availability():
+    weekly = parse_availability("mon-wed 18:00-20:00; sat,sun 10:00-12:00 11:00-13:00; fri-mon 07:00-07:30")
+    assert weekly[0] == [(420, 450), (1080, 1200)]
+    assert weekly[3] == []
+    assert weekly[4] == [(420, 450)]
+    assert weekly[5] == [(420, 450), (600, 780)]
+    assert parse_availability("weekends 09:00-24:00")[6] == [(540, 1440)]
+
+@pytest.mark.parametrize("text, message", [
+    ("mon", "needs days and at least one time range"),
+    ("mon 18:00", "should look like 18:00-20:00"),
+    ("someday 18:00-20:00", "unknown day"),
+    ("mon 20:00-18:00", "must end after they start"),
+    ("mon 18:00-25:00", "outside the day"),
+    ("mon 6pm-8pm", "invalid time"),
+])
+def test_parse_availability_errors(text, message):
+    with pytest.raises(ValueError, match=message):
+        parse_availability(text)
+
+def test_calendar_needs_study_time_and_valid_dates():
+    with pytest.raises(ValueError, match="no study time"):
+        StudyCalendar(MONDAY, [[]] * 7)
+    with pytest.raises(ValueError, match="invalid date"):
+        StudyCalendar("05/01/2026")
+
+def test_blackout_dates_are_skipped():
+    calendar = StudyCalendar(MONDAY, "daily 18:00-19:00", blackouts=["2026-01-05", date(2026, 1, 7)])
+    sessions = calendar.place(plan([(0, 1), (1, 1), (2, 1)]), follow_weeks=False)
+    assert [start.date() for _, _, start, _ in sessions] == [date(2026, 1, 6), date(2026, 1, 8), date(2026, 1, 9)]
+
+def test_follow_weeks_starts_each_week_on_time():
+    calendar = StudyCalendar(MONDAY, "mon-fri 18:00-20:00")
+    study_plan = plan([(0, 2)], [(1, 2)], [(2, 2)])
+    followed = calendar.place(study_plan)
+    assert [start for _, _, start, _ in followed] == [datetime(2026, 1, 5, 18), datetime(2026, 1, 12, 18),
+                                                     datetime(2026, 1, 19, 18)]
+    packed = calendar.place(study_plan, follow_weeks=False)
+    assert [start.date() for _, _, start, _ in packed] == [date(2026, 1, 5), date(2026, 1, 6), date(2026, 1, 7)]
+
+def test_overfull_week_runs_into_the_next():
+    calendar = StudyCalendar(MONDAY, "mon 18:00-20:00")
+    sessions = calendar.place(plan([(0, 4)], [(1, 1)]))
+    assert [(module, start.date()) for module, _, start, _ in sessions] == [
+        (0, date(2026, 1, 5)), (0, date(2026, 1, 12)), (1, date(2026, 1, 19))]
+
+def test_parts_split_across_windows():
+    calendar = StudyCalendar(MONDAY, "mon 09:00-10:00 18:00-19:30")
+    sessions = calendar.place(plan([(0, 3)]))
+    assert [(start, end) for _, _, start, end in sessions] == [
+        (datetime(2026, 1, 5, 9), datetime(2026, 1, 5, 10)),
+        (datetime(2026, 1, 5, 18), datetime(2026, 1, 5, 19, 30)),
+        (datetime(2026, 1, 12, 9), datetime(2026, 1, 12, 9, 30))]
+    assert sum((end - start).seconds for _, _, start, end in sessions) == 3 * 3600
+
+@pytest.mark.parametrize("horizon_weeks", [0, 1, 26])
+def test_timeline_grows_past_the_horizon(horizon_weeks):
+    calendar = StudyCalendar(MONDAY, "sat 10:00-12:00", horizon_weeks=horizon_weeks)
+    sessions = calendar.place(plan(*[[(week, 2)] for week in range(60)]))
+    assert len(sessions) == 60
+    assert sessions[-1][2] == datetime(2027, 2, 27, 10)
+
+def test_windows_ending_at_midnight():
+    calendar = StudyCalendar(MONDAY, "sun 22:00-24:00", horizon_weeks=1)
+    text = "".join(ics_chunks([syllabus("Night", plan([(0, 2)]))], calendar, stamp=STAMP))
+    assert "DTSTART:20260111T220000" in text
+    assert "DTEND:20260112T000000" in text
+
+def test_ics_lines_are_escaped_and_folded():
+    topics = ["Big-O; amortised, analysis \\ " + "é" * 60]
+    calendar = StudyCalendar(MONDAY)
+    out = io.StringIO(newline="")
+    written = write_ics([syllabus("Algorithms, part 1", plan([(0, 1)]), topics)], out, calendar,
+                        name="Ünïcode plans", stamp=STAMP)
+    text = out.getvalue()
+    assert written == len(text)
+    assert text.startswith("BEGIN:VCALENDAR\r\n") and text.endswith("END:VCALENDAR\r\n")
+    for line in text.split("\r\n"):
+        assert len(line.encode("utf-8")) <= 75
+    lines = unfold(text)
+    assert "SUMMARY:Algorithms\\, part 1: Module 0" in lines
+    assert "DESCRIPTION:Big-O\\; amortised\\, analysis \\\\ " + "é" * 60 in lines
+    assert "X-WR-CALNAME:Ünïcode plans" in lines
+    assert "DTSTAMP:20260101T000000Z" in lines
+
+def test_fold_keeps_characters_whole():
+    line = "SUMMARY:" + "日本語" * 40
+    folded = _fold(line)
+    assert folded.endswith("\r\n")
+    assert unfold(folded)[0] == line
+    assert all(len(part.encode("utf-8")) <= 75 for part in folded.split("\r\n"))
+    assert _fold("SUMMARY:short") == "SUMMARY:short\r\n"
+
+def uids(text: str) -> list:
+    return [line for line in unfold(text) if line.startswith("UID:")]
+
+def test_uids_are_stable_and_unique():
+    syllabi = [syllabus("Python", plan([(0, 3)], [(1, 2)])), syllabus("Rust", plan([(0, 1)]))]
+    first = uids("".join(ics_chunks(syllabi, StudyCalendar(MONDAY), stamp=STAMP)))
+    again = uids("".join(ics_chunks(syllabi, StudyCalendar(MONDAY), stamp=datetime.now(timezone.utc))))
+    assert first == again
+    assert len(set(first)) == len(first) == 4
+
+    # The same events of another start date or batch position are different events
+    moved = uids("".join(ics_chunks(syllabi, StudyCalendar(date(2026, 2, 2)), stamp=STAMP)))
+    shifted = uids("".join(ics_chunks(syllabi, StudyCalendar(MONDAY), stamp=STAMP, start=5)))
+    assert not set(first) & set(moved)
+    assert not set(first) & set(shifted)
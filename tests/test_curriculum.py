@@ -0,0 +1,47 @@
+import copy
+from itertools import islice
+
+import pytest
+
+from curriculum import Module, freeze_knowledge
+from knowledge_base import TOPIC_KNOWLEDGE
+from syllabus_builder import SyllabusBuilder
+
+def plain(knowledge) -> dict:
+    """Deep plain copy of a catalog entry, for comparing before and after"""
+    data = dict(knowledge)
+    data["modules"] = [Module.from_dict(module).to_dict() for module in knowledge["modules"]]
+    return copy.deepcopy(data)
+
+def test_ten_thousand_builds_leave_the_catalog_unchanged():
+    before = {topic: plain(knowledge) for topic, knowledge in TOPIC_KNOWLEDGE.items()}
+    modules = {topic: knowledge["modules"] for topic, knowledge in TOPIC_KNOWLEDGE.items()}
+    requests = [(topic, hours, level, week)
+                for topic in TOPIC_KNOWLEDGE
+                for hours in range(1, 101)
+                for level in ("beginner", "intermediate", "advanced")
+                for week in (3, 5, 10, 20)]
+    requests = (requests * (10000 // len(requests) + 1))[:10000]
+
+    builder = SyllabusBuilder()
+    built = 0
+    for _, syllabus in builder.create_syllabi(requests):
+        # Editing a plan must not be possible through its (shared) modules either
+        for module in islice(syllabus["modules"], 1):
+            with pytest.raises(AttributeError):
+                module.hours = 0
+        built += 1
+
+    assert built == 10000
+    assert {topic: plain(knowledge) for topic, knowledge in TOPIC_KNOWLEDGE.items()} == before
+    assert all(TOPIC_KNOWLEDGE[topic]["modules"] is modules[topic] for topic in TOPIC_KNOWLEDGE)
+
+def test_frozen_entries_are_read_only():
+    knowledge = freeze_knowledge({"description": "d", "modules": [{"title": "t", "hours": 2}]})
+    with pytest.raises(TypeError):
+        knowledge["description"] = "changed"
+    with pytest.raises(AttributeError):
+        knowledge["modules"][0].title = "changed"
+    module = knowledge["modules"][0]
+    assert module.replace(hours=3).hours == 3 and module.hours == 2
+    assert module.replace(hours=2) is module
@@ -0,0 +1,59 @@
+"""
+Round trips through the bulk export formats
+"""
+
+import pytest
+
+from curriculum import Module
+from exporters import FORMATS, SyllabusWriter, pack_syllabus, read_syllabi
+from syllabus_builder import SyllabusBuilder
+
+def build_plans(count: int = 60) -> list:
+    requests = [(topic, hours, level, hours_per_week)
+                for topic in ("operating systems", "python programming", "machine learning", "Cooking, \"quick\"")
+                for hours, hours_per_week in ((3, 5), (12, 4), (40, 7), (250, 10), (10000, 30))
+                for level in ("beginner", "intermediate", "advanced")]
+    return [syllabus for _, syllabus in SyllabusBuilder().create_syllabi(requests[:count])]
+
+@pytest.mark.parametrize("compress", [False, True])
+@pytest.mark.parametrize("format", FORMATS)
+def test_round_trip(tmp_path, format, compress):
+    plans = build_plans()
+    path = tmp_path / f"plans.{format}"
+    with SyllabusWriter(str(path), format, compress) as writer:
+        writer.write_many(plans)
+    assert list(read_syllabi(str(path), format)) == plans
+
+@pytest.mark.parametrize("compress", [False, True])
+@pytest.mark.parametrize("format", FORMATS)
+def test_appended_writes_read_as_one_file(tmp_path, format, compress):
+    plans = build_plans()
+    path = str(tmp_path / f"plans.{format}")
+    for start in range(0, len(plans), 25):
+        with SyllabusWriter(path, format, compress) as writer:
+            for syllabus in plans[start:start + 25]:
+                writer.write(syllabus)
+    assert list(read_syllabi(path, format)) == plans
+
+def test_non_ascii_text_round_trips(tmp_path):
+    syllabus = build_plans(1)[0]
+    syllabus = dict(syllabus, topic="Système d'exploitation — 操作系统",
+                    modules=(Module("Überblick", 1, ["naïve, \"quoted\"\nline"], ["é"]),) + syllabus["modules"][1:])
+    for format in FORMATS:
+        path = str(tmp_path / f"plan.{format}")
+        with SyllabusWriter(path, format) as writer:
+            writer.write(syllabus)
+        assert list(read_syllabi(path, format)) == [syllabus]
+
+def test_binary_rejects_values_outside_uint16():
+    syllabus = build_plans(1)[0]
+    with pytest.raises(ValueError, match="total_hours is 70000"):
+        pack_syllabus(dict(syllabus, total_hours=70000))
+    with pytest.raises(ValueError, match="hours of module 1 is -1"):
+        modules = list(syllabus["modules"])
+        modules[1] = modules[1].replace(hours=-1)
+        pack_syllabus(dict(syllabus, modules=tuple(modules)))
+    with pytest.raises(ValueError, match="UTF-8 length"):
+        pack_syllabus(dict(syllabus, description="x" * 70000))
+    with pytest.raises(ValueError, match="whole number"):
+        pack_syllabus(dict(syllabus, total_hours=2.5))
@@ -0,0 +1,47 @@
+"""
+Keyword matching against the original first-key-in-text loops
+"""
+
+import random
+
+import pytest
+
+from keyword_matcher import KeywordMatcher
+from study_assistant import COMMON_QUESTIONS, EXPLANATIONS, IMPORTANCE
+
+WORDS = ["graph", "graphs", "tree", "sort", "os", "process", "thread", "memory", "paging", "ml", "data", "a"]
+
+def first_key_in(table: dict, text: str, default=None):
+    text = text.lower()
+    for key in table:
+        if key.lower() in text:
+            return table[key]
+    return default
+
+def random_texts(rng: random.Random, count: int) -> list:
+    return [" ".join(rng.choice(WORDS).upper() if rng.random() < 0.2 else rng.choice(WORDS)
+                     for _ in range(rng.randint(0, 6))) for _ in range(count)]
+
+@pytest.mark.parametrize("scan_below", [0, None, 10 ** 6])
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_the_first_key_in_table_order(seed, scan_below):
+    rng = random.Random(seed)
+    size = rng.choice([1, 5, 63, 64, 200])
+    table = {" ".join(rng.sample(WORDS, rng.randint(1, 2))) + rng.choice(["", "s", "ing"]): i for i in range(size)}
+    matcher = KeywordMatcher(table, scan_below)
+    assert len(matcher) == len(table)
+    for text in random_texts(rng, 300):
+        assert matcher.find(text, "none") == first_key_in(table, text, "none"), text
+
+@pytest.mark.parametrize("scan_below", [0, None])
+def test_shipped_tables(scan_below):
+    rng = random.Random(11)
+    texts = random_texts(rng, 200) + ["What is Paging?", "Process vs Thread", "CPU Scheduling basics"]
+    for table in list(EXPLANATIONS.values()) + [IMPORTANCE, COMMON_QUESTIONS]:
+        matcher = KeywordMatcher(table, scan_below)
+        for text in texts:
+            assert matcher.find(text) == first_key_in(table, text)
+
+def test_small_tables_scan_and_large_ones_use_the_automaton():
+    assert KeywordMatcher({"a": 1})._items is not None
+    assert KeywordMatcher({f"key{i}": i for i in range(KeywordMatcher.scan_below)})._items is None
@@ -0,0 +1,85 @@
+"""
+The bulk plan kernel against the one-plan-at-a-time path
+"""
+
+import random
+
+import pytest
+
+from curriculum import Module
+from knowledge_base import TOPIC_KNOWLEDGE
+from plan_kernel import allocate_hours, numpy, row_weeks, schedule_weeks
+from scheduler import schedule
+from syllabus_builder import SyllabusBuilder
+
+MODES = [False, pytest.param(True, marks=pytest.mark.skipif(numpy is None, reason="NumPy is not installed"))]
+TOTALS = range(0, 101)
+
+def plan_rows(synthetic: int = 60) -> dict:
+    """Base hours of every (topic, level), catalog and synthetic, grouped by module count"""
+    builder = SyllabusBuilder()
+    rng = random.Random(20)
+    entries = [knowledge["modules"] for knowledge in TOPIC_KNOWLEDGE.values()]
+    entries += [[Module(f"M{j}", rng.randint(1, 6)) for j in range(3 + i % 10)] for i in range(synthetic)]
+    groups = {}
+    for entry in entries:
+        modules = tuple(Module.from_dict(module) for module in entry)
+        for level in ("beginner", "intermediate", "advanced"):
+            groups.setdefault(len(modules), []).append(builder._adjust_for_level(modules, level))
+    return groups
+
+def as_rows(shares) -> list:
+    return shares.tolist() if hasattr(shares, "tolist") else shares
+
+@pytest.mark.parametrize("use_numpy", MODES)
+def test_kernel_matches_adjust_hours_and_schedule(use_numpy):
+    builder = SyllabusBuilder()
+    for rows in plan_rows().values():
+        shares = allocate_hours([[module.hours for module in modules] for modules in rows], TOTALS,
+                                use_numpy=use_numpy)
+        parts = {capacity: schedule_weeks(shares, capacity, use_numpy=use_numpy) for capacity in (1, 3, 5, 10)}
+        shares = as_rows(shares)
+        row = 0
+        for modules in rows:
+            for total in TOTALS:
+                expected = [module.hours for module in builder._adjust_hours(modules, total)]
+                assert shares[row] == expected, (modules, total)
+                for capacity, weeks in parts.items():
+                    assert row_weeks(weeks, row) == schedule(expected, capacity)
+                row += 1
+
+@pytest.mark.parametrize("use_numpy", MODES)
+def test_study_plans_from_kernel_output(use_numpy):
+    builder = SyllabusBuilder()
+    modules = tuple(TOPIC_KNOWLEDGE["machine learning"]["modules"])
+    shares = allocate_hours([[module.hours for module in modules]], [7, 30], use_numpy=use_numpy)
+    parts = schedule_weeks(shares, 4, use_numpy=use_numpy)
+    for row, total in enumerate((7, 30)):
+        adjusted = builder._adjust_hours(modules, total)
+        assert builder._plan_weeks(adjusted, row_weeks(parts, row)) == builder._create_study_plan(adjusted, 4)
+
+@pytest.mark.parametrize("use_numpy", MODES)
+def test_zero_weights_and_per_row_capacities(use_numpy):
+    builder = SyllabusBuilder()
+    weights = [[0, 0, 0], [0, 5, 0], [2, 0, 1]]
+    totals = [0, 2, 3, 10]
+    shares = as_rows(allocate_hours(weights, totals, use_numpy=use_numpy))
+    assert shares == [
+        [module.hours for module in builder._adjust_hours(tuple(Module("M", w) for w in row), total)]
+        for row in weights for total in totals
+    ]
+    capacities = [capacity for capacity in (1, 2, 3, 4) for _ in range(3)]
+    parts = schedule_weeks(shares, capacities, use_numpy=use_numpy)
+    for row, (hours, capacity) in enumerate(zip(shares, capacities)):
+        assert row_weeks(parts, row) == schedule(hours, capacity)
+
+@pytest.mark.parametrize("use_numpy", MODES)
+def test_invalid_input(use_numpy):
+    with pytest.raises(ValueError):
+        allocate_hours([[1, -1]], [3], use_numpy=use_numpy)
+    with pytest.raises(ValueError):
+        allocate_hours([[1, 1]], [-3], use_numpy=use_numpy)
+    with pytest.raises(ValueError):
+        schedule_weeks([[1, 1]], 0, use_numpy=use_numpy)
+    with pytest.raises(ValueError):
+        schedule_weeks([[1, 1], [2, 2]], [5], use_numpy=use_numpy)
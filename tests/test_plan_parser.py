@@ -0,0 +1,96 @@
+"""
+Loading saved text plans and scanning directories of them
+"""
+
+import os
+
+import pytest
+
+import plan_parser
+from plan_parser import PlanParseError, iter_plan_files, load_plan, scan_plans
+from renderer import render_plan_file
+from syllabus_builder import SyllabusBuilder
+
+def save(path, syllabus: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(render_plan_file(syllabus))
+
+def plans() -> list:
+    requests = [("operating systems", 10, "beginner"), ("machine learning", 40, "advanced"),
+                ("Café history — ünïcode", 7, "intermediate")]
+    return [syllabus for _, syllabus in SyllabusBuilder().create_syllabi(requests)]
+
+def test_saved_plans_load_back(tmp_path):
+    for i, syllabus in enumerate(plans()):
+        path = tmp_path / f"plan{i}.txt"
+        save(path, syllabus)
+        loaded = load_plan(str(path))
+        for field in ("topic", "description", "total_hours", "level", "modules"):
+            assert loaded[field] == syllabus[field]
+
+def test_invalid_files_report_the_line(tmp_path):
+    path = tmp_path / "plan.txt"
+    save(path, plans()[0])
+    lines = len(path.read_bytes().splitlines())
+    with open(path, "ab") as f:
+        f.write(b"\n\xff\xfe broken\n")
+    with pytest.raises(PlanParseError, match=f"line {lines + 2}: not UTF-8"):
+        load_plan(str(path))
+    path.write_bytes(b"")
+    with pytest.raises(PlanParseError, match="empty file"):
+        load_plan(str(path))
+
+def make_tree(root) -> dict:
+    """A tree of good and bad plans: {path: is_valid}"""
+    files = {}
+    for i, syllabus in enumerate(plans() * 30):
+        directory = root / f"group{i % 4}" / ("nested" if i % 3 else "")
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"plan{i}.txt"
+        save(path, syllabus)
+        files[str(path)] = True
+    (root / "group1" / "notes.md").write_text("not a plan")
+    (root / "group2" / "broken.txt").write_text("STUDY PLAN: x\nno level\n")
+    files[str(root / "group2" / "broken.txt")] = False
+    return files
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_scan_reports_every_file(tmp_path, workers):
+    files = make_tree(tmp_path)
+    results = list(scan_plans(str(tmp_path), suffixes=[".txt"], workers=workers, chunksize=8))
+    assert {path: error is None for path, _, error in results} == files
+    for path, syllabus, error in results:
+        assert (syllabus is None) == (error is not None)
+
+def test_pooled_scan_keeps_the_serial_order(tmp_path):
+    make_tree(tmp_path)
+    serial = [(path, syllabus) for path, syllabus, _ in scan_plans(str(tmp_path), [".txt"])]
+    pooled = [(path, syllabus) for path, syllabus, _ in scan_plans(str(tmp_path), [".txt"], workers=2, chunksize=5)]
+    assert pooled == serial
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_unreadable_directories_are_scan_results(tmp_path, monkeypatch, workers):
+    files = make_tree(tmp_path)
+    blocked = str(tmp_path / "group3")
+    scandir = os.scandir
+
+    def failing_scandir(path):
+        if path == blocked:
+            raise PermissionError(13, "Permission denied", path)
+        return scandir(path)
+
+    monkeypatch.setattr(plan_parser.os, "scandir", failing_scandir)
+    results = list(scan_plans(str(tmp_path), [".txt"], workers=workers))
+    errors = [(path, error) for path, syllabus, error in results if isinstance(error, PermissionError)]
+    assert [path for path, _ in errors] == [blocked]
+    assert {path for path, _, _ in results} == {path for path in files if not path.startswith(blocked)} | {blocked}
+
+    with pytest.raises(PermissionError):
+        list(iter_plan_files(str(tmp_path)))
+    skipped = []
+    assert len(list(iter_plan_files(str(tmp_path), [".txt"], onerror=skipped.append))) == len(results) - 1
+    assert [error.filename for error in skipped] == [blocked]
+
+def test_missing_root_is_reported(tmp_path):
+    [(path, syllabus, error)] = scan_plans(str(tmp_path / "missing"))
+    assert syllabus is None and isinstance(error, FileNotFoundError)
@@ -0,0 +1,132 @@
+"""
+Prerequisite graphs and multi-topic learning paths
+"""
+
+import gc
+
+import pytest
+
+import knowledge_base
+from curriculum import freeze_knowledge
+from prerequisites import PrerequisiteCycleError, PrerequisiteGraph, default_graph, plan_learning_path
+from storage import DictBackend
+
+def topic(*prerequisites, title="Module") -> dict:
+    return {"description": "", "modules": [{"title": title, "hours": 2}], "prerequisites": list(prerequisites)}
+
+def test_prerequisites_come_before_the_topics_needing_them(catalog):
+    graph = PrerequisiteGraph()
+    catalog.add_topic("cooking", topic())
+    catalog.add_topic("baking", topic("Cooking"))
+    catalog.add_topic("pastry", topic("baking", "machine learning"))
+    assert graph.prerequisites("pastry") == ("baking", "machine learning")
+    assert graph.closure("pastry") == {"baking", "cooking", "machine learning", "python programming"}
+    assert graph.order(["pastry", "operating systems"]) == [
+        "cooking", "baking", "python programming", "machine learning", "pastry", "operating systems"]
+
+def test_requested_order_is_kept_otherwise(catalog):
+    graph = PrerequisiteGraph()
+    assert graph.order(["operating systems", "Machine Learning", "python"]) == [
+        "operating systems", "python programming", "machine learning"]
+    assert graph.order(["machine learning"], include_prerequisites=False) == ["machine learning"]
+    assert graph.order(["machine learning", "python programming"], include_prerequisites=False) == [
+        "python programming", "machine learning"]
+
+def test_unknown_prerequisites_are_kept_unresolved(catalog):
+    graph = PrerequisiteGraph()
+    assert graph.prerequisites("machine learning") == ("python programming",)
+    assert graph.unresolved["machine learning"] == ("Basic statistics",)
+    assert graph.order(["quantum basket weaving"]) == ["quantum basket weaving"]
+
+def test_cycles_are_rejected(catalog):
+    catalog.add_topic("chickens", topic("eggs"))
+    catalog.add_topic("eggs", topic("chickens"))
+    with pytest.raises(PrerequisiteCycleError) as error:
+        PrerequisiteGraph().order(["chickens"])
+    assert error.value.cycle == ["chickens", "eggs", "chickens"]
+    assert "chickens -> eggs -> chickens" in str(error.value)
+
+def test_cycles_added_later_are_reported_and_can_be_removed(catalog):
+    graph = PrerequisiteGraph()
+    catalog.add_topic("chickens", topic("eggs"))
+    assert graph.order(["chickens"]) == ["chickens"]
+    catalog.add_topic("eggs", topic("chickens"))
+    with pytest.raises(PrerequisiteCycleError):
+        graph.order(["chickens"])
+    catalog.add_topic("eggs", topic())
+    assert graph.order(["chickens"]) == ["eggs", "chickens"]
+
+def test_closures_follow_added_and_replaced_topics(catalog):
+    graph = PrerequisiteGraph()
+    assert graph.closure("machine learning") == {"python programming"}
+
+    # A new topic resolves a prerequisite nothing matched before, for every dependent
+    catalog.add_topic("basic statistics", topic("probability"))
+    assert graph.closure("machine learning") == {"python programming", "basic statistics"}
+    assert graph.unresolved["machine learning"] == ()
+    catalog.add_topic("probability", topic())
+    assert graph.closure("machine learning") == {"python programming", "basic statistics", "probability"}
+
+    # A replaced topic drops the prerequisites it no longer lists
+    catalog.add_topic("basic statistics", topic())
+    assert graph.closure("machine learning") == {"python programming", "basic statistics"}
+    assert graph.order(["machine learning"]) == ["python programming", "basic statistics", "machine learning"]
+
+def test_graphs_start_over_on_another_backend(catalog):
+    graph = PrerequisiteGraph()
+    assert graph.closure("machine learning") == {"python programming"}
+    catalog.set_backend(DictBackend({"machine learning": freeze_knowledge(topic("statistics")),
+                                     "statistics": freeze_knowledge(topic())}))
+    assert graph.closure("machine learning") == {"statistics"}
+
+def test_learning_paths_share_one_graph(catalog):
+    listeners = len(knowledge_base._listeners)
+    for _ in range(200):
+        path = plan_learning_path(["machine learning"], 10)
+    assert len(knowledge_base._listeners) <= listeners + 1
+    assert path["topics"] == ["python programming", "machine learning"]
+    assert "machine learning" in default_graph()._closure
+
+    # Topics added between calls are seen by the shared graph
+    catalog.add_topic("basic statistics", topic(title="Distributions"))
+    path = plan_learning_path(["machine learning"], 10)
+    assert path["topics"] == ["python programming", "basic statistics", "machine learning"]
+
+def test_dropped_graphs_stop_listening(catalog):
+    listeners = len(knowledge_base._listeners)
+    graphs = [PrerequisiteGraph() for _ in range(50)]
+    assert len(knowledge_base._listeners) == listeners + 50
+    del graphs
+    gc.collect()
+    assert len(knowledge_base._listeners) == listeners
+    catalog.add_topic("cooking", topic())  # No callbacks into dropped graphs
+
+@pytest.mark.parametrize("topics, hours, hours_per_week", [
+    (["machine learning"], 10, 5),
+    (["machine learning", "operating systems"], 23, 4),
+    (["operating systems", "quantum basket weaving"], {"operating systems": 3, "python": 40}, 7),
+])
+def test_path_weeks(catalog, topics, hours, hours_per_week):
+    path = plan_learning_path(topics, hours, hours_per_week=hours_per_week)
+    weeks = path["study_plan"]
+    assert [week["week"] for week in weeks] == list(range(1, len(weeks) + 1))
+    assert all(week["hours"] == sum(part["hours"] for part in week["modules"]) <= hours_per_week for week in weeks)
+    assert sum(week["hours"] for week in weeks) == path["total_hours"]
+
+    # Every module is planned in full, topic by topic in path order
+    planned = {}
+    for week in weeks:
+        for part in week["modules"]:
+            assert list(part) == ["topic", "module", "title", "hours"]
+            planned[part["topic"], part["module"]] = planned.get((part["topic"], part["module"]), 0) + part["hours"]
+    expected = {(key, m): module["hours"] for key, syllabus in zip(path["topics"], path["syllabi"])
+                for m, module in enumerate(syllabus["modules"]) if module["hours"]}
+    assert planned == expected
+    order = [part["topic"] for week in weeks for part in week["modules"]]
+    assert order == sorted(order, key=path["topics"].index)
+
+def test_parts_of_split_modules_are_numbered(catalog):
+    catalog.add_topic("cooking", topic(title="Knife Skills"))
+    path = plan_learning_path(["cooking"], 3, hours_per_week=1)
+    assert [part["title"] for week in path["study_plan"] for part in week["modules"]] == [
+        "Knife Skills (Part 1)", "Knife Skills (Part 2)", "Knife Skills (Part 3)"]
@@ -0,0 +1,82 @@
+"""
+Progress store plan ids and buffered writes
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+from progress import ProgressStore, plan_id
+from study_assistant import StudyAssistant, StudySession
+from syllabus_builder import SyllabusBuilder
+
+def stored_updates(path) -> int:
+    """Count the updates another connection can see"""
+    connection = sqlite3.connect(str(path))
+    try:
+        return connection.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+    finally:
+        connection.close()
+
+def build(topic: str, hours_per_week: int) -> dict:
+    _, syllabus = next(SyllabusBuilder().create_syllabi([(topic, 20, "beginner", hours_per_week)]))
+    return syllabus
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def test_plan_ids_differ_by_weekly_hours(catalog):
+    ids = {plan_id(build("operating systems", hours_per_week), hours_per_week) for hours_per_week in (3, 5, 8)}
+    assert len(ids) == 3
+
+def test_plan_ids_without_weekly_hours_follow_the_layout(catalog):
+    assert plan_id(build("python", 3)) != plan_id(build("python", 8))
+    assert plan_id(build("python", 3)) == plan_id(build("python", 3))
+
+def test_sessions_with_other_weekly_hours_keep_separate_progress(catalog, tmp_path):
+    assistant = StudyAssistant()
+    with ProgressStore(str(tmp_path / "progress.db")) as store:
+        plans = []
+        for hours_per_week in (4, 6):
+            session = StudySession("machine learning", 12, hours_per_week=hours_per_week, assistant=assistant,
+                                   progress=store, user="ada")
+            while session.next_module() is not None:
+                pass
+            plans.append(session.plan)
+        assert plans[0] != plans[1]
+        for plan in plans:
+            assert all(entry["completed"] for entry in store.module_progress("ada", plan).values())
+
+def test_idle_store_flushes_after_the_interval(tmp_path):
+    path = tmp_path / "progress.db"
+    with ProgressStore(str(path), flush_interval=0.05) as store:
+        store.record("ada", "plan", 0, 1.5)
+        store.record("ada", "plan", 1, 2.0, completed=True)
+        assert stored_updates(path) == 0
+        assert wait_for(lambda: stored_updates(path) == 2)
+        assert store._timer is None
+
+def test_close_flushes_and_stops_the_timer(tmp_path):
+    path = tmp_path / "progress.db"
+    store = ProgressStore(str(path), flush_interval=60)
+    store.record("ada", "plan", 0, 1.0)
+    timer = store._timer
+    store.close()
+    assert stored_updates(path) == 1
+    timer.join(1)
+    assert not timer.is_alive()
+
+@pytest.mark.parametrize("batch_size", [1, 3])
+def test_full_batches_are_written_at_once(tmp_path, batch_size):
+    path = tmp_path / "progress.db"
+    with ProgressStore(str(path), batch_size=batch_size, flush_interval=60) as store:
+        for module in range(batch_size):
+            store.record("ada", "plan", module, 1.0)
+        assert stored_updates(path) == batch_size
+        assert store._timer is None
@@ -0,0 +1,95 @@
+"""
+Incremental re-planning against full rebuilds
+"""
+
+import random
+
+import pytest
+
+from curriculum import freeze_knowledge
+from syllabus_builder import SyllabusBuilder
+
+LEVELS = ("beginner", "intermediate", "advanced")
+
+def knowledge_with(count: int, seed: int):
+    rng = random.Random(seed)
+    return freeze_knowledge({
+        "description": f"Synthetic curriculum with {count} modules",
+        "modules": [{"title": f"{'Advanced ' if rng.random() < 0.2 else ''}Module {i}", "hours": rng.randint(1, 6),
+                     "topics": [f"topic {i}"], "exercises": ["Basic exercise", "Simple project"]}
+                    for i in range(count)],
+        "prerequisites": ["Basic programming"],
+        "resources": ["Documentation"]
+    })
+
+def finished_parts(syllabus: dict, completed: int) -> list:
+    return [(week["week"], part) for week in syllabus["study_plan"] for part in week["modules"]
+            if part["module"] < completed]
+
+def random_change(rng: random.Random) -> tuple:
+    return rng.randint(1, 120), rng.randint(1, 12), rng.choice(LEVELS)
+
+@pytest.mark.parametrize("seed", range(150))
+def test_unchanged_and_restarted_plans(seed):
+    builder = SyllabusBuilder()
+    rng = random.Random(seed)
+    count = rng.randint(1, 30)
+    knowledge = knowledge_with(count, seed)
+    total, capacity, level = random_change(rng)
+    syllabus = builder._build_syllabus("Synthetic", total, level, capacity, knowledge)
+    new_total, new_capacity, new_level = random_change(rng)
+
+    # No change keeps the plan; nothing completed is a full rebuild
+    assert builder.replan(syllabus, rng.randint(0, count), hours_per_week=capacity, knowledge=knowledge) == syllabus
+    assert (builder.replan(syllabus, 0, new_total, new_capacity, new_level, knowledge=knowledge)
+            == builder._build_syllabus("Synthetic", new_total, new_level, new_capacity, knowledge))
+
+@pytest.mark.parametrize("seed", range(150))
+def test_same_capacity_matches_the_full_schedule(seed):
+    builder = SyllabusBuilder()
+    rng = random.Random(seed)
+    count = rng.randint(1, 30)
+    knowledge = knowledge_with(count, seed)
+    total, capacity, level = random_change(rng)
+    syllabus = builder._build_syllabus("Synthetic", total, level, capacity, knowledge)
+    completed = rng.randint(0, count)
+    new_total, _, new_level = random_change(rng)
+
+    replanned = builder.replan(syllabus, completed, new_total, capacity, new_level, knowledge=knowledge)
+    assert replanned["modules"][:completed] == syllabus["modules"][:completed]
+    assert replanned["study_plan"] == builder._create_study_plan(replanned["modules"], capacity)
+    assert sum(module.hours for module in replanned["modules"]) == replanned["total_hours"]
+
+@pytest.mark.parametrize("seed", range(150))
+def test_new_capacity_keeps_finished_parts(seed):
+    builder = SyllabusBuilder()
+    rng = random.Random(seed)
+    count = rng.randint(1, 30)
+    knowledge = knowledge_with(count, seed)
+    total, capacity, level = random_change(rng)
+    syllabus = builder._build_syllabus("Synthetic", total, level, capacity, knowledge)
+    completed = rng.randint(0, count)
+    new_total, new_capacity, new_level = random_change(rng)
+
+    replanned = builder.replan(syllabus, completed, new_total, new_capacity, new_level, knowledge=knowledge)
+    assert finished_parts(replanned, completed) == finished_parts(syllabus, completed)
+
+    # Every remaining hour is scheduled once, within the weekly capacity
+    scheduled = [0] * count
+    for week in replanned["study_plan"]:
+        for part in week["modules"]:
+            scheduled[part["module"]] += part["hours"]
+        if any(part["module"] >= completed for part in week["modules"]):
+            assert week["hours"] <= max(capacity, new_capacity)
+    assert scheduled == [module.hours for module in replanned["modules"]]
+    assert [week["week"] for week in replanned["study_plan"]] == list(range(1, len(replanned["study_plan"]) + 1))
+
+def test_large_plan_replans_like_a_rebuild():
+    builder = SyllabusBuilder()
+    knowledge = knowledge_with(1000, 22)
+    total = sum(module.hours for module in knowledge["modules"])
+    syllabus = builder._build_syllabus("Synthetic", total, "intermediate", 5, knowledge)
+    for completed in (500, 990):
+        replanned = builder.replan(syllabus, completed, total + 50, 5, "advanced", knowledge)
+        assert replanned["modules"][:completed] == syllabus["modules"][:completed]
+        assert replanned["study_plan"] == builder._create_study_plan(replanned["modules"], 5)
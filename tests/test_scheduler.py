@@ -0,0 +1,96 @@
+"""
+Tests for the weekly scheduler and the study plans built on it
+"""
+
+import random
+
+import pytest
+
+from curriculum import Module
+from scheduler import module_order, schedule, weekly_capacities
+from syllabus_builder import SyllabusBuilder
+
+def legacy_study_plan(modules: tuple, hours_per_week: int = 5) -> list:
+    """The week packing _create_study_plan used before the scheduler, with module ids kept"""
+    plan = []
+    week = 1
+    remaining = [module.hours for module in modules]
+
+    current_module = 0
+    while current_module < len(modules):
+        parts = []
+        week_hours = 0
+        while current_module < len(modules) and week_hours + remaining[current_module] <= hours_per_week:
+            parts.append((current_module, remaining[current_module]))
+            week_hours += remaining[current_module]
+            current_module += 1
+
+        if current_module < len(modules) and week_hours < hours_per_week:
+            parts.append((current_module, hours_per_week - week_hours))
+            remaining[current_module] -= hours_per_week - week_hours
+
+        plan.append((week, parts))
+        week += 1
+
+    return plan
+
+def random_modules(rng: random.Random, count: int) -> tuple:
+    return tuple(Module(f"Module {i}", rng.randint(1, 12)) for i in range(count))
+
+@pytest.mark.parametrize("count", [500, 1000, 5000])
+@pytest.mark.parametrize("hours_per_week", [1, 5, 7, 20])
+def test_study_plan_matches_legacy_packing(count, hours_per_week):
+    modules = random_modules(random.Random(count * hours_per_week), count)
+    plan = SyllabusBuilder()._create_study_plan(modules, hours_per_week)
+    legacy = legacy_study_plan(modules, hours_per_week)
+
+    assert [week["week"] for week in plan] == [week for week, _ in legacy]
+    for week, (_, parts) in zip(plan, legacy):
+        assert [(part["module"], part["hours"]) for part in week["modules"]] == parts
+        # The legacy plan left split parts out of the weekly total
+        assert week["hours"] == sum(hours for _, hours in parts)
+        assert week["hours"] <= hours_per_week
+
+def test_split_modules_number_their_parts():
+    modules = (Module("A", 3), Module("B", 8), Module("C", 2))
+    plan = SyllabusBuilder()._create_study_plan(modules, 5)
+    titles = [[part["title"] for part in week["modules"]] for week in plan]
+    assert titles == [["A", "B (Part 1)"], ["B (Part 2)"], ["B (Part 3)", "C"]]
+    assert [week["hours"] for week in plan] == [5, 5, 3]
+
+@pytest.mark.parametrize("seed", range(50))
+def test_schedule_covers_every_module(seed):
+    rng = random.Random(seed)
+    hours = [rng.randint(0, 15) for _ in range(rng.randint(1, 600))]
+    capacity = rng.randint(1, 25)
+    plan = schedule(hours, capacity)
+
+    assert list(plan) == list(range(1, len(plan) + 1))
+    scheduled = [0] * len(hours)
+    for parts in plan.values():
+        assert sum(part for _, part in parts) <= capacity
+        for module_id, part in parts:
+            assert part > 0
+            scheduled[module_id] += part
+    assert scheduled == hours
+
+def test_daily_hours_group_into_weeks():
+    assert list(weekly_capacities(daily=[1] * 10)) == [7, 3]
+    plan = schedule([4, 4, 2], daily=[1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 2, 1])
+    assert plan == {1: [(0, 4), (1, 3)], 2: [], 3: [(1, 1), (2, 2)]}
+
+def test_per_week_capacities():
+    assert schedule([3, 3], capacity=[2, 4]) == {1: [(0, 2)], 2: [(0, 1), (1, 3)]}
+    with pytest.raises(ValueError):
+        schedule([3, 3], capacity=[2, 2])
+    with pytest.raises(ValueError):
+        schedule([1], capacity=0)
+
+def test_prerequisites_come_first():
+    assert module_order(4, {0: [3], 1: [0]}) == [2, 3, 0, 1]
+    plan = schedule([2, 2, 2], 3, prerequisites={0: [2]})
+    assert plan == {1: [(1, 2), (2, 1)], 2: [(2, 1), (0, 2)]}
+
+def test_prerequisite_cycles_are_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        schedule([1, 1, 1], prerequisites={0: [1], 1: [2], 2: [0]})
@@ -0,0 +1,38 @@
+"""
+Catalog snapshot files
+"""
+
+import pytest
+
+from knowledge_base import TOPIC_KNOWLEDGE
+from storage import SnapshotBackend
+
+@pytest.fixture
+def snapshot(tmp_path):
+    backend = SnapshotBackend.build(str(tmp_path / "catalog.snap"), TOPIC_KNOWLEDGE.items())
+    yield backend
+    backend.close()
+
+def test_snapshot_reads_every_entry(snapshot):
+    assert sorted(snapshot.keys()) == sorted(TOPIC_KNOWLEDGE)
+    assert len(snapshot) == len(TOPIC_KNOWLEDGE)
+    for key, knowledge in TOPIC_KNOWLEDGE.items():
+        assert snapshot.get(key)["description"] == knowledge["description"]
+    assert snapshot.get("basket weaving") is None
+
+def test_snapshot_closes_after_reads(snapshot):
+    assert "python programming" in snapshot
+    snapshot.get("machine learning")
+    snapshot.close()
+    assert snapshot._map is None
+    snapshot.close()
+
+    # A closed snapshot maps the file again on the next lookup
+    assert snapshot.get("operating systems")["description"] == TOPIC_KNOWLEDGE["operating systems"]["description"]
+
+def test_closed_snapshot_keeps_runtime_topics(snapshot):
+    snapshot.put("cooking", {"description": "Food"})
+    snapshot.get("python programming")
+    snapshot.close()
+    assert snapshot.get("cooking") == {"description": "Food"}
+    assert len(snapshot) == len(TOPIC_KNOWLEDGE) + 1
@@ -0,0 +1,80 @@
+"""
+One shared builder and assistant used from many threads at once
+"""
+
+import contextlib
+import io
+import random
+import sys
+import threading
+
+import pytest
+
+from knowledge_base import TOPIC_KNOWLEDGE
+from plan_store import PlanStore
+from study_assistant import StudyAssistant
+from syllabus_builder import SyllabusBuilder
+from syllabus_cache import SyllabusCache
+
+@pytest.fixture
+def switch_often():
+    """Switch threads as often as possible so races show up"""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+def run_threads(count: int, target):
+    """Run target(offset) on count threads started together; re-raise the first error"""
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def worker(offset):
+        barrier.wait()
+        try:
+            target(offset)
+        except Exception as error:
+            errors.append(error)
+
+    workers = [threading.Thread(target=worker, args=(offset,)) for offset in range(count)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+def session(assistant, request) -> tuple:
+    output = io.StringIO()
+    syllabus = assistant.start_study_session(*request, output=output, ask=lambda prompt: "")
+    return syllabus, output.getvalue()
+
+def test_sessions_match_the_single_threaded_run(switch_often):
+    rng = random.Random(21)
+    topics = list(TOPIC_KNOWLEDGE) + ["python", "intro to databases", "quantum basket weaving"]
+    requests = [(rng.choice(topics), rng.randint(1, 100), rng.choice(("beginner", "intermediate", "advanced")))
+                for _ in range(4000)]
+    expected = [session(StudyAssistant(), request) for request in requests]
+
+    # Builder, cache and plan store are all shared by the threads
+    assistant = StudyAssistant(SyllabusBuilder(SyllabusCache(maxsize=16, store=PlanStore())))
+    results = [None] * len(requests)
+    threads = 64
+
+    def work(offset):
+        for index in range(offset, len(requests), threads):
+            results[index] = session(assistant, requests[index])
+
+    stray = io.StringIO()
+    with contextlib.redirect_stdout(stray):
+        run_threads(threads, work)
+    assert stray.getvalue() == "", "session output leaked to stdout"
+    mismatches = [i for i, (result, reference) in enumerate(zip(results, expected)) if result != reference]
+    assert not mismatches, f"{len(mismatches)} sessions differ, first {requests[mismatches[0]]}"
+
+def test_concurrent_first_lookups_index_the_catalog_once(catalog, switch_often):
+    catalog.set_backend(catalog.get_backend())
+    resolvers = []
+    run_threads(16, lambda offset: resolvers.append(catalog.get_resolver()))
+    assert len({id(resolver) for resolver in resolvers}) == 1
+    assert catalog.resolve_topic("python") == "python programming"
@@ -0,0 +1,83 @@
+import io
+import threading
+
+from syllabus_builder import SyllabusBuilder
+from syllabus_cache import SyllabusCache
+from topic_index import TopicIndex
+
+def test_small_catalogs_match_unknown_topics_by_default(catalog):
+    assert catalog.get_topic_knowledge("deep learning") is catalog.get_catalog_entry("machine learning")
+    assert catalog.get_topic_knowledge("OS internals") is catalog.get_catalog_entry("operating systems")
+    assert catalog.get_topic_knowledge("basket weaving")["description"] == "Study of basket weaving"
+
+def test_entry_points_match_unknown_topics(catalog, capsys):
+    import main
+    from study_assistant import StudyAssistant
+
+    main.main(["--topic", "deep learning", "--format", "json"])
+    assert catalog.get_catalog_entry("machine learning")["description"] in capsys.readouterr().out
+    syllabus = StudyAssistant().builder.create_syllabus("OS internals", output=io.StringIO())
+    assert syllabus["modules"][0]["title"] == "Introduction to OS"
+
+def test_large_catalogs_only_match_when_enabled(catalog, monkeypatch):
+    monkeypatch.setattr(catalog, "SEMANTIC_AUTO_TOPICS", len(catalog.TOPIC_KNOWLEDGE) - 1)
+    assert catalog.get_topic_index() is None
+    assert catalog.get_topic_knowledge("deep learning")["description"] == "Study of deep learning"
+    catalog.enable_semantic_matching()
+    assert catalog.get_topic_knowledge("deep learning") is catalog.get_catalog_entry("machine learning")
+
+def test_semantic_matching_can_be_disabled(catalog):
+    catalog.enable_semantic_matching(False)
+    assert catalog.get_topic_index() is None
+    assert catalog.get_topic_knowledge("deep learning")["description"] == "Study of deep learning"
+
+def test_semantic_matches_follow_replaced_entries(catalog):
+    catalog.enable_semantic_matching()
+    builder = SyllabusBuilder(cache=SyllabusCache())
+    first = builder._get_syllabus("deep learning", 10, "beginner")
+    assert first["description"] == catalog.get_catalog_entry("machine learning")["description"]
+
+    replaced = dict(catalog.get_catalog_entry("machine learning"), description="Replaced")
+    catalog.add_topic("machine learning", replaced)
+    assert builder._get_syllabus("deep learning", 10, "beginner")["description"] == "Replaced"
+
+def test_saved_index_gives_the_same_results(catalog, tmp_path):
+    index = TopicIndex.build(catalog.TOPIC_KNOWLEDGE.items())
+    path = str(tmp_path / "catalog.index")
+    index.save(path)
+    queries = ["OS internals", "deep learning", "python", "cooking"]
+    assert TopicIndex.load(path).search_many(queries) == index.search_many(queries)
+
+def test_names_without_features_are_indexed_as_empty():
+    index = TopicIndex.build([("the", None), ("!!", None), ("operating systems", None)])
+    index.add("of", None)
+    assert index.search("the") == []
+    assert index.search("operating systems", 1)[0][0] == "operating systems"
+
+def test_searches_during_adds_see_consistent_postings(catalog):
+    index = TopicIndex.build(catalog.TOPIC_KNOWLEDGE.items())
+    knowledge = catalog.TOPIC_KNOWLEDGE["python programming"]
+    errors = []
+
+    def add():
+        for i in range(300):
+            index.add(f"topic {i}", knowledge)
+            index.add("python programming", knowledge)  # Replacing marks the old doc deleted
+            if i % 100 == 99:
+                index.compact()
+
+    def search():
+        try:
+            for _ in range(300):
+                for key, _ in index.search_many(["python", "topic 7", "operating systems"], 3)[0]:
+                    assert key in index
+        except Exception as error:  # Surface failures from the thread
+            errors.append(error)
+
+    threads = [threading.Thread(target=add)] + [threading.Thread(target=search) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert index.search("topic 299", 1)[0][0] == "topic 299"
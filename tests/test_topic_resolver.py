@@ -0,0 +1,99 @@
+"""
+Topic resolution against a plain scan of the keys
+"""
+
+import random
+
+import pytest
+
+from topic_resolver import TopicResolver, normalize_topic
+
+WORDS = ["os", "ml", "ai", "data", "systems", "operating", "machine", "learning", "web", "db", "c", "go"]
+
+def scan_partial(keys: list, query: str):
+    """The earliest key contained in the query, or containing it, by a linear scan"""
+    query = normalize_topic(query)
+    contained = [i for i, key in enumerate(keys) if normalize_topic(key) in query]
+    containing = [i for i, key in enumerate(keys) if query in normalize_topic(key)]
+    positions = contained + containing
+    return keys[min(positions)] if positions else None
+
+@pytest.mark.parametrize("seed", range(20))
+def test_partial_matches_equal_a_scan(seed):
+    rng = random.Random(seed)
+    keys = list(dict.fromkeys(" ".join(rng.sample(WORDS, rng.randint(1, 3))) for _ in range(300)))
+    resolver = TopicResolver(keys)
+    queries = ["o", "s", "x", "ml", "Os", " go ", "ai", "zz", "os ml", "data systems", "learn", "q"]
+    queries += [key[start:start + length] for key in rng.sample(keys, 30)
+                for start, length in ((0, 1), (1, 2), (0, 2)) if key[start:start + length].strip()]
+    for query in queries:
+        expected = normalize_topic(query) if normalize_topic(query) in keys else scan_partial(keys, query)
+        assert resolver.resolve(query, fuzzy=False) == expected, query
+
+def test_short_queries_use_the_earliest_key():
+    resolver = TopicResolver(["operating systems", "python programming", "machine learning"])
+    assert resolver.resolve("os", fuzzy=False) is None
+    assert resolver.resolve("ml", fuzzy=False) is None
+    assert resolver.resolve("py", fuzzy=False) == "python programming"
+    assert resolver.resolve("in", fuzzy=False) == "operating systems"
+    resolver.add("os")
+    assert resolver.resolve("o", fuzzy=False) == "operating systems"
+    assert resolver.resolve("os", fuzzy=False) == "os"
+
+def random_keys(seed: int) -> list:
+    rng = random.Random(seed)
+    return list(dict.fromkeys(" ".join(rng.sample(WORDS, rng.randint(1, 3))) + rng.choice(["", " 2", " ü"])
+                              for _ in range(400)))
+
+@pytest.mark.parametrize("seed", range(5))
+def test_saved_resolver_matches_the_built_one(tmp_path, seed):
+    keys = random_keys(seed)
+    built = TopicResolver(keys)
+    built.save(str(tmp_path / "topics.resolver"))
+    loaded = TopicResolver.load(str(tmp_path / "topics.resolver"))
+    queries = ["o", "ü", "ml", "os 2", "Machine  Learning", "opertaing systms", "data web", "zz", "learn", ""]
+    queries += [key[1:7] for key in keys[::20]]
+    for query in queries:
+        assert loaded.resolve(query, fuzzy=False) == built.resolve(query, fuzzy=False), query
+        assert loaded.suggest(query) == built.suggest(query), query
+    assert len(loaded) == len(built)
+    assert keys[7].upper() in loaded and "basket weaving" not in loaded
+
+    # Keys added after loading rank after the saved ones, as in a built index
+    for key in ("os", "quantum knitting", "c 2", keys[3]):
+        built.add(key)
+        loaded.add(key)
+    for query in queries + ["knit", "os", "q", "quantum knitting"]:
+        assert loaded.resolve(query) == built.resolve(query), query
+    assert len(loaded) == len(built)
+
+def test_resolved_again_after_saving_a_loaded_index(tmp_path):
+    TopicResolver(["operating systems", "python programming"]).save(str(tmp_path / "first"))
+    loaded = TopicResolver.load(str(tmp_path / "first"))
+    loaded.add("machine learning")
+    loaded.save(str(tmp_path / "second"))
+    again = TopicResolver.load(str(tmp_path / "second"))
+    assert [again.resolve(topic) for topic in ("py", "learning", "operating")] == [
+        "python programming", "machine learning", "operating systems"]
+
+def test_incompatible_files_are_rejected(tmp_path):
+    path = str(tmp_path / "topics.resolver")
+    TopicResolver(["python"]).save(path)
+    with pytest.raises(ValueError, match="rebuild it"):
+        TopicResolver.load(path, ngram=2).resolve("py")
+    (tmp_path / "topics.resolver").write_bytes(b"not an index" * 10)
+    with pytest.raises(ValueError, match="rebuild it"):
+        TopicResolver.load(path).resolve("py")
+
+def test_snapshots_are_saved_and_opened_with_their_resolver(catalog, tmp_path, capsys):
+    import main
+    from storage import SnapshotBackend
+
+    path = str(tmp_path / "catalog.snap")
+    main.main(["--build-snapshot", path])
+    assert (tmp_path / "catalog.snap.resolver").exists()
+    main.main(["--catalog", path, "--topic", "python", "--format", "json"])
+    assert isinstance(catalog.get_backend(), SnapshotBackend)
+    assert catalog.get_resolver().path == path + ".resolver"
+    assert '"topic": "python"' in capsys.readouterr().out
+    assert catalog.resolve_topic("Operating") == "operating systems"
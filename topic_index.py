@@ -0,0 +1,409 @@
+"""
+Offline semantic topic matching: a TF-IDF index of hashed words and character n-grams
+Topics are indexed by name, description and module titles and topics, so
+"OS internals" finds "operating systems" without any network or model. The
+index can be saved to disk and is memory-mapped back on first query.
+"""
+
+import heapq
+import math
+import mmap
+import os
+import struct
+import threading
+import zlib
+from array import array
+from functools import lru_cache
+from itertools import repeat
+
+from curriculum import Module
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional; it only speeds up packing and scoring
+    numpy = None
+
+INDEX_MAGIC = b"TOPICIX\0"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct("<8sIIII")  # magic, version, dimensions, topics, postings
+
+# Words that say nothing about a topic ("intro to databases" is about databases)
+STOPWORDS = frozenset({"a", "an", "and", "basics", "for", "in", "intro", "introduction", "of", "on", "the",
+                       "to", "with"})
+
+class TopicIndex:
+    """
+    Sparse vectors of hashed words and character trigrams. Topics are
+    log-tf weighted and cosine-normalized when added, queries are weighted
+    by the current idf (the SMART lnc.ltc scheme), so adding a topic never
+    changes the vectors of the others. Postings are packed by feature,
+    heaviest first (compact), and a query reads at most max_posting of them
+    per feature; topics added since are kept in memory until the next compact.
+    """
+
+    def __init__(self, dimensions: int = 1 << 18, name_weight: int = 3, word_weight: float = 5.0,
+                 max_posting: int = 2000):
+        if dimensions & (dimensions - 1):
+            raise ValueError("dimensions must be a power of two")
+        self.dimensions = dimensions
+        self.name_weight = name_weight  # Name features count this many times
+        self.word_weight = word_weight  # Whole words weigh this much more than trigrams
+        self.max_posting = max_posting  # Packed postings scored per query feature (None: all)
+        self.path = None
+        self._keys = []         # doc id -> key
+        self._ids = {}          # key -> live doc id
+        self._deleted = set()   # doc ids replaced by a later add
+        self._packed = None     # (offsets, doc ids, weights) by feature, for docs below _packed_count
+        self._packed_count = 0
+        self._vectors = None    # NumPy views of the packed doc ids and weights
+        self._added = {}        # feature -> (doc ids, weights) arrays for docs added since
+        self._map = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def build(cls, items, **options) -> "TopicIndex":
+        """Index (key, knowledge) pairs"""
+        index = cls(**options)
+        features, docs, weights = array("I"), array("I"), array("f")
+        for key, knowledge in items:
+            vector = index._vector(key, knowledge)
+            features.extend(vector)
+            docs.extend(repeat(index._claim(key), len(vector)))
+            weights.extend(vector.values())
+        index._pack(features, docs, weights)
+        return index
+
+    @classmethod
+    def load(cls, path: str, **options) -> "TopicIndex":
+        """Open a saved index; it is memory-mapped on first use"""
+        index = cls(**options)
+        index.path = path
+        return index
+
+    def __len__(self):
+        self._open()
+        return len(self._ids)
+
+    def __contains__(self, key: str):
+        self._open()
+        return key in self._ids
+
+    def __getstate__(self):
+        # Pickled for worker processes: memory-mapped postings are copied, the lock is not
+        with self._lock:
+            state = dict(self.__dict__, _lock=None, _map=None, _vectors=None)
+            if self._packed is not None:
+                packed = []
+                for typecode, block in zip("IIf", self._packed):
+                    copied = array(typecode)
+                    copied.frombytes(block.tobytes())
+                    packed.append(copied)
+                state["_packed"] = tuple(packed)
+            return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+        if numpy is not None and self._packed is not None and len(self._packed[1]):
+            self._vectors = (numpy.frombuffer(self._packed[1], dtype=numpy.uint32),
+                             numpy.frombuffer(self._packed[2], dtype=numpy.float32))
+
+    def add(self, key: str, knowledge):
+        """Add a topic, or replace it if it is already indexed"""
+        vector = self._vector(key, knowledge)
+        with self._lock:
+            self._open()
+            doc = self._claim(key)
+            for feature, weight in vector.items():
+                postings = self._added.get(feature)
+                if postings is None:
+                    postings = self._added[feature] = (array("I"), array("f"))
+                postings[0].append(doc)
+                postings[1].append(weight)
+
+    def search(self, query: str, k: int = 5) -> list:
+        """Get the k closest topics as (key, cosine similarity) pairs, best first"""
+        return self.search_many([query], k)[0]
+
+    def search_many(self, queries, k: int = 5) -> list:
+        """Search for several queries at once (idf weights are computed once per feature)"""
+        self._open()
+        # add() and compact() change the postings and deleted docs; a batch sees one state
+        with self._lock:
+            topics = len(self._ids)
+            idf = {}
+            results = []
+            for query in queries:
+                words, grams = _features(query, True, self.dimensions)
+                vector = {}
+                for feature, tf in self._weigh(words, grams).items():
+                    weight = idf.get(feature)
+                    if weight is None:
+                        df = self._df(feature)
+                        weight = idf[feature] = math.log((topics + 1) / (df + 1)) + 1 if df else 0.0
+                    if weight:
+                        vector[feature] = tf * weight
+                norm = math.sqrt(sum(w * w for w in vector.values()))
+                if not norm:
+                    results.append([])
+                    continue
+                results.append(self._top(self._score({feature: w / norm for feature, w in vector.items()}), k))
+        return results
+
+    def compact(self):
+        """Pack the topics added since the last compact and drop replaced ones"""
+        with self._lock:
+            self._open()
+            if self._packed is not None and not self._added and not self._deleted:
+                return
+            features, docs, weights = array("I"), array("I"), array("f")
+            if self._packed is not None:
+                offsets, packed_docs, packed_weights = self._packed
+                for feature in range(self.dimensions):
+                    features.extend(repeat(feature, offsets[feature + 1] - offsets[feature]))
+                docs.frombytes(packed_docs.tobytes())
+                weights.frombytes(packed_weights.tobytes())
+            for feature, (added_docs, added_weights) in self._added.items():
+                features.extend(repeat(feature, len(added_docs)))
+                docs.extend(added_docs)
+                weights.extend(added_weights)
+            self._pack(features, docs, weights)
+
+    def save(self, path: str):
+        """Compact the index and write it to path"""
+        with self._lock:
+            self.compact()
+            offsets, docs, weights = self._packed
+            encoded = [key.encode("utf-8") for key in self._keys]
+            key_offsets = array("I", [0])
+            for key in encoded:
+                key_offsets.append(key_offsets[-1] + len(key))
+            temporary = path + ".tmp"
+            with open(temporary, "wb") as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, self.dimensions, len(encoded), len(docs)))
+                for block in (offsets, docs, weights, key_offsets):
+                    f.write(block)
+                f.write(b"".join(encoded))
+            os.replace(temporary, path)  # Readers never see a half-written index
+
+    def _open(self):
+        if self.path is None or self._packed is not None:
+            return
+        with self._lock:
+            if self._packed is not None:
+                return
+            with open(self.path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, dimensions, count, total = INDEX_HEADER.unpack_from(data)
+            if magic != INDEX_MAGIC or version != INDEX_VERSION or dimensions != self.dimensions:
+                data.close()
+                raise ValueError(f"{self.path} is not a compatible topic index; rebuild it")
+            view = memoryview(data)
+            start = INDEX_HEADER.size
+            sections = []
+            for typecode, length in (("I", dimensions + 1), ("I", total), ("f", total), ("I", count + 1)):
+                sections.append(view[start:start + 4 * length].cast(typecode))
+                start += 4 * length
+            offsets, docs, weights, key_offsets = sections
+            blob = view[start:start + key_offsets[count]].tobytes()
+            keys = [blob[key_offsets[i]:key_offsets[i + 1]].decode("utf-8") for i in range(count)]
+            self._map = data  # Views keep the mapping alive; it is closed when the last is dropped
+            self._use(keys, offsets, docs, weights)
+
+    def _use(self, keys: list, offsets, docs, weights):
+        """Switch to packed postings for keys (doc ids are positions in keys)"""
+        self._keys = keys
+        self._ids = {key: doc for doc, key in enumerate(keys)}
+        self._deleted = set()
+        self._added = {}
+        self._packed_count = len(keys)
+        self._vectors = None
+        if numpy is not None and len(docs):
+            self._vectors = (numpy.frombuffer(docs, dtype=numpy.uint32),
+                             numpy.frombuffer(weights, dtype=numpy.float32))
+        self._packed = (offsets, docs, weights)
+
+    def _claim(self, key: str) -> int:
+        """New doc id for key (its previous doc, if any, is replaced)"""
+        old = self._ids.get(key)
+        if old is not None:
+            self._deleted.add(old)
+        doc = len(self._keys)
+        self._keys.append(key)
+        self._ids[key] = doc
+        return doc
+
+    def _pack(self, features, docs, weights):
+        """Switch to postings packed from flat arrays: by feature, heaviest first (ties by doc id)"""
+        keys = sorted(self._ids, key=self._ids.get)
+        renumber = None
+        if len(keys) != len(self._keys):  # Replaced docs are dropped and the rest renumbered
+            renumber = {self._ids[key]: doc for doc, key in enumerate(keys)}
+        if numpy is not None:
+            features = numpy.frombuffer(features, dtype=numpy.uint32)
+            docs = numpy.frombuffer(docs, dtype=numpy.uint32)
+            weights = numpy.frombuffer(weights, dtype=numpy.float32)
+            if renumber is not None:
+                mapping = numpy.full(len(self._keys), -1, dtype=numpy.int64)
+                mapping[list(renumber)] = list(renumber.values())
+                docs = mapping[docs]
+                live = docs >= 0
+                features, docs, weights = features[live], docs[live].astype(numpy.uint32), weights[live]
+            order = numpy.lexsort((docs, -weights, features))
+            offsets = numpy.searchsorted(features[order], numpy.arange(self.dimensions + 1)).astype(numpy.uint32)
+            self._use(keys, array("I", offsets.tobytes()), array("I", docs[order].tobytes()),
+                      array("f", weights[order].tobytes()))
+            return
+
+        buckets = {}
+        for feature, doc, weight in zip(features, docs, weights):
+            if renumber is not None:
+                doc = renumber.get(doc)
+                if doc is None:
+                    continue
+            bucket = buckets.get(feature)
+            if bucket is None:
+                bucket = buckets[feature] = []
+            bucket.append((-weight, doc))
+        offsets = array("I", [0])
+        docs, weights = array("I"), array("f")
+        for feature in range(self.dimensions):
+            bucket = buckets.get(feature)
+            if bucket:
+                bucket.sort()
+                docs.extend(doc for _, doc in bucket)
+                weights.extend(-weight for weight, _ in bucket)
+            offsets.append(len(docs))
+        self._use(keys, offsets, docs, weights)
+
+    def _vector(self, key: str, knowledge) -> dict:
+        """Normalized log-tf vector of a topic"""
+        # Trigrams (for spelling and word-form variants) come from the name and module
+        # titles; descriptions and module topics add their words
+        name = " ".join(key.lower().split())
+        texts = [(_features(name, True, self.dimensions), self.name_weight)]
+        if " " in name:  # "operating systems" also answers to "os"
+            initials = _feature("#" + "".join(word[0] for word in name.split()), self.dimensions)
+            texts.append(((((initials, 1),), ()), self.name_weight))
+        if knowledge is not None:
+            texts.append((_features(knowledge["description"], False, self.dimensions), 1))
+            for module in knowledge["modules"]:
+                module = Module.from_dict(module)
+                texts.append((_features(module.title, True, self.dimensions), 1))
+                for topic in module.topics:
+                    texts.append((_features(topic, False, self.dimensions), 1))
+        words, grams = {}, {}
+        for (text_words, text_grams), weight in texts:
+            for feature, count in text_words:
+                words[feature] = words.get(feature, 0) + count * weight
+            for feature, count in text_grams:
+                grams[feature] = grams.get(feature, 0) + count * weight
+        vector = self._weigh(words.items(), grams.items())
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        if not norm:  # Nothing to index (e.g. a name of stopwords or punctuation and no entry)
+            return {}
+        return {feature: w / norm for feature, w in vector.items()}
+
+    def _weigh(self, words, grams) -> dict:
+        """Log-tf weights of (feature, count) words and trigrams (hashed features may collide; they add up)"""
+        vector = {feature: 1 + math.log(tf) for feature, tf in grams}
+        for feature, tf in words:
+            vector[feature] = vector.get(feature, 0.0) + (1 + math.log(tf)) * self.word_weight
+        return vector
+
+    def _df(self, feature: int) -> int:
+        """Topics containing a feature (replaced topics count until the next compact)"""
+        df = 0
+        if self._packed is not None:
+            offsets = self._packed[0]
+            df = offsets[feature + 1] - offsets[feature]
+        postings = self._added.get(feature)
+        return df + (len(postings[0]) if postings else 0)
+
+    def _postings(self, feature: int, limit: int = None):
+        """(doc id, weight) pairs of a feature, the packed ones heaviest first (at most limit of them)"""
+        if self._packed is not None:
+            offsets, docs, weights = self._packed
+            start, end = offsets[feature], offsets[feature + 1]
+            if limit is not None:
+                end = min(end, start + limit)
+            yield from zip(docs[start:end], weights[start:end])
+        postings = self._added.get(feature)
+        if postings:
+            yield from zip(*postings)
+
+    def _score(self, vector: dict):
+        """Dot products of a normalized query with the topics (a {doc id: score} dict, or an array with NumPy)"""
+        # A common feature only scores the topics it weighs most in; the rest are poor matches
+        # on that feature anyway, and skipping them keeps queries fast on large catalogs
+        limit = self.max_posting
+        vectors = self._vectors
+        if vectors is None:
+            scores = {}
+            get = scores.get
+            for feature, w in vector.items():
+                for doc, weight in self._postings(feature, limit):
+                    scores[doc] = get(doc, 0.0) + weight * w
+            return scores
+
+        # Packed postings: one scatter-add over the spans of all query features
+        offsets = self._packed[0]
+        totals = numpy.zeros(len(self._keys))
+        spans = []
+        for feature, w in vector.items():
+            start, end = offsets[feature], offsets[feature + 1]
+            if end > start:
+                spans.append((start, end if limit is None else min(end, start + limit), w))
+        if spans:
+            docs, weights = vectors
+            ids = numpy.concatenate([docs[start:end] for start, end, _ in spans])
+            values = numpy.concatenate([numpy.multiply(weights[start:end], w, dtype=numpy.float64)
+                                        for start, end, w in spans])
+            totals[:self._packed_count] = numpy.bincount(ids, weights=values, minlength=self._packed_count)
+        for feature, w in vector.items():
+            postings = self._added.get(feature)
+            if postings:
+                numpy.add.at(totals, numpy.frombuffer(postings[0], dtype=numpy.uint32),
+                             numpy.multiply(numpy.frombuffer(postings[1], dtype=numpy.float32), w,
+                                            dtype=numpy.float64))
+        return totals
+
+    def _top(self, scores, k: int) -> list:
+        """The k best (key, score) pairs of a {doc id: score} dict or a NumPy array of scores"""
+        if not isinstance(scores, dict):
+            if self._deleted:
+                scores[list(self._deleted)] = 0
+            hits = numpy.flatnonzero(scores)
+            if len(hits) > k:  # Keep the ties at the k-th score, then order by score and doc id
+                kth = -numpy.partition(-scores[hits], k - 1)[k - 1]
+                hits = hits[scores[hits] >= kth]
+            best = hits[numpy.lexsort((hits, -scores[hits]))][:k].tolist()
+            return [(self._keys[doc], round(float(scores[doc]), 6)) for doc in best]
+
+        for doc in self._deleted:
+            scores.pop(doc, None)
+        if len(scores) > k:
+            kth = heapq.nlargest(k, scores.values())[-1]
+            scores = {doc: score for doc, score in scores.items() if score >= kth}
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [(self._keys[doc], round(score, 6)) for doc, score in best]
+
+def _feature(text: str, dimensions: int) -> int:
+    return zlib.crc32(text.encode("utf-8")) & (dimensions - 1)
+
+@lru_cache(maxsize=1 << 16)  # Descriptions and module titles repeat across large catalogs
+def _features(text: str, trigrams: bool, dimensions: int) -> tuple:
+    """Counted (feature, count) words and, if asked, character trigrams of a text"""
+    mask = dimensions - 1
+    words, grams = {}, {}
+    for word in "".join(c if c.isalnum() else " " for c in text.lower()).split():
+        if word in STOPWORDS:
+            continue
+        feature = zlib.crc32(("#" + word).encode("utf-8")) & mask
+        words[feature] = words.get(feature, 0) + 1
+        if trigrams:
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                feature = zlib.crc32(padded[i:i + 3].encode("utf-8")) & mask
+                grams[feature] = grams.get(feature, 0) + 1
+    return tuple(words.items()), tuple(grams.items())
@@ -0,0 +1,351 @@
+"""
+Prebuilt index for resolving user topics to knowledge base keys
+The index can be saved to disk and is memory-mapped back on first use.
+"""
+
+import marshal
+import mmap
+import os
+import struct
+import threading
+import zlib
+from array import array
+from itertools import chain
+
+RESOLVER_MAGIC = b"TOPICRS\0"
+RESOLVER_VERSION = 1
+# magic, version, n-gram size, keys, key slots, n-grams, n-gram slots, postings, key lengths, short index bytes
+RESOLVER_HEADER = struct.Struct("<8s9I")
+
+def normalize_topic(topic: str) -> str:
+    """Normalize a topic for lookups (lowercase, single spaces)"""
+    return " ".join(topic.lower().split())
+
+class TopicResolver:
+    """Resolve topics with a hash lookup, a trigram index and a fuzzy fallback"""
+
+    def __init__(self, keys=(), ngram: int = 3, fuzzy_cutoff: float = 0.7, max_posting: int = 1000):
+        self.ngram = ngram
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.max_posting = max_posting  # Skip very common n-grams when ranking fuzzy candidates
+        self._keys = []        # Original keys in insertion order
+        self._normalized = []  # Normalized keys, same order
+        self._rank = {}        # Normalized key -> position
+        self._lengths = set()  # Lengths of the normalized keys
+        self._grams = {}       # n-gram -> ascending list of positions
+        self._short = None     # Substring shorter than an n-gram -> first position containing it (lazy)
+        self.path = None
+        self._map = None
+        self._lock = threading.Lock()
+        for key in keys:
+            self.add(key)
+
+    @classmethod
+    def load(cls, path: str, **options) -> "TopicResolver":
+        """Open a saved index; it is memory-mapped on first use"""
+        resolver = cls(**options)
+        resolver.path = path
+        return resolver
+
+    def save(self, path: str):
+        """Write the index to path"""
+        self._open()
+        count = len(self._keys)
+        keys = [key.encode("utf-8") for key in self._keys]
+        normalized = [key.encode("utf-8") for key in self._normalized]
+        grams = list(self._grams)
+        encoded_grams = [gram.encode("utf-8") for gram in grams]
+        posting_offsets = array("I", [0])
+        postings = array("I")
+        for gram in grams:
+            postings.extend(self._grams[gram])
+            posting_offsets.append(len(postings))
+        lengths = array("I", sorted(self._lengths))
+        short = marshal.dumps(self._short_index())
+        key_slots, key_table = _hash_table(normalized)
+        gram_slots, gram_table = _hash_table(encoded_grams)
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(RESOLVER_HEADER.pack(RESOLVER_MAGIC, RESOLVER_VERSION, self.ngram, count, key_slots,
+                                         len(grams), gram_slots, len(postings), len(lengths), len(short)))
+            for block in (_offsets(keys), _offsets(normalized), key_table, _offsets(encoded_grams), gram_table,
+                          posting_offsets, postings, lengths):
+                f.write(block)
+            for block in (keys, normalized, encoded_grams):
+                f.write(b"".join(block))
+            f.write(short)
+        os.replace(temporary, path)  # Readers never see a half-written index
+
+    def __len__(self):
+        self._open()
+        return len(self._keys)
+
+    def __contains__(self, key):
+        self._open()
+        return normalize_topic(key) in self._rank
+
+    def add(self, key: str):
+        """Add a key to the index (keys added later rank lower)"""
+        self._open()
+        normalized = normalize_topic(key)
+        if normalized in self._rank:
+            return
+        position = len(self._keys)
+        self._keys.append(key)
+        self._normalized.append(normalized)
+        self._rank[normalized] = position
+        self._lengths.add(len(normalized))
+        for gram in set(self._ngrams(normalized)):
+            self._grams.setdefault(gram, []).append(position)
+        if self._short is not None:
+            self._index_short(normalized, position)
+
+    def resolve(self, topic: str, fuzzy: bool = True):
+        """Return the knowledge base key for a topic, or None if nothing matches"""
+        self._open()
+        query = normalize_topic(topic)
+        if not query:
+            return None
+
+        # Exact match
+        position = self._rank.get(query)
+        if position is not None:
+            return self._keys[position]
+
+        # Partial match: the earliest key that contains or is contained in the query
+        position = self._partial_match(query)
+        if position is not None:
+            return self._keys[position]
+
+        if fuzzy:
+            return self.fuzzy(query)
+        return None
+
+    def fuzzy(self, topic: str):
+        """Return the closest key by n-gram similarity, or None below the cutoff"""
+        matches = self.suggest(topic, 1)
+        if matches and matches[0][1] >= self.fuzzy_cutoff:
+            return matches[0][0]
+        return None
+
+    def suggest(self, topic: str, limit: int = 5) -> list:
+        """Rank candidate keys for a topic as (key, similarity) pairs"""
+        self._open()
+        query = normalize_topic(topic)
+        query_grams = set(self._ngrams(query))
+        counts = {}
+        for gram in query_grams:
+            postings = self._grams.get(gram)
+            if postings is None or len(postings) > self.max_posting:
+                continue
+            for position in postings:
+                counts[position] = counts.get(position, 0) + 1
+
+        # Score only the candidates sharing the most rare n-grams (Dice coefficient)
+        candidates = sorted(counts, key=lambda p: (-counts[p], p))[:limit * 8]
+        scored = []
+        for position in candidates:
+            key_grams = set(self._ngrams(self._normalized[position]))
+            shared = len(query_grams & key_grams)
+            scored.append((-2 * shared / (len(query_grams) + len(key_grams)), position))
+        scored.sort()
+        return [(self._keys[position], -score) for score, position in scored[:limit]]
+
+    def _partial_match(self, query: str):
+        best = None
+
+        # Keys that are substrings of the query
+        for length in self._lengths:
+            if length > len(query):
+                continue
+            for start in range(len(query) - length + 1):
+                position = self._rank.get(query[start:start + length])
+                if position is not None and (best is None or position < best):
+                    best = position
+
+        # Keys that contain the query (too short for n-grams: the first key containing it)
+        if len(query) < self.ngram:
+            position = self._short_index().get(query)
+            if position is not None and (best is None or position < best):
+                return position
+            return best
+        postings = [self._grams.get(gram) for gram in set(self._ngrams(query))]
+        if not all(postings):
+            return best
+        candidates = min(postings, key=len)
+
+        for position in candidates:
+            if best is not None and position >= best:
+                break
+            if query in self._normalized[position]:
+                return position
+        return best
+
+    def _short_index(self) -> dict:
+        """The index of short substrings, built (or read) on the first short query, which would scan every key"""
+        if self._short is None:
+            self._short = {}
+            first = 0
+            if self._map is not None:
+                start = len(self._map) - self._short_length
+                self._short = marshal.loads(self._map[start:])
+                first = len(self._keys.base)  # Keys added since the index was saved
+            for position in range(first, len(self._normalized)):
+                self._index_short(self._normalized[position], position)
+        return self._short
+
+    def _open(self):
+        if self.path is None or self._map is not None:
+            return
+        with self._lock:
+            if self._map is not None:
+                return
+            with open(self.path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            (magic, version, ngram, count, key_slots, grams, gram_slots, total, lengths,
+             short_length) = RESOLVER_HEADER.unpack_from(data)
+            if magic != RESOLVER_MAGIC or version != RESOLVER_VERSION or ngram != self.ngram:
+                data.close()
+                raise ValueError(f"{self.path} is not a compatible topic resolver index; rebuild it")
+            view = memoryview(data)
+            start = RESOLVER_HEADER.size
+            sections = []
+            for length in (count + 1, count + 1, key_slots, grams + 1, gram_slots, grams + 1, total, lengths):
+                sections.append(view[start:start + 4 * length].cast("I"))
+                start += 4 * length
+            key_offsets, normalized_offsets, key_table, gram_offsets, gram_table, posting_offsets, postings, \
+                key_lengths = sections
+            keys = _MappedStrings(data, start, key_offsets)
+            start += key_offsets[count]
+            normalized = _MappedStrings(data, start, normalized_offsets, key_table)
+            start += normalized_offsets[count]
+            gram_keys = _MappedStrings(data, start, gram_offsets, gram_table)
+
+            # Keys and n-grams added at runtime go to in-memory overlays
+            self._keys = _Overlay(keys, self._keys)
+            self._normalized = _Overlay(normalized, self._normalized)
+            self._rank = _Lookup(normalized, int, self._rank)
+            self._grams = _Lookup(gram_keys, lambda i: postings[posting_offsets[i]:posting_offsets[i + 1]],
+                                  self._grams)
+            self._lengths.update(key_lengths)
+            self._short_length = short_length
+            self._map = data  # Views keep the mapping alive; it is closed when the last is dropped
+
+    def _index_short(self, normalized: str, position: int):
+        short = self._short
+        for length in range(1, self.ngram):
+            for start in range(len(normalized) - length + 1):
+                short.setdefault(normalized[start:start + length], position)
+
+    def _ngrams(self, text: str):
+        n = self.ngram
+        return (text[i:i + n] for i in range(len(text) - n + 1))
+
+class _MappedStrings:
+    """Strings in a saved index, found by position or (with a hash table) by value"""
+
+    def __init__(self, data, start: int, offsets, table=None):
+        self._data = data
+        self._start = start
+        self._offsets = offsets
+        self._table = table
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, position: int) -> str:
+        start = self._start
+        return self._data[start + self._offsets[position]:start + self._offsets[position + 1]].decode("utf-8")
+
+    def find(self, text: str):
+        """Position of a string, or None"""
+        encoded = text.encode("utf-8")
+        mask = len(self._table) - 1
+        slot = zlib.crc32(encoded) & mask
+        while True:
+            value = self._table[slot]
+            if not value:
+                return None
+            begin, end = self._offsets[value - 1], self._offsets[value]
+            if end - begin == len(encoded) and self._data[self._start + begin:self._start + end] == encoded:
+                return value - 1
+            slot = (slot + 1) & mask
+
+class _Overlay:
+    """A saved list of strings followed by the ones appended since"""
+
+    def __init__(self, base: _MappedStrings, added: list):
+        self.base = base
+        self._added = added
+
+    def __len__(self):
+        return len(self.base) + len(self._added)
+
+    def __getitem__(self, position: int) -> str:
+        if position < len(self.base):
+            return self.base[position]
+        return self._added[position - len(self.base)]
+
+    def __iter__(self):
+        return chain((self.base[i] for i in range(len(self.base))), self._added)
+
+    def append(self, value: str):
+        self._added.append(value)
+
+class _Lookup:
+    """A saved mapping (string -> value of its position) with the entries set since"""
+
+    def __init__(self, keys: _MappedStrings, value, added: dict):
+        self._keys = keys
+        self._value = value
+        self._added = added
+
+    def get(self, key: str, default=None):
+        value = self._added.get(key)
+        if value is not None:
+            return value
+        position = self._keys.find(key)
+        return default if position is None else self._value(position)
+
+    def __contains__(self, key: str):
+        return self.get(key) is not None
+
+    def __iter__(self):
+        saved = (self._keys[i] for i in range(len(self._keys)))
+        return chain((key for key in saved if key not in self._added), self._added)
+
+    def __getitem__(self, key: str):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value):
+        self._added[key] = value
+
+    def setdefault(self, key: str, default):
+        value = self._added.get(key)
+        if value is None:
+            saved = self.get(key)
+            value = self._added[key] = default if saved is None else list(saved)  # Saved postings are read-only
+        return value
+
+def _offsets(encoded: list) -> array:
+    """Start offsets (and the end) of byte strings laid out back to back"""
+    offsets = array("I", [0])
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return offsets
+
+def _hash_table(encoded: list) -> tuple:
+    """Open addressing table of crc32 hashes at a load factor of at most 1/2; slots hold positions + 1"""
+    slots = 2
+    while slots < len(encoded) * 2:
+        slots *= 2
+    table = array("I", bytes(4 * slots))
+    for position, item in enumerate(encoded):
+        slot = zlib.crc32(item) & (slots - 1)
+        while table[slot]:
+            slot = (slot + 1) & (slots - 1)
+        table[slot] = position + 1
+    return slots, table
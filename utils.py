@@ -2,6 +2,9 @@
 Utility functions for the Study Assistant
 """
 
+from instrumentation import stage
+from renderer import render_plan_file, write_stream
+
 def format_time(hours: int) -> str:
     """Format hours into readable time"""
     if hours < 1:
@@ -45,24 +48,10 @@ def display_banner():
     """
     print(banner)
 
-def save_syllabus(syllabus: dict, filename: str = "study_plan.txt"):
-    """Save syllabus to file"""
+@stage("save_syllabus")
+def save_syllabus(syllabus: dict, filename: str = "study_plan.txt", weeks=None, output=None):
+    """Save syllabus to file (optionally only some weeks), reporting to output (default stdout)"""
     with open(filename, 'w', encoding='utf-8') as f:
-        f.write(f"STUDY PLAN: {syllabus['topic']}\n")
-        f.write("=" * 50 + "\n\n")
-        
-        f.write(f"Description: {syllabus['description']}\n")
-        f.write(f"Total Hours: {syllabus['total_hours']}\n")
-        f.write(f"Level: {syllabus['level']}\n\n")
-        
-        f.write("MODULES:\n")
-        for i, module in enumerate(syllabus['modules'], 1):
-            f.write(f"\n{i}. {module['title']} ({module['hours']} hours)\n")
-            f.write("   Topics:\n")
-            for topic in module['topics']:
-                f.write(f"   • {topic}\n")
-            f.write("   Exercises:\n")
-            for exercise in module['exercises']:
-                f.write(f"   • {exercise}\n")
+        write_stream(render_plan_file(syllabus, weeks), f)
     
-    print(f"\n💾 Syllabus saved to {filename}")
\ No newline at end of file
+    print(f"\n💾 Syllabus saved to {filename}", file=output)
\ No newline at end of file